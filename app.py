@@ -1,9 +1,11 @@
+import threading
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import platform
+
+# 첫 화면(1~4단계)은 numpy 만 쓰는 벤치마크 테이블로 그립니다. pandas·pyarrow 를
+# 끌어오는 리스팅·피처·모델 모듈은 아래 함수 안에서 처음 쓸 때 import 합니다.
+from benchmark_table import load_benchmark_index
 
 # ── 페이지 설정 ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -13,27 +15,6 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-# ── 한글 폰트 ─────────────────────────────────────────────────────────────────
-def set_korean_font():
-    system = platform.system()
-    if system == "Darwin":
-        candidates = ["AppleGothic", "Apple SD Gothic Neo", "Arial Unicode MS"]
-    elif system == "Windows":
-        candidates = ["Malgun Gothic", "NanumGothic", "Gulim"]
-    else:
-        candidates = ["NanumGothic", "NanumBarunGothic", "UnDotum"]
-    available = [f.name for f in fm.fontManager.ttflist]
-    for font in candidates:
-        if font in available:
-            plt.rcParams["font.family"] = font
-            plt.rcParams["axes.unicode_minus"] = False
-            return font
-    plt.rcParams["font.family"] = "sans-serif"
-    plt.rcParams["axes.unicode_minus"] = False
-    return "default"
-
-set_korean_font()
-
 # ── Airbnb 스타일 CSS ─────────────────────────────────────────────────────────
 st.markdown("""
 <style>
@@ -242,74 +223,233 @@ CLUSTER_INFO = {
     },
 }
 
-POI_TYPES = ["관광지", "문화시설", "쇼핑", "음식점", "숙박", "레포츠", "여행코스"]
+POI_TYPES = ["관광지", "문화시설", "쇼핑", "음식점", "숙박", "레포츠", "여행코스", "축제공연행사"]
 
 # ── 데이터 로드 ───────────────────────────────────────────────────────────────
-@st.cache_data
+# 1~4단계는 작은 벤치마크 테이블(build_bench_index)만 씁니다. 리스팅 전체(pandas)·
+# ML 모델·Plotly 차트는 결과 화면(step5)에서 처음 필요하고, start_warmup() 이 사용자가 마법사를
+# 채우는 동안 백그라운드에서 미리 로드합니다. 워밍업 스레드가 부르는 캐시 함수는
+# show_spinner=False — 스크립트 실행 컨텍스트 밖에서 스피너를 그리지 않게.
+@st.cache_resource(show_spinner=False)
 def load_data():
-    df = pd.read_csv("data/raw/final_seoul_airbnb_cleaned.csv")
+    """(Active+Operating 리스팅 + 클러스터 컬럼, district_clustered) — 프로세스당 1회.
+
+    parquet 행 필터로 Active+Operating 행만 읽습니다 (전체 테이블을 올린 뒤 거르지 않음).
+    리스팅 행이 필요한 인덱스(클러스터 분위수·유사 숙소·포지셔닝·손익 위험)만 이 프레임을 씁니다.
+    """
+    import pandas as pd
+    from listings_cache import load_listings
+    from listings_stream import ACTIVE_FILTERS
+
+    # data/cache/listings.parquet — 원본 CSV 가 바뀌면 자동 재생성
+    active_df = load_listings(filters=ACTIVE_FILTERS)
     cluster_df = pd.read_csv("data/processed/district_clustered.csv")
-    df = df.merge(
+    active_df = active_df.merge(
         cluster_df[["district", "cluster", "cluster_name"]],
         on="district", how="left",
     )
-    return df, cluster_df
+    return active_df, cluster_df
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_market_aggregates(stats_key):
+    """리스팅 캐시를 청크로 한 번 훑은 시장 집계 (listings_stream.MarketAggregates).
+
+    stats_key(district_features.stream_features_key) 가 바뀌면 다시 훑고 옛 집계는 버립니다.
+    """
+    from listings_cache import ensure_cache
+    from listings_stream import stream_aggregates
+    return stream_aggregates(ensure_cache())
 
-df, cluster_df = load_data()
-active_df = df[
-    (df["refined_status"] == "Active") & (df["operation_status"] == "Operating")
-].copy()
 
 # ── ML 모델 로드 ──────────────────────────────────────────────────────────────
-@st.cache_resource
+@st.cache_resource(show_spinner=False)
 def load_ml_models():
     try:
         from predict_utils import load_models
-        return load_models()
+        try:
+            return load_models(fmt="bundle")          # mmap 번들 (python model_bundle.py)
+        except FileNotFoundError:
+            return load_models(engine="numpy")
     except Exception:
         return None
 
 
-@st.cache_data
-def compute_district_stats(_active_df, _cluster_df):
-    """자치구별 ML 피처 구성에 필요한 통계 딕셔너리 반환."""
-    pop_map = _cluster_df.set_index("district")["median_pop"].to_dict()
-    result = {}
-    for district, grp in _active_df.groupby("district"):
-        entire_mask = grp["room_type"] == "entire_home"
-        result[district] = {
-            "median_revpar":          float(grp["ttm_revpar"].median()),
-            "listing_count":          len(grp),
-            "superhost_rate":         float(grp["superhost"].mean()) if "superhost" in grp.columns else 0.25,
-            "entire_home_rate":       float(entire_mask.mean()),
-            "photos_mean":            float(grp["photos_count"].mean()) if "photos_count" in grp.columns else 22.0,
-            "rating_mean":            float(grp["rating_overall"].mean()) if "rating_overall" in grp.columns else 4.7,
-            "reviews_mean":           float(grp["num_reviews"].mean()) if "num_reviews" in grp.columns else 20.0,
-            "min_nights_mean":        float(grp["min_nights"].mean()) if "min_nights" in grp.columns else 2.0,
-            "cluster":                int(grp["cluster"].mode().iloc[0]) if "cluster" in grp.columns and len(grp) > 0 else 2,
-            "ttm_pop_mode":           int(pop_map.get(district, 100_000)),
-        }
-    return result
+PREDICTION_CACHE_SIZE = 4096        # 항목당 ~1KB — 프로세스당 수 MB 이내
+PREDICTION_CACHE_TTL  = 6 * 3600    # 초
+
+
+@st.cache_resource(show_spinner=False)
+def load_prediction_cache():
+    """모든 세션이 공유하는 predict_revpar 결과 캐시 + 로드된 모델의 버전 (키에 포함)."""
+    from prediction_cache import PredictionCache
+    from predict_utils import models_version
+    try:
+        version = models_version(fmt="bundle")
+    except FileNotFoundError:
+        version = models_version(fmt="pickle")
+    return PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL), version
+
+
+@st.cache_resource(show_spinner=False)
+def load_poi_index():
+    """관광지 공간 인덱스 — 좌표 → 최근접 POI 거리·유형, 500m 이내 POI 수."""
+    from poi_index import PoiIndex
+    try:
+        return PoiIndex.from_csv()
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def load_drivers():
+    """클러스터·자치구별 평균 피처 기여 (python explain.py 로 생성).
+
+    없거나, 기록된 모델 버전이 지금 models/ 의 models_version() 과 다르면 None — 모델을 바꾼 뒤
+    explain.py 를 다시 돌리기 전까지 옛 기여도를 보여 주지 않습니다.
+    """
+    from explain import load_driver_summary
+    from predict_utils import models_version
+    try:
+        version = models_version()
+    except FileNotFoundError:
+        return None
+    return load_driver_summary(version=version)
+
+
+def district_stats_key(cluster_df):
+    """compute_district_stats 의 캐시 키 — 리스팅 캐시 메타데이터만 읽으므로 재실행마다 불러도 수 ms."""
+    from district_features import stream_features_key
+    return stream_features_key(cluster_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def compute_district_stats(stats_key, _cluster_df):
+    """자치구 → ML 피처 통계 dict (컬럼명은 district_lookup.csv 와 동일).
+
+    stats_key 가 캐시 키 — 원본 CSV(리스팅 캐시)나 district_clustered 가 바뀌면 키가 달라져
+    다시 집계합니다. load_market_aggregates() 의 스트리밍 집계 결과는
+    data/processed/district_features.parquet 에 키와 함께 저장돼 재시작 뒤에는 읽기만 합니다.
+    """
+    from district_features import load_stream_district_features
+    table = load_stream_district_features(
+        _cluster_df, lambda: load_market_aggregates(stats_key), key=stats_key)
+    return table.to_dict("index")
+
+
+@st.cache_resource(show_spinner=False)
+def build_cluster_index(_active_df):
+    """클러스터 번호 → (리스팅 슬라이스, PercentileIndex). 앱 수명 동안 1회 생성."""
+    from predict_utils import PercentileIndex
+    metrics = PercentileIndex.METRICS + ("ttm_avg_rate", "ttm_occupancy")
+    return {
+        int(c): (grp, PercentileIndex.from_frame(grp, metrics))
+        for c, grp in _active_df.groupby("cluster")
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def load_risk_engine(_active_df):
+    """월 손익 몬테카를로 엔진 (공통 난수 + 클러스터별 경험 분포 + 결과 캐시). 앱 수명 동안 1회."""
+    from profit_risk import ProfitRiskEngine
+    return ProfitRiskEngine.from_listings(_active_df)
+
+
+COMPS_K = 20
+
+
+@st.cache_resource(show_spinner=False)
+def build_comps_index(_active_df):
+    """클러스터별 유사 숙소 kNN 인덱스. 앱 수명 동안 1회 생성."""
+    from predict_utils import CompsIndex
+    return CompsIndex(_active_df)
+
+
+@st.cache_resource
+def cluster_positioning(_active_df, cluster_id):
+    """클러스터 포지셔닝 산점도 좌표 (ADR·예약률 클러스터 내 분위) — 클러스터별 1회 계산.
+
+    Returns (adr_pct, occ_pct) ndarray 쌍, 표본이 5개 이하이면 None.
+    """
+    entry = build_cluster_index(_active_df).get(cluster_id)
+    if entry is None:
+        return None
+    listings, pct = entry
+    if len(pct.sorted["ttm_avg_rate"]) <= 5 or len(pct.sorted["ttm_occupancy"]) <= 5:
+        return None
+    return (
+        pct.ranks("ttm_avg_rate", listings["ttm_avg_rate"], nan_rank=50.0),
+        pct.ranks("ttm_occupancy", listings["ttm_occupancy"], nan_rank=50.0),
+    )
+
+
+@st.cache_resource
+def positioning_background(_active_df, cluster_id, cluster_name):
+    """포지셔닝 차트의 정적 레이어 (사분면 배경 + 클러스터 산점도) — 클러스터별 1회 생성."""
+    from charts import positioning_base
+    positions = cluster_positioning(_active_df, cluster_id)
+    if positions is None:
+        return None
+    return positioning_base(*positions, f"{cluster_name} 포지셔닝")
+
+
+@st.cache_resource
+def start_warmup():
+    """결과 화면에 필요한 무거운 것들을 데몬 스레드에서 미리 로드 — 프로세스당 1회.
+
+    첫 화면을 그린 뒤 호출합니다. 사용자가 step5 에 먼저 도착하면 같은 캐시 함수의
+    키별 잠금에서 워밍업이 끝나기를 기다리므로 두 번 계산하지 않습니다.
+    """
+    def warm():
+        try:
+            import charts  # noqa: F401
+            load_ml_models()
+            load_prediction_cache()
+            active_df, cluster_df = load_data()
+            compute_district_stats(district_stats_key(cluster_df), cluster_df)
+            build_cluster_index(active_df)
+            build_comps_index(active_df)
+            load_risk_engine(active_df)
+            load_poi_index()
+            load_drivers()
+        except Exception:
+            pass   # step5 가 같은 함수를 다시 부르며 오류를 화면에 표시
+
+    thread = threading.Thread(target=warm, name="app-warmup", daemon=True)
+    thread.start()
+    return thread
 
 
 # ── 헬퍼 ─────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def build_bench_index():
+    """(district, room_type) 셀별 리스팅 수 + P5…P95 분위수 — data/cache/benchmark_table.npz."""
+    return load_benchmark_index()
+
 def get_bench(district, room_type):
-    return active_df[
-        (active_df["district"] == district) &
-        (active_df["room_type"] == room_type)
-    ]
+    return build_bench_index().cell(district, room_type)
 
 def bench_val(bench, col, default, pct=50):
-    if len(bench) > 0 and col in bench.columns:
-        vals = bench[col].dropna()
-        if len(vals) > 0:
-            return float(np.percentile(vals, pct))
-    return default
+    return bench.value(col, default, pct)
 
 def dn(district):
     """district 영문 → 한국어"""
     return DISTRICT_KR.get(district, district)
 
+def session_memo(name, key, compute):
+    """세션별 1칸 캐시 — key 가 직전 호출과 같으면 저장된 결과를, 다르면 compute() 를 새로 저장.
+
+    step5 의 무거운 계산(ML 예측·유사 숙소·헬스 스코어·요금 곡선)을 입력값이 바뀔 때만
+    다시 하도록 각 섹션이 자기 입력만으로 key 를 만듭니다. 이름당 최근 1개만 보관합니다.
+    """
+    memo = st.session_state.setdefault("_step5_memo", {})
+    hit = memo.get(name)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    value = compute()
+    memo[name] = (key, value)
+    return value
+
 # ── session_state 초기화 ──────────────────────────────────────────────────────
 def init_state():
     defaults = {
@@ -465,11 +605,11 @@ def build_listing_features(ss, dist_stats):
         "guests":                     my_guests,
         "room_type":                  ss.room_type,  # encoder trained on snake_case values
         "nearest_poi_type_name":      ss.my_poi_type,
-        "district_median_revpar":     d.get("median_revpar", 40_000),
-        "district_listing_count":     d.get("listing_count", 100),
-        "district_superhost_rate":    d.get("superhost_rate", 0.25),
-        "district_entire_home_rate":  d.get("entire_home_rate", 0.7),
-        "ttm_pop":                    d.get("ttm_pop_mode", 100_000),
+        "district_median_revpar":     d.get("district_median_revpar", 40_000),
+        "district_listing_count":     d.get("district_listing_count", 100),
+        "district_superhost_rate":    d.get("district_superhost_rate", 0.25),
+        "district_entire_home_rate":  d.get("district_entire_home_rate", 0.7),
+        "ttm_pop":                    d.get("ttm_pop", 100_000),
         # Model B
         "min_nights":              my_min_nights,
         "instant_book":            1 if bool(ss.my_instant) else 0,
@@ -492,13 +632,13 @@ def build_listing_features(ss, dist_stats):
 
 def compute_health_score(user_vals, cluster_listings):
     """클러스터 내 백분위 기반 5-컴포넌트 헬스 스코어 (0~100)."""
-    def pct_rank(value, series):
-        s = series.dropna()
-        return float(np.mean(s <= value) * 100) if len(s) > 0 else 50.0
+    from predict_utils import PercentileIndex
+    index = (cluster_listings if isinstance(cluster_listings, PercentileIndex)
+             else PercentileIndex.from_frame(cluster_listings))
 
     # 1. Review Signal
-    reviews_pct = pct_rank(user_vals["my_reviews"], cluster_listings["num_reviews"])
-    rating_pct  = pct_rank(user_vals["my_rating"],  cluster_listings["rating_overall"])
+    reviews_pct = index.pct_rank("num_reviews", user_vals["my_reviews"])
+    rating_pct  = index.pct_rank("rating_overall", user_vals["my_rating"])
     review_signal = (reviews_pct + rating_pct) / 2
 
     # 2. Listing Quality — 사진 최적 구간 23-35
@@ -514,27 +654,27 @@ def compute_health_score(user_vals, cluster_listings):
     # 3. Booking Policy
     instant_score = 100.0 if user_vals["my_instant"] else 0.0
     min_nights_pct = (
-        pct_rank(user_vals["my_min_nights"], cluster_listings["min_nights"])
-        if "min_nights" in cluster_listings.columns else 50.0
+        index.pct_rank("min_nights", user_vals["my_min_nights"])
+        if "min_nights" in index else 50.0
     )
     no_extra_fee_score = 100.0 if not user_vals["my_extra_fee"] else 0.0
     booking_policy = 0.4 * instant_score + 0.4 * (100 - min_nights_pct) + 0.2 * no_extra_fee_score
 
     # 4. Location — 거리 낮을수록 좋음
     poi_dist_pct = (
-        pct_rank(user_vals["my_poi_dist"], cluster_listings["nearest_poi_dist_km"])
-        if "nearest_poi_dist_km" in cluster_listings.columns else 50.0
+        index.pct_rank("nearest_poi_dist_km", user_vals["my_poi_dist"])
+        if "nearest_poi_dist_km" in index else 50.0
     )
     location = 100 - poi_dist_pct
 
     # 5. Listing Config
     bedrooms_pct = (
-        pct_rank(user_vals["my_bedrooms"], cluster_listings["bedrooms"])
-        if "bedrooms" in cluster_listings.columns else 50.0
+        index.pct_rank("bedrooms", user_vals["my_bedrooms"])
+        if "bedrooms" in index else 50.0
     )
     baths_pct = (
-        pct_rank(user_vals["my_baths"], cluster_listings["baths"])
-        if "baths" in cluster_listings.columns else 50.0
+        index.pct_rank("baths", user_vals["my_baths"])
+        if "baths" in index else 50.0
     )
     listing_config = (bedrooms_pct + baths_pct) / 2
 
@@ -570,7 +710,7 @@ def step1():
     col1, col2 = st.columns(2)
 
     with col1:
-        districts = sorted(df["district"].dropna().unique())
+        districts = sorted({d for d, _ in build_bench_index().cell_keys()})
         options = [f"{DISTRICT_KR.get(d, d)}" for d in districts]
         default_idx = districts.index("Mapo-gu") if "Mapo-gu" in districts else 0
         sel_idx = st.selectbox("📍 자치구", options, index=default_idx)
@@ -588,7 +728,7 @@ def step1():
 
     with col2:
         st.markdown("**🏠 숙소 종류**")
-        room_types = sorted(df["room_type"].dropna().unique())
+        room_types = sorted({rt for _, rt in build_bench_index().cell_keys()})
         for rt in room_types:
             selected = st.session_state.room_type == rt
             check = "✓  " if selected else ""
@@ -813,6 +953,19 @@ def step4():
         st.session_state.my_min_nights = my_min_nights
 
         st.markdown("**📍 위치 정보**")
+        poi_index = load_poi_index()
+        if poi_index is not None:
+            with st.expander("🗺️ 숙소 좌표로 자동 입력"):
+                g1, g2 = st.columns(2)
+                my_lat = g1.number_input("위도", 37.40, 37.75, 37.5665, 0.0001, format="%.4f")
+                my_lng = g2.number_input("경도", 126.75, 127.20, 126.9780, 0.0001, format="%.4f")
+                if st.button("가까운 관광지 찾기", key="poi_lookup", use_container_width=True):
+                    poi = poi_index.features(my_lat, my_lng).iloc[0]
+                    st.session_state.my_poi_dist = round(min(float(poi["nearest_poi_dist_km"]), 5.0), 2)
+                    st.session_state.my_500m = int(poi["poi_count_500m"])
+                    st.session_state.my_poi_type = poi["nearest_poi_type_name"]
+                    st.rerun()
+                st.caption("관광지 5,000여 곳 중 가장 가까운 곳의 거리·유형과 500m 이내 관광지 수를 채웁니다.")
         default_poi = float(st.session_state.my_poi_dist) if st.session_state.my_poi_dist is not None else round(bench_val(bench, "nearest_poi_dist_km", 0.10), 2)
         my_poi_dist = st.number_input("가장 가까운 관광지까지 거리 (km)", 0.0, 5.0, default_poi, 0.01)
         st.session_state.my_poi_dist = my_poi_dist
@@ -841,6 +994,111 @@ def step4():
 # ═══════════════════════════════════════════════════════════════════════════════
 # STEP 5 — 결과 대시보드
 # ═══════════════════════════════════════════════════════════════════════════════
+# ── 결과 화면: 요금 시뮬레이션 (fragment) ─────────────────────────────────────
+# 1% 간격 그리드 → 슬라이더(5% 단위) 값이 모두 그리드 위에 있음
+SIM_DELTAS = np.linspace(-0.30, 0.50, 81)
+
+
+@st.fragment
+def render_price_simulation(sim_curve, my_adr, my_occ, my_revpar, net_profit, total_opex,
+                            elasticity, cluster_name):
+    """섹션 E — 요금 변화율 슬라이더 + 변경 전후 표 + 순이익 곡선.
+
+    st.fragment 라서 슬라이더를 움직이면 이 함수만 다시 실행되고, 나머지 step5 섹션은
+    직전 실행 결과가 그대로 남습니다. sim_curve 는 step5 에서 session_memo 로 계산해
+    넘기므로 여기서는 슬라이더 위치에 따른 조회와 그리기만 합니다.
+    """
+    from charts import PLOTLY_KW, profit_curve
+
+    if sim_curve is not None:
+        # ML: 요금별 Model B 예약률 재예측 (그리드 전체 1회 배치 호출)
+        occ_curve  = sim_curve["Occ_pred"]
+        revp_curve = sim_curve["RevPAR_pred"]
+        profits    = sim_curve["net_profit"]
+        cur_occ, cur_revp, cur_net = occ_curve[30], revp_curve[30], profits[30]
+        occ_resp = (occ_curve[40] / cur_occ - 1) if cur_occ > 0 else 0.0
+        sim_sub  = (f"ML 예약률 모델 기준, 요금을 10% 올리면 예약률이 약 "
+                    f"{abs(occ_resp)*100:.0f}% {'하락' if occ_resp < 0 else '상승'}합니다.")
+    else:
+        # 공식: 클러스터 평균 탄력성 상수
+        occ_curve  = np.clip(my_occ * (1 + elasticity * SIM_DELTAS), 0.0, 1.0)
+        revp_curve = my_adr * (1 + SIM_DELTAS) * occ_curve
+        profits    = revp_curve * 30 * 0.97 - total_opex
+        cur_occ, cur_revp, cur_net = my_occ, my_revpar, net_profit
+        sim_sub  = f"이 지역({cluster_name})은 요금을 10% 올리면 예약률이 약 {abs(elasticity)*10:.0f}% 변화합니다."
+
+    section_title("📊 요금 변경 시뮬레이션", sim_sub)
+
+    delta_pct = st.slider("요금 변화율 (%)", -30, 50, 0, 5,
+                          help="오른쪽: 요금 인상 / 왼쪽: 요금 인하")
+    delta    = delta_pct / 100
+    new_adr  = my_adr * (1 + delta)
+    new_occ  = float(occ_curve[delta_pct + 30])
+    new_revp = float(revp_curve[delta_pct + 30])
+    new_net  = float(profits[delta_pct + 30])
+    p_change = new_net - cur_net
+
+    col_s1, col_s2 = st.columns(2)
+
+    with col_s1:
+        sim_rows = [
+            ("1박 요금", f"₩{int(my_adr):,}", f"₩{int(new_adr):,}", f"{delta_pct:+d}%"),
+            ("예약률", f"{cur_occ:.0%}", f"{new_occ:.0%}", f"{(new_occ-cur_occ)*100:+.1f}%p"),
+            ("하루 실수익", f"₩{int(cur_revp):,}", f"₩{int(new_revp):,}",
+             f"{(new_revp/cur_revp-1)*100:+.1f}%" if cur_revp > 0 else "-"),
+            ("월 순이익", f"₩{int(cur_net):,}", f"₩{int(new_net):,}", f"₩{p_change:+,.0f}"),
+        ]
+        html = ('<div style="background:white;border-radius:12px;padding:20px;'
+                'box-shadow:0 2px 10px rgba(0,0,0,0.06);">'
+                '<div style="display:grid;grid-template-columns:2fr 1fr 1fr 1fr;'
+                'color:#888;font-size:12px;font-weight:600;padding-bottom:8px;'
+                'border-bottom:1.5px solid #F0F0F0;margin-bottom:4px;">'
+                '<span>항목</span><span style="text-align:right;">현재</span>'
+                '<span style="text-align:right;">변경 후</span>'
+                '<span style="text-align:right;">변화</span></div>')
+        for label, cur, nxt, chg in sim_rows:
+            w = "700" if "순이익" in label else "400"
+            chg_c = "#2E7D32" if ("+" in chg and "₩-" not in chg) else "#C62828" if ("-" in chg and "₩+" not in chg) else "#484848"
+            html += (f'<div style="display:grid;grid-template-columns:2fr 1fr 1fr 1fr;'
+                     f'padding:9px 0;border-bottom:1px solid #F5F5F5;font-weight:{w};">'
+                     f'<span style="font-size:13px;">{label}</span>'
+                     f'<span style="text-align:right;font-size:13px;">{cur}</span>'
+                     f'<span style="text-align:right;font-size:13px;">{nxt}</span>'
+                     f'<span style="text-align:right;font-size:13px;color:{chg_c};">{chg}</span></div>')
+        html += "</div>"
+        st.markdown(html, unsafe_allow_html=True)
+
+        if delta_pct == 0:
+            st.info("슬라이더를 움직여 요금 변화 효과를 확인하세요.")
+        elif delta_pct > 0 and p_change > 0:
+            st.success(f"✅ 요금 인상 효과 있음 — 순이익 ₩{p_change:+,.0f} 증가")
+        elif delta_pct > 0:
+            st.error(f"❌ 요금 인상이 역효과 — 예약률 하락으로 순이익 ₩{abs(p_change):,.0f} 감소")
+        elif p_change > 0:
+            st.success(f"✅ 요금 인하로 예약률 상승 → 순이익 ₩{p_change:+,.0f} 증가")
+        else:
+            st.warning(f"⚠️ 요금 인하 시 순이익 ₩{abs(p_change):,.0f} 감소")
+
+    with col_s2:
+        band_pct = None
+        if sim_curve is not None and sim_curve["adr_bounds"] is not None:
+            band_pct = tuple(b / my_adr * 100 - 100 for b in sim_curve["adr_bounds"])
+        st.plotly_chart(profit_curve(SIM_DELTAS, profits, delta_pct, new_net, band_pct),
+                        **PLOTLY_KW)
+
+        if sim_curve is not None:
+            best_adr  = sim_curve["best_ADR"]
+            best_prof = sim_curve["best_net_profit"]
+        else:
+            best_idx  = int(np.argmax(profits))
+            best_adr  = my_adr * (1 + SIM_DELTAS[best_idx])
+            best_prof = profits[best_idx]
+        st.success(f"🎯 순이익 최대 요금: ₩{int(best_adr):,} ({(best_adr/my_adr-1)*100:+.0f}%) → 월 ₩{int(best_prof):,}")
+        if sim_curve is not None and sim_curve["adr_bounds"] is not None:
+            _lo, _hi = sim_curve["adr_bounds"]
+            st.caption(f"최적 요금은 같은 시장 유형 요금의 중간 50% 구간(₩{int(_lo):,}~₩{int(_hi):,}) 안에서 찾습니다.")
+
+
 def step5():
     # ── 값 수집 ─────────────────────────────────────────────────────────────
     district      = st.session_state.district
@@ -869,16 +1127,25 @@ def step5():
     }
     total_opex = sum(opex_items.values())
 
+    import pandas as pd
+    from charts import PLOTLY_KW, opex_pie, positioning_chart
+    from predict_utils import PercentileIndex
+
     # ── ML 모델 실행 ─────────────────────────────────────────────────────────
+    active_df, cluster_df = load_data()
     _ml_artifacts = load_ml_models()
-    _dist_stats   = compute_district_stats(active_df, cluster_df)
+    _dist_stats   = compute_district_stats(district_stats_key(cluster_df), cluster_df)
     ml_result = None
     ml_error  = None
     if _ml_artifacts is not None:
         try:
             _features = build_listing_features(st.session_state, _dist_stats)
-            from predict_utils import predict_revpar
-            ml_result = predict_revpar(_features, total_opex, **_ml_artifacts)
+            _features_key = tuple(sorted(_features.items()))
+            _pred_cache, _model_version = load_prediction_cache()
+            ml_result = session_memo(
+                "ml_result", (_features_key, total_opex),
+                lambda: _pred_cache.predict(_features, total_opex, version=_model_version,
+                                            **_ml_artifacts))
         except Exception as _e:
             ml_error = str(_e)
 
@@ -987,6 +1254,15 @@ def step5():
                 revp_pred, my_revpar,
                 "₩{:,.0f}", "₩{:,.0f}", my_revpar - revp_pred)
 
+        # 예측 구간 (models/conformal.json 이 있을 때만 결과에 포함)
+        if "RevPAR_lo" in ml_result:
+            st.caption(
+                f"80% 예측 구간 — ADR ₩{ml_result['ADR_lo']:,.0f} ~ ₩{ml_result['ADR_hi']:,.0f} · "
+                f"예약률 {ml_result['Occ_lo']:.0%} ~ {ml_result['Occ_hi']:.0%} · "
+                f"RevPAR ₩{ml_result['RevPAR_lo']:,.0f} ~ ₩{ml_result['RevPAR_hi']:,.0f} · "
+                f"월 순이익 ₩{ml_result['net_profit_lo']:,.0f} ~ ₩{ml_result['net_profit_hi']:,.0f}"
+            )
+
         # 가격 갭 해석 박스
         gap_pct = (price_gap / adr_pred * 100) if adr_pred > 0 else 0
         if gap_pct > 10:
@@ -1009,6 +1285,70 @@ def step5():
             unsafe_allow_html=True,
         )
 
+        # 분리형 기여도 — 같은 시장 유형 리스팅의 평균 (explain.py 가 미리 집계, 요청당 계산 없음)
+        _drivers = load_drivers()
+        _driver_key = ("cluster", str(_dist_stats.get(district, {}).get("cluster", 2)))
+        if _drivers is not None and _driver_key in _drivers.index:
+            from explain import top_drivers
+            _row = _drivers.loc[_driver_key]
+            _price = " · ".join(f"{label} {'+' if v >= 0 else '-'}₩{abs(v):,.0f}" for label, v in top_drivers(_row, "price"))
+            _demand = " · ".join(f"{label} {v * 100:+.1f}%p" for label, v in top_drivers(_row, "demand"))
+            st.markdown(
+                f'<div style="background:#F3F4F6;border-radius:10px;padding:14px 18px;margin-top:10px;">'
+                f'<div style="font-size:13px;color:#484848;font-weight:600;margin-bottom:6px;">'
+                f'📊 이 시장 유형 숙소들의 요금·예약률 요인 (평균 {_row["n"]:,.0f}곳)</div>'
+                f'<div style="font-size:12px;color:#484848;">요금: {_price}</div>'
+                f'<div style="font-size:12px;color:#484848;">예약률: {_demand}</div>'
+                f'<div style="font-size:11px;color:#AAAAAA;margin-top:6px;">'
+                f'서울 전체 기준값(ADR ₩{_row["ADR_base"]:,.0f} · 예약률 {_row["Occ_base"]:.0%}) 대비 '
+                f'피처 기여 (LightGBM TreeSHAP)</div>'
+                f'</div>',
+                unsafe_allow_html=True,
+            )
+
+    # ── 섹션 A'': 유사 숙소 (comps) ─────────────────────────────────────────
+    st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
+    _comps_cluster = _dist_stats.get(district, {}).get("cluster", 2)
+    _comps_query = {
+        "bedrooms": my_bedrooms, "baths": my_baths, "guests": my_guests,
+        "nearest_poi_dist_km": my_poi_dist, "rating_overall": my_rating,
+        "photos_count": my_photos, "room_type": room_type,
+    }
+    comps = session_memo(
+        "comps", (_comps_cluster, tuple(_comps_query.items())),
+        lambda: build_comps_index(active_df).query(_comps_cluster, _comps_query, k=COMPS_K))
+    section_title(
+        "👥 나와 가장 비슷한 숙소",
+        f"같은 시장 유형에서 침실·욕실·인원·관광지 거리·평점·사진 수가 가장 비슷한 "
+        f"실운영 숙소 {comps['k']}곳의 성과입니다.",
+    )
+    if comps["k"] == 0:
+        st.info("같은 시장 유형의 비교 숙소가 없습니다.")
+    else:
+        cs = comps["summary"]
+        c1, c2, c3 = st.columns(3)
+        kpi_card(c1, "비슷한 숙소 요금 (중앙값)", f"₩{cs['ttm_avg_rate']['p50']:,.0f}",
+                 f"중간 50%: ₩{cs['ttm_avg_rate']['p25']:,.0f} ~ ₩{cs['ttm_avg_rate']['p75']:,.0f}")
+        kpi_card(c2, "비슷한 숙소 예약률 (중앙값)", f"{cs['ttm_occupancy']['p50']:.0%}",
+                 f"중간 50%: {cs['ttm_occupancy']['p25']:.0%} ~ {cs['ttm_occupancy']['p75']:.0%}")
+        comp_revpar = cs["ttm_revpar"]["p50"]
+        kpi_card(c3, "비슷한 숙소 하루 실수익 (중앙값)", f"₩{comp_revpar:,.0f}",
+                 f"내 숙소 {'▲' if my_revpar >= comp_revpar else '▼'}₩{abs(my_revpar - comp_revpar):,.0f}",
+                 "#2E7D32" if my_revpar >= comp_revpar else "#C62828")
+        with st.expander(f"비슷한 숙소 {comps['k']}곳 보기"):
+            table = comps["listings"]
+            st.dataframe(
+                pd.DataFrame({
+                    "자치구": table["district"].astype(str).map(dn),
+                    "유형": table["room_type"].astype(str).map(lambda r: ROOM_TYPE_KR.get(r, r)),
+                    "침실": table["bedrooms"], "욕실": table["baths"], "인원": table["guests"],
+                    "관광지 거리(km)": table["nearest_poi_dist_km"].round(2),
+                    "평점": table["rating_overall"], "사진": table["photos_count"],
+                    "요금": table["ttm_avg_rate"].round(-2), "예약률": (table["ttm_occupancy"] * 100).round(1),
+                }),
+                hide_index=True, use_container_width=True,
+            )
+
     # ── 섹션 B: 적정 요금 추천 ──────────────────────────────────────────────
     st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
     section_title("💡 내 숙소에 맞는 적정 요금", "내 운영 단계에 따라 추천 요금 구간이 달라집니다.")
@@ -1104,23 +1444,32 @@ def step5():
         else:
             st.error(f"❌ 월 ₩{int(abs(net_profit)):,} 적자입니다. 요금 인상 또는 운영비 절감이 필요합니다.")
 
-    with col_pie:
-        nonzero = {k: v for k, v in opex_items.items() if v > 0}
-        if nonzero and total_opex > 0:
-            fig, ax = plt.subplots(figsize=(4.5, 4))
-            colors = ["#FF5A5F", "#FF8A8D", "#FFB3B5", "#00A699", "#4DB6AC", "#FFB400", "#EBEBEB"]
-            ax.pie(
-                nonzero.values(), labels=nonzero.keys(),
-                autopct="%1.0f%%", startangle=90,
-                colors=colors[:len(nonzero)],
-                textprops={"fontsize": 10},
-                wedgeprops={"linewidth": 1, "edgecolor": "white"},
+        # 나쁜 달 위험 — ML 예측 구간(있으면) 또는 같은 클러스터의 요금·예약률 분포로 흔든 시나리오
+        _risk_interval = ml_result if ml_result is not None and "ADR_hi" in ml_result else None
+        try:
+            risk = load_risk_engine(active_df).simulate(
+                my_adr, my_occ, opex_items, interval=_risk_interval,
+                cluster=_dist_stats.get(district, {}).get("cluster", 2))
+        except ValueError:
+            risk = None
+        if risk is not None:
+            _risk_basis = "ML 예측 구간" if risk["source"] == "interval" else "같은 시장 유형 숙소의 요금·예약률 분포"
+            _loss_color = "#C62828" if risk["loss_prob"] >= 0.2 else "#767676"
+            st.markdown(
+                f'<div style="background:#FAFAFA;border-radius:10px;padding:14px 16px;margin-top:8px;">'
+                f'<div style="font-size:13px;font-weight:700;color:#484848;margin-bottom:6px;">🎲 나쁜 달 시나리오</div>'
+                f'<div style="font-size:13px;color:{_loss_color};">적자 확률 {risk["loss_prob"]:.0%}</div>'
+                f'<div style="font-size:12px;color:#767676;margin-top:4px;">'
+                f'월 순이익 하위 10% ₩{int(risk["p10"]):,} · 중앙 ₩{int(risk["p50"]):,} · 상위 10% ₩{int(risk["p90"]):,}</div>'
+                f'<div style="font-size:12px;color:#767676;">최악 10% 달의 평균 ₩{int(risk["expected_shortfall"]):,}</div>'
+                f'<div style="font-size:11px;color:#AAAAAA;margin-top:6px;">'
+                f'{_risk_basis} · 운영비 변동을 반영한 {risk["n"]:,}개 시나리오 기준</div></div>',
+                unsafe_allow_html=True,
             )
-            ax.set_title(f"월 운영비 구성 (총 ₩{total_opex:,})", fontsize=11)
-            fig.patch.set_facecolor("#FAFAFA")
-            fig.tight_layout()
-            st.pyplot(fig)
-            plt.close()
+
+    with col_pie:
+        if total_opex > 0 and any(v > 0 for v in opex_items.values()):
+            st.plotly_chart(opex_pie(opex_items), **PLOTLY_KW)
         else:
             st.info("운영비를 입력하면 구성 차트가 표시됩니다.")
 
@@ -1285,7 +1634,9 @@ def step5():
     section_title("💊 숙소 헬스 스코어", "클러스터 내 유사 숙소와 비교한 5가지 운영 건강도 지표입니다.")
 
     _cluster_id = _dist_stats.get(district, {}).get("cluster", 2)
-    _cluster_listings = active_df[active_df["cluster"] == _cluster_id].copy()
+    _cluster_listings, _cluster_pct = build_cluster_index(active_df).get(
+        int(_cluster_id), (active_df.iloc[:0], PercentileIndex.from_frame(active_df.iloc[:0]))
+    )
 
     _user_vals = {
         "my_reviews":    my_reviews,
@@ -1298,7 +1649,8 @@ def step5():
         "my_bedrooms":   my_bedrooms,
         "my_baths":      my_baths,
     }
-    _hs = compute_health_score(_user_vals, _cluster_listings)
+    _hs = session_memo("health", (int(_cluster_id), tuple(_user_vals.items())),
+                       lambda: compute_health_score(_user_vals, _cluster_pct))
     _score     = _hs["composite"]
     _grade     = _hs["grade"]
     _comps     = _hs["components"]
@@ -1368,153 +1720,44 @@ def step5():
 
     # ── 섹션 E: 요금 시뮬레이션 ────────────────────────────────────────────
     st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
-    section_title(
-        "📊 요금 변경 시뮬레이션",
-        f"이 지역({cluster_name})은 요금을 10% 올리면 예약률이 약 {abs(elasticity)*10:.0f}% 변화합니다.",
-    )
-
-    delta_pct = st.slider("요금 변화율 (%)", -30, 50, 0, 5,
-                          help="오른쪽: 요금 인상 / 왼쪽: 요금 인하")
-    delta    = delta_pct / 100
-    new_adr  = my_adr * (1 + delta)
-    new_occ  = min(1.0, max(0.0, my_occ * (1 + elasticity * delta)))
-    new_revp = new_adr * new_occ
-    new_net  = new_revp * 30 * 0.97 - total_opex
-    p_change = new_net - net_profit
 
-    col_s1, col_s2 = st.columns(2)
-
-    with col_s1:
-        sim_rows = [
-            ("1박 요금", f"₩{int(my_adr):,}", f"₩{int(new_adr):,}", f"{delta_pct:+d}%"),
-            ("예약률", f"{my_occ:.0%}", f"{new_occ:.0%}", f"{(new_occ-my_occ)*100:+.1f}%p"),
-            ("하루 실수익", f"₩{int(my_revpar):,}", f"₩{int(new_revp):,}",
-             f"{(new_revp/my_revpar-1)*100:+.1f}%" if my_revpar > 0 else "-"),
-            ("월 순이익", f"₩{int(net_profit):,}", f"₩{int(new_net):,}", f"₩{p_change:+,.0f}"),
-        ]
-        html = ('<div style="background:white;border-radius:12px;padding:20px;'
-                'box-shadow:0 2px 10px rgba(0,0,0,0.06);">'
-                '<div style="display:grid;grid-template-columns:2fr 1fr 1fr 1fr;'
-                'color:#888;font-size:12px;font-weight:600;padding-bottom:8px;'
-                'border-bottom:1.5px solid #F0F0F0;margin-bottom:4px;">'
-                '<span>항목</span><span style="text-align:right;">현재</span>'
-                '<span style="text-align:right;">변경 후</span>'
-                '<span style="text-align:right;">변화</span></div>')
-        for label, cur, nxt, chg in sim_rows:
-            w = "700" if "순이익" in label else "400"
-            chg_c = "#2E7D32" if ("+" in chg and "₩-" not in chg) else "#C62828" if ("-" in chg and "₩+" not in chg) else "#484848"
-            html += (f'<div style="display:grid;grid-template-columns:2fr 1fr 1fr 1fr;'
-                     f'padding:9px 0;border-bottom:1px solid #F5F5F5;font-weight:{w};">'
-                     f'<span style="font-size:13px;">{label}</span>'
-                     f'<span style="text-align:right;font-size:13px;">{cur}</span>'
-                     f'<span style="text-align:right;font-size:13px;">{nxt}</span>'
-                     f'<span style="text-align:right;font-size:13px;color:{chg_c};">{chg}</span></div>')
-        html += "</div>"
-        st.markdown(html, unsafe_allow_html=True)
-
-        if delta_pct == 0:
-            st.info("슬라이더를 움직여 요금 변화 효과를 확인하세요.")
-        elif delta_pct > 0 and p_change > 0:
-            st.success(f"✅ 요금 인상 효과 있음 — 순이익 ₩{p_change:+,.0f} 증가")
-        elif delta_pct > 0:
-            st.error(f"❌ 요금 인상이 역효과 — 예약률 하락으로 순이익 ₩{abs(p_change):,.0f} 감소")
-        elif p_change > 0:
-            st.success(f"✅ 요금 인하로 예약률 상승 → 순이익 ₩{p_change:+,.0f} 증가")
-        else:
-            st.warning(f"⚠️ 요금 인하 시 순이익 ₩{abs(p_change):,.0f} 감소")
-
-    with col_s2:
-        x_range = np.linspace(-0.30, 0.50, 80)
-        profits = [
-            my_adr*(1+d) * min(1., max(0., my_occ*(1+elasticity*d))) * 30 * 0.97 - total_opex
-            for d in x_range
-        ]
-        fig4, ax4 = plt.subplots(figsize=(5.5, 4))
-        ax4.plot(x_range * 100, profits, color="#FF5A5F", linewidth=2.5)
-        ax4.axhline(0, color="#767676", linestyle="--", lw=1.2, alpha=0.6, label="손익분기선")
-        ax4.axvline(delta_pct, color="#FFB400", linestyle="--", lw=1.5, label=f"현재 ({delta_pct:+d}%)")
-        ax4.scatter([delta_pct], [new_net], color="#FFB400", s=70, zorder=6)
-        ax4.fill_between(x_range*100, profits, 0, where=[p > 0 for p in profits], alpha=0.07, color="#4CAF50")
-        ax4.fill_between(x_range*100, profits, 0, where=[p <= 0 for p in profits], alpha=0.07, color="#FF5A5F")
-        ax4.set_xlabel("요금 변화율 (%)")
-        ax4.set_ylabel("월 순이익 (원)")
-        ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda y, _: f"₩{y/10000:.0f}만"))
-        ax4.legend(fontsize=8)
-        ax4.spines["top"].set_visible(False)
-        ax4.spines["right"].set_visible(False)
-        ax4.set_facecolor("#FAFAFA")
-        fig4.patch.set_facecolor("#FAFAFA")
-        fig4.tight_layout()
-        st.pyplot(fig4)
-        plt.close()
-
-        best_idx  = int(np.argmax(profits))
-        best_adr  = my_adr * (1 + x_range[best_idx])
-        best_prof = profits[best_idx]
-        st.success(f"🎯 순이익 최대 요금: ₩{int(best_adr):,} ({x_range[best_idx]*100:+.0f}%) → 월 ₩{int(best_prof):,}")
+    sim_curve = None
+    if ml_result is not None:
+        try:
+            from predict_utils import simulate_price_curve
+            _adr_q = _cluster_listings["ttm_avg_rate"].quantile([0.25, 0.75])
+            _adr_bounds = (float(_adr_q.iloc[0]), float(_adr_q.iloc[1])) if _adr_q.notna().all() else None
+            sim_curve = session_memo(
+                "sim_curve", (_features_key, total_opex, my_adr, _adr_bounds),
+                lambda: simulate_price_curve(
+                    _features, total_opex,
+                    prices=my_adr * (1 + SIM_DELTAS),
+                    adr_bounds=_adr_bounds,
+                    fee_rate=0.03,
+                    **_ml_artifacts,
+                ))
+        except Exception:
+            sim_curve = None
+
+    # 슬라이더는 fragment 안 — 움직이면 이 섹션만 다시 실행됩니다
+    render_price_simulation(sim_curve, my_adr, my_occ, my_revpar, net_profit, total_opex,
+                            elasticity, cluster_name)
 
     # ── 섹션 F': 포지셔닝 매트릭스 + 시장 유형 ─────────────────────────────
     st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
     section_title("📍 클러스터 포지셔닝 매트릭스", "같은 시장 유형 내 숙소 대비 내 위치입니다.")
 
     # ── 사분면 산점도 ───────────────────────────────────────────────────────
-    _cl = _cluster_listings.copy()
-    _adr_vals = _cl["ttm_avg_rate"].dropna()
-    _occ_vals = _cl["ttm_occupancy"].dropna()
+    _q_base = positioning_background(active_df, int(_cluster_id), cluster_name)
 
-    if len(_adr_vals) > 5 and len(_occ_vals) > 5:
-        _cl["adr_pct"] = _cl["ttm_avg_rate"].apply(
-            lambda x: float(np.mean(_adr_vals <= x) * 100) if not pd.isna(x) else 50.0
-        )
-        _cl["occ_pct"] = _cl["ttm_occupancy"].apply(
-            lambda x: float(np.mean(_occ_vals <= x) * 100) if not pd.isna(x) else 50.0
-        )
-        user_adr_pct = float(np.mean(_adr_vals <= my_adr) * 100)
-        user_occ_pct = float(np.mean(_occ_vals <= my_occ) * 100)
+    if _q_base is not None:
+        # 사분면 배경·클러스터 점들은 클러스터별 캐시, 내 숙소(별)만 입력값으로 다시 그림
+        user_adr_pct = _cluster_pct.pct_rank("ttm_avg_rate", my_adr)
+        user_occ_pct = _cluster_pct.pct_rank("ttm_occupancy", my_occ)
 
         _qcols = st.columns([1, 1])
         with _qcols[0]:
-            fig_q, ax_q = plt.subplots(figsize=(5, 5))
-            # 사분면 배경
-            ax_q.axhspan(50, 100, xmin=0,   xmax=0.5, alpha=0.06, color="#FFB400")   # 물량형
-            ax_q.axhspan(50, 100, xmin=0.5, xmax=1.0, alpha=0.06, color="#2E7D32")   # 고수익형
-            ax_q.axhspan(0,  50,  xmin=0,   xmax=0.5, alpha=0.06, color="#C62828")   # 침체형
-            ax_q.axhspan(0,  50,  xmin=0.5, xmax=1.0, alpha=0.06, color="#FF8C00")   # 고가위험형
-            ax_q.axhline(50, color="#CCCCCC", lw=1, ls="--")
-            ax_q.axvline(50, color="#CCCCCC", lw=1, ls="--")
-            # 사분면 레이블
-            ax_q.text(25, 75, "물량형",   ha="center", va="center", fontsize=9, color="#B45309", alpha=0.7)
-            ax_q.text(75, 75, "고수익형", ha="center", va="center", fontsize=9, color="#1B5E20", alpha=0.7)
-            ax_q.text(25, 25, "침체형",   ha="center", va="center", fontsize=9, color="#B71C1C", alpha=0.7)
-            ax_q.text(75, 25, "고가위험형", ha="center", va="center", fontsize=9, color="#E65100", alpha=0.7)
-            # 클러스터 전체 산점도
-            ax_q.scatter(
-                _cl["adr_pct"].dropna(), _cl["occ_pct"].dropna(),
-                s=15, alpha=0.18, color="#9CA3AF", zorder=2,
-            )
-            # 내 숙소
-            ax_q.scatter(
-                [user_adr_pct], [user_occ_pct],
-                s=200, marker="*", color="#FF5A5F", zorder=5, label="내 숙소",
-            )
-            ax_q.annotate(
-                "내 숙소",
-                (user_adr_pct, user_occ_pct),
-                textcoords="offset points", xytext=(8, 6),
-                fontsize=9, color="#FF5A5F", fontweight="bold",
-            )
-            ax_q.set_xlim(0, 100)
-            ax_q.set_ylim(0, 100)
-            ax_q.set_xlabel("ADR 분위 (클러스터 내, %)", fontsize=9)
-            ax_q.set_ylabel("예약률 분위 (클러스터 내, %)", fontsize=9)
-            ax_q.set_title(f"{cluster_name} 포지셔닝", fontsize=10, fontweight="bold")
-            ax_q.spines["top"].set_visible(False)
-            ax_q.spines["right"].set_visible(False)
-            ax_q.set_facecolor("#FAFAFA")
-            fig_q.patch.set_facecolor("#FAFAFA")
-            fig_q.tight_layout()
-            st.pyplot(fig_q)
-            plt.close()
+            st.plotly_chart(positioning_chart(_q_base, user_adr_pct, user_occ_pct), **PLOTLY_KW)
 
             # 사분면 위치 텍스트
             if user_adr_pct >= 50 and user_occ_pct >= 50:
@@ -1602,3 +1845,5 @@ elif step == 4:
     step4()
 else:
     step5()
+
+start_warmup()
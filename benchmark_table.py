@@ -0,0 +1,303 @@
+"""
+benchmark_table.py — (district, room_type) 벤치마크 인덱스 + 마법사 1~4단계용 사전 집계 테이블
+==============================================================================================
+
+1~4단계 화면은 선택한 자치구·숙소 유형의 리스팅 수와 P25/P50/P75 몇 개만 씁니다.
+이를 위해 32,061행 리스팅 전체를 읽고 BenchmarkIndex 를 만드는 대신, 셀 × 컬럼별
+P5…P95 만 담은 작은 배열 묶음을 data/cache/benchmark_table.npz 에 저장해 두고
+읽습니다. 이 모듈은 numpy 만 import 하므로 첫 화면은 pandas·pyarrow 없이 그려지고,
+리스팅 전체는 결과 화면(step5)에서 처음 필요할 때 로드됩니다.
+
+사용법:
+    python benchmark_table.py                   # 스냅숏에서 스케치 저장소 + 테이블 (재)생성
+    python quantile_sketch.py update batch.csv  # 새 배치만 저장소에 더하고 테이블 갱신
+
+    from benchmark_table import load_benchmark_index
+    index = load_benchmark_index()              # 행 위치 없는 셀 (리스팅 수 + P5…P95)
+    cell = index.cell("Mapo-gu", "entire_home")
+    len(cell), cell.value("ttm_revpar", 40000, 50)
+
+    from benchmark_table import BenchmarkIndex  # 리스팅 프레임에서 직접 (predict_utils 에서도 import 가능)
+    index = BenchmarkIndex(active_df, BENCH_COLUMNS)
+
+캐시 무효화:
+    테이블에 TABLE_VERSION 과 만들 때의 원본 CSV·리스팅 캐시 크기·수정 시각을 기록하고,
+    현재 있는 파일 중 하나라도 다르면 다시 만듭니다. 원본 CSV 도 리스팅 캐시도 없는
+    배포 환경에서는 테이블을 그대로 읽습니다.
+"""
+
+from pathlib import Path
+import json
+import os
+
+import numpy as np
+
+ROOT = Path(__file__).parent
+TABLE_PATH = ROOT / "data" / "cache" / "benchmark_table.npz"
+# listings_cache.RAW_CSV / CACHE_PATH 와 같은 경로 — 신선도 확인에 pandas 를 import 하지 않으려고 다시 정의
+_RAW_CSV = ROOT / "data" / "raw" / "final_seoul_airbnb_cleaned.csv"
+_LISTINGS_CACHE = ROOT / "data" / "cache" / "listings.parquet"
+
+# 컬럼·필터·분위수 그리드·집계 방식을 바꾸면 올려서 저장된 테이블을 무효화
+TABLE_VERSION = 2         # 2: 스트리밍 스케치 집계 (write_benchmark_table)
+
+KEYS = ("district", "room_type")
+BENCH_COLUMNS = (
+    "ttm_avg_rate", "ttm_occupancy", "ttm_revpar", "bedrooms", "baths", "guests",
+    "num_reviews", "rating_overall", "photos_count", "min_nights", "nearest_poi_dist_km",
+)
+
+
+class BenchmarkCell:
+    """BenchmarkIndex 의 (district, room_type) 셀 — 행 위치와 컬럼별 분위수 테이블.
+
+    저장된 테이블(BenchmarkIndex.from_arrays)에서 만든 셀은 행 위치 없이
+    리스팅 수(n)와 분위수만 가집니다.
+    """
+
+    __slots__ = ("rows", "quantiles", "_values", "n")
+
+    def __init__(self, rows: np.ndarray | None, quantiles: dict, values: dict, n: int | None = None):
+        self.rows = rows
+        self.quantiles = quantiles
+        self._values = values
+        self.n = len(rows) if n is None else int(n)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def value(self, col: str, default, pct=50):
+        """col 의 pct 분위수 — 셀이 비었거나 컬럼이 없거나 전부 NaN 이면 default.
+
+        pct 가 P5…P95 (5 단위) 이면 미리 계산한 테이블에서 읽고, 그 밖의 값은
+        셀의 행 위치로 즉석 계산합니다. 어느 쪽이든 np.percentile 과 같은 값입니다.
+        저장된 테이블에서 만든 셀(행 위치 없음)은 P5…P95 만 조회할 수 있습니다.
+        """
+        q = self.quantiles.get(col)
+        if q is None:
+            return default
+        i = BenchmarkIndex._PCT_POS.get(pct)
+        if i is not None:
+            return float(q[i])
+        if self.rows is None:
+            raise ValueError(f"저장된 벤치마크 테이블에는 P5…P95 (5 단위) 만 있습니다: {pct}")
+        vals = self._values[col][self.rows]
+        return float(np.percentile(vals[~np.isnan(vals)], pct))
+
+
+class BenchmarkIndex:
+    """(district, room_type) 벤치마크 인덱스 — 앱 시작 시 1회 생성, 조회는 dict 읽기.
+
+    셀마다 원본 프레임의 행 위치(iloc)와 columns 각각의 P5…P95 분위수
+    (NaN 제외, np.percentile 기본 linear 보간)를 보관합니다.
+    to_arrays() / from_arrays() 로 분위수만 저장·복원합니다 (행 위치는 저장하지 않음).
+    """
+
+    PERCENTILES = tuple(range(5, 100, 5))
+    _PCT_POS = {p: i for i, p in enumerate(PERCENTILES)}
+
+    def __init__(self, listings, columns, keys=KEYS):
+        # 실수 컬럼은 원래 dtype 그대로 (float32 보간 결과까지 DataFrame 경로와 동일)
+        values = {}
+        for c in columns:
+            if c in listings.columns:
+                v = listings[c].to_numpy()
+                values[c] = v if v.dtype.kind == "f" else v.astype(np.float64)
+        groups = listings.groupby(list(keys), observed=True, sort=False).indices
+        self.columns = tuple(values)
+        self._cells = {}
+        for key, rows in groups.items():
+            quantiles = {}
+            for c, v in values.items():
+                vals = v[rows]
+                vals = vals[~np.isnan(vals)]
+                if len(vals):
+                    quantiles[c] = np.percentile(vals, self.PERCENTILES)
+            self._cells[key] = BenchmarkCell(rows, quantiles, values)
+        self._empty = BenchmarkCell(np.empty(0, dtype=np.intp), {}, values)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def cell(self, *key) -> BenchmarkCell:
+        """cell(district, room_type) — 해당 리스팅이 없으면 빈 셀."""
+        return self._cells.get(key, self._empty)
+
+    def cell_keys(self) -> list:
+        """셀 키 튜플 목록 (리스팅 수 0 인 셀 포함)."""
+        return list(self._cells)
+
+    def add_empty(self, keys) -> None:
+        """리스팅 수 0 인 셀을 추가합니다 (이미 있는 키는 그대로)."""
+        for key in keys:
+            self._cells.setdefault(tuple(key), BenchmarkCell(None, {}, {}, n=0))
+
+    def to_arrays(self) -> dict:
+        """셀 키·리스팅 수·분위수를 np.savez 로 저장할 수 있는 배열 dict 로.
+
+        Returns
+        -------
+        dict:
+            keys      : str (셀 수, 키 수)
+            n         : int32 (셀 수,)
+            columns   : str (컬럼 수,)
+            quantiles : float64 (셀 수, 컬럼 수, 19) — 셀에 값이 없는 컬럼은 NaN
+        """
+        q = np.full((len(self._cells), len(self.columns), len(self.PERCENTILES)), np.nan)
+        for i, cell in enumerate(self._cells.values()):
+            for j, c in enumerate(self.columns):
+                if c in cell.quantiles:
+                    q[i, j] = cell.quantiles[c]
+        return {
+            "keys": np.array([[str(k) for k in key] for key in self._cells], dtype=str),
+            "n": np.array([len(cell) for cell in self._cells.values()], dtype=np.int32),
+            "columns": np.array(self.columns, dtype=str),
+            "quantiles": q,
+        }
+
+    @classmethod
+    def from_arrays(cls, keys, n, columns, quantiles) -> "BenchmarkIndex":
+        """to_arrays() 결과로 인덱스 복원 — 셀은 행 위치 없이 리스팅 수와 분위수만 가짐."""
+        self = cls.__new__(cls)
+        self.columns = tuple(str(c) for c in columns)
+        self._cells = {}
+        has = ~np.isnan(quantiles).all(axis=2)
+        for i, key in enumerate(keys.tolist()):
+            self._cells[tuple(key)] = BenchmarkCell(
+                None, {c: quantiles[i, j] for j, c in enumerate(self.columns) if has[i, j]}, {},
+                n=n[i])
+        self._empty = BenchmarkCell(None, {}, {}, n=0)
+        return self
+
+
+# ── 저장된 테이블 ─────────────────────────────────────────────────────────────
+def _fingerprint(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _inputs(csv_path: Path, cache_path: Path) -> dict:
+    return {"raw": _fingerprint(csv_path), "cache": _fingerprint(cache_path)}
+
+
+def build_benchmark_index(listings) -> BenchmarkIndex:
+    """리스팅 프레임 → 저장용 BenchmarkIndex.
+
+    분위수는 Active+Operating 리스팅으로 계산하고 (app.py load_data() 의 active_df 와
+    같은 조건), 전체 리스팅에만 있는 (district, room_type) 조합은 리스팅 수 0 인 셀로
+    남겨 1단계 자치구·숙소 유형 목록을 테이블만으로 만들 수 있게 합니다.
+    """
+    active = listings[(listings["refined_status"] == "Active")
+                      & (listings["operation_status"] == "Operating")]
+    index = BenchmarkIndex(active, BENCH_COLUMNS, KEYS)
+    index.add_empty(listings[list(KEYS)].dropna().drop_duplicates().itertuples(index=False))
+    return index
+
+
+def write_benchmark_table(csv_path: str | Path | None = None,
+                          cache_path: str | Path | None = None,
+                          table_path: str | Path | None = None,
+                          sketches_path: str | Path | None = None) -> Path:
+    """리스팅 캐시를 청크로 훑어 스케치 저장소와 테이블을 새로 씁니다 (임시 파일 → 교체).
+
+    리스팅 전체를 DataFrame 으로 올리지 않고 listings_stream.stream_aggregates 한 패스의
+    셀 스케치(quantile_sketch.STORE_K — 셀 리스팅 ≤ 8,192개면 정확값, 넘으면 KLL 근사)를
+    저장소(quantile_sketches.npz)로 저장하고, 그 저장소의 분위수로 테이블을 씁니다.
+    이후 배치는 update_benchmark_table() 로 더합니다. 리스팅 캐시가 오래됐으면 먼저 갱신합니다.
+    """
+    from listings_cache import ensure_cache
+    from listings_stream import stream_aggregates
+    from quantile_sketch import STORE_K
+
+    src = Path(csv_path) if csv_path else _RAW_CSV
+    cache = Path(cache_path) if cache_path else _LISTINGS_CACHE
+    dst = Path(table_path) if table_path else TABLE_PATH
+
+    store = stream_aggregates(ensure_cache(src, cache), k=STORE_K).cells
+    store.save(sketches_path)
+    return save_benchmark_index(store.benchmark_index(), dst, csv_path=src, cache_path=cache)
+
+
+def update_benchmark_table(batch_csv: str | Path, *, csv_path: str | Path | None = None,
+                           cache_path: str | Path | None = None,
+                           table_path: str | Path | None = None,
+                           sketches_path: str | Path | None = None,
+                           chunk_size: int = 50_000) -> Path:
+    """새 리스팅 배치를 스케치 저장소에 더하고 테이블을 다시 씁니다 — O(배치 행).
+
+    SketchTable.load → 배치의 Active+Operating 행 update (전체 상태의 키는 리스팅 수 0 셀로)
+    → save → benchmark_index → save_benchmark_index. 저장소가 없으면(또는 SKETCH_VERSION 이
+    바뀌었으면) 먼저 스냅숏으로 write_benchmark_table() 을 돌려 만듭니다.
+    원본 CSV 가 바뀌면 load_benchmark_index() 가 스냅숏에서 저장소째 다시 만듭니다.
+    """
+    from listings_stream import active_mask, iter_listing_chunks
+    from quantile_sketch import SketchTable
+
+    store = SketchTable.load(sketches_path)
+    if not len(store):
+        write_benchmark_table(csv_path, cache_path, table_path, sketches_path)
+        store = SketchTable.load(sketches_path)
+    for chunk in iter_listing_chunks(batch_csv, ("refined_status", "operation_status", *KEYS, *store.metrics),
+                                     chunk_size):
+        store.update(chunk[active_mask(chunk)])
+        store.add_keys(chunk[list(KEYS)].dropna().astype(str).itertuples(index=False, name=None))
+    store.save(sketches_path)
+    return save_benchmark_index(store.benchmark_index(), table_path, csv_path=csv_path, cache_path=cache_path)
+
+
+def save_benchmark_index(index: BenchmarkIndex, table_path: str | Path | None = None, *,
+                         csv_path: str | Path | None = None,
+                         cache_path: str | Path | None = None) -> Path:
+    """index 의 분위수를 테이블로 씁니다 (임시 파일 → 교체).
+
+    지금 있는 원본 CSV·리스팅 캐시의 크기·수정 시각을 함께 기록해 load_benchmark_index() 가
+    신선도를 판단합니다. 메모리에 올리지 않고 스트리밍으로 집계한 인덱스
+    (listings_stream.MarketAggregates.benchmark_index) 도 이 함수로 저장합니다.
+    """
+    src = Path(csv_path) if csv_path else _RAW_CSV
+    cache = Path(cache_path) if cache_path else _LISTINGS_CACHE
+    dst = Path(table_path) if table_path else TABLE_PATH
+    meta = {"version": TABLE_VERSION, "inputs": _inputs(src, cache)}
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp.npz")
+    np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), **index.to_arrays())
+    os.replace(tmp, dst)   # 여러 워커가 동시에 만들어도 반쯤 쓴 파일을 읽지 않음
+    return dst
+
+
+def load_benchmark_index(*, csv_path: str | Path | None = None,
+                         cache_path: str | Path | None = None,
+                         table_path: str | Path | None = None) -> BenchmarkIndex:
+    """저장된 테이블로 BenchmarkIndex 를 복원합니다. 없거나 오래됐으면 먼저 다시 만듭니다.
+
+    Returns
+    -------
+    BenchmarkIndex — 셀은 리스팅 수와 P5…P95 만 가짐 (BenchmarkIndex.from_arrays)
+    """
+    src = Path(csv_path) if csv_path else _RAW_CSV
+    cache = Path(cache_path) if cache_path else _LISTINGS_CACHE
+    dst = Path(table_path) if table_path else TABLE_PATH
+
+    fresh = False
+    if dst.exists():
+        with np.load(dst) as z:
+            meta = json.loads(str(z["meta"]))
+            arrays = {k: z[k] for k in ("keys", "n", "columns", "quantiles")}
+        current = _inputs(src, cache)
+        fresh = meta.get("version") == TABLE_VERSION and all(
+            fp is None or meta["inputs"].get(name) == fp for name, fp in current.items())
+    if not fresh:
+        write_benchmark_table(src, cache, dst)
+        with np.load(dst) as z:
+            arrays = {k: z[k] for k in ("keys", "n", "columns", "quantiles")}
+    return BenchmarkIndex.from_arrays(**arrays)
+
+
+if __name__ == "__main__":
+    path = write_benchmark_table()
+    index = load_benchmark_index(table_path=path)
+    print(f"벤치마크 테이블 저장: {path} ({path.stat().st_size / 1e3:.0f} KB, "
+          f"셀 {len(index):,}개, v{TABLE_VERSION})")
@@ -0,0 +1,155 @@
+"""
+benchmarks/_synth.py — 벤치마크용 합성 리스팅 피처 생성
+=========================================================
+
+data/raw/ 원본이 없는 환경에서도 벤치마크를 돌릴 수 있도록,
+cluster_listings_ao.csv(실제 운영 리스팅) + district_lookup.csv를
+복원 추출해 predict_revpar() 입력 스키마의 DataFrame을 만듭니다.
+ao 파일에 없는 컬럼(guests, room_type, superhost, POI 타입 등)은
+고정 시드 난수로 채웁니다.
+"""
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_PROCESSED = ROOT / "data" / "processed"
+
+_ROOM_TYPES = ["entire_home", "private_room", "hotel_room", "shared_room"]
+_POI_TYPES = ["관광지", "문화시설", "쇼핑", "음식점", "숙박", "레포츠", "여행코스"]
+
+
+def _photos_tier(n: np.ndarray) -> np.ndarray:
+    return np.select([n < 14, n <= 22, n <= 35], ["하", "중하", "중상"], default="상")
+
+
+def _poi_dist_category(km: np.ndarray) -> np.ndarray:
+    return np.select([km < 0.2, km < 0.5, km < 1.0], ["초근접", "근접", "보통"], default="원거리")
+
+
+def synthetic_listings(n: int, seed: int = 0) -> pd.DataFrame:
+    """predict_revpar_batch() 입력용 합성 리스팅 n개."""
+    rng = np.random.default_rng(seed)
+    ao = pd.read_csv(_PROCESSED / "cluster_listings_ao.csv")
+    lookup = pd.read_csv(_PROCESSED / "district_lookup.csv").drop(columns=["cluster", "cluster_name"])
+
+    df = ao.iloc[rng.integers(0, len(ao), n)].reset_index(drop=True)
+    df = df.merge(lookup, on="district", how="left")
+
+    photos = df["photos_count"].to_numpy()
+    poi_km = df["nearest_poi_dist_km"].fillna(0.3).to_numpy()
+    df["nearest_poi_dist_km"] = poi_km
+    df["poi_dist_category"] = _poi_dist_category(poi_km)
+    df["photos_tier"] = _photos_tier(photos)
+    df["guests"] = np.maximum(1, df["bedrooms"] * 2 - rng.integers(0, 2, n))
+    df["room_type"] = rng.choice(_ROOM_TYPES, n, p=[0.7, 0.25, 0.04, 0.01])
+    df["nearest_poi_type_name"] = rng.choice(_POI_TYPES, n)
+    df["superhost"] = rng.integers(0, 2, n)
+    df["instant_book"] = df["instant_book"].astype(int)
+    df["extra_guest_fee_policy"] = df["extra_guest_fee_policy"].astype(str)
+    df["is_active_operating"] = 1
+    df["rating_overall"] = df["rating_overall"].fillna(4.7)
+    df["ttm_avg_rate"] = rng.lognormal(np.log(100_000), 0.5, n).round(-2)
+    df["photos_rel_dist"] = np.clip(photos / 22.0, 0, 5)
+    df["rating_rel_dist"] = np.clip(df["rating_overall"] / 4.7, 0, 5)
+    df["reviews_rel_dist"] = np.clip(df["num_reviews"] / 20.0, 0, 5)
+    df["min_nights_rel_dist"] = np.clip(df["min_nights"] / 2.0, 0, 5)
+    return df
+
+
+# ── 원본 리스팅 CSV (data/raw/final_seoul_airbnb_cleaned.csv) 대용 ──────────
+_RAW_CSV = ROOT / "data" / "raw" / "final_seoul_airbnb_cleaned.csv"
+_POI_TYPE_CODES = {"관광지": 12, "문화시설": 14, "레포츠": 28, "숙박": 32, "쇼핑": 38,
+                   "음식점": 39, "여행코스": 25, "축제공연행사": 15}
+_LISTING_TYPES = ["Entire home", "Entire rental unit", "Private room in home",
+                  "Room in hotel", "Shared room in hostel", "Entire condo", "Private room in guesthouse"]
+
+
+def synthetic_raw_listings(n: int = 32_061, seed: int = 0) -> pd.DataFrame:
+    """원본 CSV 와 같은 42개 컬럼·dtype 의 합성 리스팅 n개 (agents/_csv_info.json 스키마)."""
+    rng = np.random.default_rng(seed)
+    base = synthetic_listings(n, seed)
+    lookup = pd.read_csv(_PROCESSED / "district_lookup.csv").set_index("district")
+
+    active = rng.random(n) < 0.55
+    occ = np.where(active, rng.beta(2, 3, n), 0.0).round(3)
+    occ90 = np.where(active, rng.beta(2, 3, n), 0.0).round(3)
+    rate = np.where(active | (rng.random(n) < 0.5), base["ttm_avg_rate"] * rng.lognormal(0, 0.1, n), 0.0)
+    rate90 = rate * rng.lognormal(0, 0.15, n)
+    poi_type = base["nearest_poi_type_name"].to_numpy()
+    poi_ids = rng.integers(0, 2965, n)
+    image = np.array([f"http://tong.visitkorea.or.kr/cms/resource/{i % 97}/{1_300_000 + i}_image2_1.jpg"
+                      for i in poi_ids], dtype=object)
+    image[rng.random(n) < 0.24] = np.nan
+    addr = np.array([f"서울특별시 {d} 테스트로{i % 211}길 {i % 89}" for d, i in zip(base["district"], poi_ids)],
+                    dtype=object)
+    addr[rng.random(n) < 0.006] = np.nan
+    lat = rng.normal(37.5448, 0.0345, n)
+    lng = rng.normal(126.9791, 0.0613, n)
+    extra_fee = np.where(rng.random(n) < 0.12, rng.integers(5_000, 30_000, n), 0)
+
+    df = pd.DataFrame({
+        "baths": base["baths"].astype(float),
+        "bedrooms": base["bedrooms"].astype(int),
+        "beds": (base["bedrooms"] + rng.integers(0, 2, n)).astype(int),
+        "district": base["district"],
+        "extra_guest_fee": extra_fee,
+        "guests": base["guests"].astype(int),
+        "instant_book": base["instant_book"].astype(bool),
+        "l90d_avg_rate": rate90,
+        "l90d_occupancy": occ90,
+        "l90d_revenue": (rate90 * occ90 * 90).round(),
+        "l90d_revpar": (rate90 * occ90).round(1),
+        "l90_pop": lookup.loc[base["district"], "ttm_pop"].to_numpy() - rng.integers(0, 5_000, n),
+        "listing_type": rng.choice(_LISTING_TYPES, n),
+        "min_nights": base["min_nights"].astype(int),
+        "num_reviews": base["num_reviews"].astype(int),
+        "photos_count": base["photos_count"].astype(int),
+        "rating_overall": base["rating_overall"].astype(float),
+        "room_type": base["room_type"],
+        "superhost": base["superhost"].astype(bool),
+        "ttm_avg_rate": rate,
+        "ttm_occupancy": occ,
+        "ttm_revenue": (rate * occ * 365).round(),
+        "ttm_revpar": (rate * occ).round(1),
+        "ttm_pop": lookup.loc[base["district"], "ttm_pop"].to_numpy(),
+        "latitude_masked": lat,
+        "longitude_masked": lng,
+        "refined_status": np.where(active, "Active", rng.choice(["Inactive", "Dormant", "Blocked", "New"], n)),
+        "baths_group": np.where(base["baths"] >= 3, "Large", "Normal"),
+        "bedrooms_group": np.where(base["bedrooms"] >= 4, "Large", "Normal"),
+        "guests_group": np.where(base["guests"] >= 7, "7+", "1-6"),
+        "extra_guest_fee_policy": (extra_fee > 0).astype(int),
+        "operation_status": np.where(active | (rng.random(n) < 0.3), "Operating", "Closed"),
+        "nearest_poi_name": np.array([f"POI-{i:04d} 게스트하우스" for i in poi_ids], dtype=object),
+        "nearest_poi_addr": addr,
+        "nearest_poi_type": [_POI_TYPE_CODES.get(t, 12) for t in poi_type],
+        "nearest_poi_type_name": poi_type,
+        "nearest_poi_lat": lat + rng.normal(0, 0.001, n),
+        "nearest_poi_lng": lng + rng.normal(0, 0.001, n),
+        "nearest_poi_image": image,
+        "nearest_poi_dist_km": base["nearest_poi_dist_km"].round(3),
+        "exng": 1385.06,
+        "ttm_exng": 1407.17,
+    })
+    return df
+
+
+def raw_listings_csv(n: int = 32_061, seed: int = 0) -> Path:
+    """원본 CSV 가 있으면 그 경로, 없으면 합성 CSV 를 임시 폴더에 1회 생성해 반환."""
+    if _RAW_CSV.exists():
+        return _RAW_CSV
+    import tempfile
+
+    path = Path(tempfile.gettempdir()) / f"seoul_airbnb_synth_raw_{n}_{seed}.csv"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        synthetic_raw_listings(n, seed).to_csv(tmp, index=False)
+        tmp.replace(path)
+    return path
@@ -0,0 +1,171 @@
+"""
+benchmarks/bench_app_startup.py — 콜드 프로세스의 첫 화면(step1) 렌더 시간 + import 프로파일
+=============================================================================================
+
+실행:
+    python benchmarks/bench_app_startup.py [--runs 5] [--baseline REF]
+
+새 파이썬 프로세스마다 streamlit.testing.v1.AppTest 로 app.py 를 한 번 실행해
+
+    first render : 프로세스 시작 → step1 첫 렌더 완료 (import + 모듈 수준 코드 + step1)
+    script       : 그중 app.py 실행 시간 (AppTest 자체 준비 시간 제외)
+    loaded       : 첫 렌더 시점에 올라와 있는 무거운 모듈 (plotly · lightgbm · sklearn …)
+    step5        : 첫 렌더 뒤 워밍업 스레드가 끝나기를 기다렸다가(사용자가 마법사를
+                   채우는 시간) 결과 화면으로 갔을 때의 첫 step5 렌더 시간
+
+을 재고, 한 번은 -X importtime 으로 실행해 누적 import 시간 상위 모듈을 보여 줍니다.
+--baseline 을 주면 git archive 로 그 커밋의 트리를 임시 디렉터리에 풀어 같은 측정을
+나란히 출력합니다 (예: --baseline HEAD~1). 디스크 캐시(리스팅·벤치마크 테이블)는 측정 전
+한 번 실행해 만들어 두므로, 재배포 후가 아니라 평소 프로세스 재시작의 시간입니다.
+
+data/raw 원본도 리스팅 캐시도 없으면 bench_step5_rerun.py 와 같이 합성 캐시를 넣은
+임시 사본에서 실행합니다.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from _synth import ROOT, raw_listings_csv
+from listings_cache import CACHE_PATH, RAW_CSV, build_cache
+
+_HEAVY = ("pandas", "pyarrow", "matplotlib", "lightgbm", "sklearn", "joblib", "scipy", "charts",
+          "predict_utils", "listings_cache")
+
+# app.py 를 runpy 로 감싸 스크립트 스레드 안에서 실행 시간과 그 시점의 모듈을 기록
+_WRAPPER = """
+import os, runpy, sys, time
+if os.getcwd() not in sys.path:   # streamlit run 처럼 앱 디렉터리를 import 경로에 (워밍업 스레드용)
+    sys.path.insert(0, os.getcwd())
+t0 = time.perf_counter()
+runpy.run_path("app.py", run_name="__main__")
+sys._app_ms = (time.perf_counter() - t0) * 1000
+sys._app_modules = set(sys.modules)
+"""
+
+_CHILD = r"""
+import time
+t_start = time.perf_counter()
+import json, sys, threading
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_string(__WRAPPER__, default_timeout=120)
+at.run()
+first = (time.perf_counter() - t_start) * 1000
+if at.exception:
+    raise RuntimeError(at.exception[0].value)
+loaded = sorted({m.split(".")[0] for m in sys._app_modules} & set(sys.argv[1].split(",")))
+script = sys._app_ms
+
+# 사용자가 1~4단계를 채우는 동안 워밍업이 끝났다고 보고, 그 뒤 결과 화면
+t0 = time.perf_counter()
+for t in threading.enumerate():
+    if t.name == "app-warmup":
+        t.join()
+warm_wait = (time.perf_counter() - t0) * 1000
+at.session_state["step"] = 5
+at.run()
+step5 = sys._app_ms
+if at.exception:
+    raise RuntimeError(at.exception[0].value)
+print(json.dumps(dict(first=first, script=script, loaded=loaded, warm_wait=warm_wait, step5=step5)))
+""".replace("__WRAPPER__", repr(_WRAPPER))
+
+
+def _mirror(src: Path, dst: Path) -> Path:
+    """src 트리(data 제외)와 data/* 를 dst 에 심볼릭 링크로 비춤. 리스팅 데이터가 없으면 합성 캐시."""
+    for entry in src.iterdir():
+        if entry.name != "data" and not (dst / entry.name).exists():
+            (dst / entry.name).symlink_to(entry)
+    (dst / "data").mkdir()
+    have_listings = RAW_CSV.exists() or CACHE_PATH.exists()
+    for entry in (ROOT / "data").iterdir():
+        if have_listings or entry.name not in ("raw", "cache"):
+            (dst / "data" / entry.name).symlink_to(entry)
+    if not have_listings:
+        build_cache(raw_listings_csv(), dst / "data" / "cache" / "listings.parquet")
+    return dst
+
+
+def _app_dir(ref: str | None) -> Path:
+    if ref is None:
+        if RAW_CSV.exists() or CACHE_PATH.exists():
+            return ROOT
+        return _mirror(ROOT, Path(tempfile.mkdtemp(prefix="startup_bench_")))
+    tree = Path(tempfile.mkdtemp(prefix="startup_base_"))
+    archive = subprocess.run(["git", "archive", ref, "--", ".", ":!data"], cwd=ROOT,
+                             capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(tree)], input=archive, check=True)
+    return _mirror(tree, tree)
+
+
+def _child(app_dir: Path, *flags) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-W", "ignore", *flags, "-c", _CHILD, ",".join(_HEAVY)],
+                          cwd=app_dir, capture_output=True, text=True, check=True)
+
+
+def _importtime_top(stderr: str, n: int) -> list:
+    """-X importtime 출력에서 최상위 패키지별 누적 시간(ms) 상위 n개."""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cum_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        top = name.split(".")[0]
+        if name == top:   # 같은 패키지의 하위 모듈은 누적에 이미 포함
+            totals[top] = totals.get(top, 0) + int(cum_us) / 1000
+    return sorted(totals.items(), key=lambda kv: -kv[1])[:n]
+
+
+def measure(app_dir: Path, runs: int) -> dict:
+    _child(app_dir)   # 디스크 캐시 생성 (리스팅·벤치마크 테이블)
+    res = [json.loads(_child(app_dir).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    profile = _child(app_dir, "-X", "importtime")
+    return {
+        "first": statistics.median(r["first"] for r in res),
+        "script": statistics.median(r["script"] for r in res),
+        "warm_wait": statistics.median(r["warm_wait"] for r in res),
+        "step5": statistics.median(r["step5"] for r in res),
+        "loaded": res[-1]["loaded"],
+        "imports": _importtime_top(profile.stderr, 8),
+    }
+
+
+def _report(label: str, m: dict) -> None:
+    print(f"[{label}]")
+    print(f"  step1 첫 렌더 (프로세스 시작부터) : {m['first']:>7.0f} ms")
+    print(f"  └ 그중 app.py 실행                : {m['script']:>7.0f} ms")
+    print(f"  워밍업 대기 (첫 렌더 이후)        : {m['warm_wait']:>7.0f} ms")
+    print(f"  step5 첫 렌더 (워밍업 후)         : {m['step5']:>7.0f} ms")
+    print(f"  첫 렌더 시점에 로드된 무거운 모듈 : {', '.join(m['loaded']) or '-'}")
+    print("  import 누적 시간 상위:")
+    for name, ms in m["imports"]:
+        print(f"    {name:<24} {ms:>7.0f} ms")
+    print()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--baseline", help="비교할 git 커밋 (예: HEAD~1)")
+    args = ap.parse_args()
+
+    results = {}
+    if args.baseline:
+        results[f"baseline {args.baseline}"] = measure(_app_dir(args.baseline), args.runs)
+    results["current"] = measure(_app_dir(None), args.runs)
+    for label, m in results.items():
+        _report(label, m)
+    if args.baseline:
+        base, cur = results.values()
+        print(f"step1 첫 렌더: {base['first']:.0f} → {cur['first']:.0f} ms, "
+              f"app.py 실행: {base['script']:.0f} → {cur['script']:.0f} ms "
+              f"({base['script'] / cur['script']:.1f}× 빠름)")
+
+
+if __name__ == "__main__":
+    main()
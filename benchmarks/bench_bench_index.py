@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_bench_index.py — 전체 프레임 마스크 스캔 vs BenchmarkIndex
+===========================================================================
+
+실행:
+    python benchmarks/bench_bench_index.py [--calls 200]
+
+app.py 의 get_bench()/bench_val() 이 하던 (district, room_type) 불리언 마스크 +
+dropna + np.percentile 경로와, 미리 만든 BenchmarkIndex 셀 조회를 비교합니다.
+25×4 셀 × 컬럼 × P25/P50/P75 전부에서 값과 len(bench) 가 같은지도 확인합니다.
+data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from _synth import raw_listings_csv
+from listings_cache import load_listings
+from predict_utils import BenchmarkIndex
+
+COLUMNS = (
+    "ttm_avg_rate", "ttm_occupancy", "ttm_revpar", "bedrooms", "baths", "guests",
+    "num_reviews", "rating_overall", "photos_count", "min_nights", "nearest_poi_dist_km",
+)
+
+
+def _scan(df, district, room_type):
+    return df[(df["district"] == district) & (df["room_type"] == room_type)]
+
+
+def _scan_val(bench, col, default, pct=50):
+    if len(bench) > 0 and col in bench.columns:
+        vals = bench[col].dropna()
+        if len(vals) > 0:
+            return float(np.percentile(vals, pct))
+    return default
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200)
+    args = ap.parse_args()
+
+    df = load_listings(csv_path=raw_listings_csv(),
+                       cache_path=Path(tempfile.mkdtemp()) / "listings.parquet")
+    df = df[df["refined_status"] == "Active"].reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    index = BenchmarkIndex(df, COLUMNS)
+    print(f"BenchmarkIndex: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({len(index)}개 셀, {len(df):,}행)")
+
+    keys = [(d, r) for d in df["district"].unique() for r in df["room_type"].unique()]
+    keys.append(("없는구", "Entire home/apt"))
+    mismatch = 0
+    for d, r in keys:
+        old, new = _scan(df, d, r), index.cell(d, r)
+        mismatch += len(old) != len(new)
+        for col in COLUMNS + ("nearest_500m",):
+            for pct in (25, 50, 75, 33):
+                mismatch += _scan_val(old, col, -1.0, pct) != new.value(col, -1.0, pct)
+    print(f"셀 {len(keys)}개 × 컬럼 {len(COLUMNS) + 1}개 × 분위 4개 — 불일치 {mismatch}건")
+
+    # 한 번의 위저드 렌더링에서 하는 조회: 셀 1회 + 값 7회
+    rng = np.random.default_rng(0)
+    picks = [keys[i] for i in rng.integers(0, len(keys) - 1, args.calls)]
+
+    def render(get, val):
+        for d, r in picks:
+            b = get(d, r)
+            len(b)
+            for col in ("ttm_avg_rate", "ttm_occupancy", "ttm_revpar", "bedrooms",
+                        "baths", "guests", "num_reviews"):
+                val(b, col, 0.0)
+
+    t0 = time.perf_counter()
+    render(lambda d, r: _scan(df, d, r), _scan_val)
+    t_scan = (time.perf_counter() - t0) / args.calls * 1e6
+    t0 = time.perf_counter()
+    render(index.cell, lambda b, c, dflt: b.value(c, dflt))
+    t_ix = (time.perf_counter() - t0) / args.calls * 1e6
+    print(f"셀 조회 + 값 7개: 스캔 {t_scan:,.0f} µs · 인덱스 {t_ix:,.1f} µs ({t_scan / t_ix:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
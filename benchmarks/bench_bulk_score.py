@@ -0,0 +1,81 @@
+"""
+benchmarks/bench_bulk_score.py — bulk_score.py 워커 수별 처리량 (확장성)
+========================================================================
+
+실행:
+    python benchmarks/bench_bulk_score.py [--workers 0 1 2 4] [--chunk-size 4000] [--loop 500]
+
+원본 CSV 전체(없으면 _synth 의 합성 CSV 32,061행)를 워커 수를 바꿔 가며 일괄 스코어링하고
+rows/s, 1워커 대비 속도 향상·효율, 단계별 시간을 출력합니다. 비교 기준으로 지금 방식인
+predict_revpar 행 루프를 --loop 행만 재서 전체 시간으로 환산합니다.
+출력이 워커 수와 관계없이 같은지, 표본 행이 predict_revpar 단건 호출과 같은지도 확인합니다.
+속도 향상은 물리 코어 수까지만 기대할 수 있습니다 (os.cpu_count() 를 함께 출력).
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _synth import raw_listings_csv
+from bulk_score import STAGES, _load_artifacts, district_table, iter_chunks, run
+from district_features import listing_features_frame
+from predict_utils import predict_revpar
+
+_COLS = ["ADR_pred", "Occ_pred", "RevPAR_pred"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=None, help="기본: 0 1 2 4 … CPU 수")
+    ap.add_argument("--chunk-size", type=int, default=4_000)
+    ap.add_argument("--loop", type=int, default=500)
+    args = ap.parse_args()
+
+    cpus = os.cpu_count()
+    workers = args.workers or sorted({0, 1, *(w for w in (2, 4, 8, 16) if w <= cpus), cpus})
+    csv_path = raw_listings_csv()
+    out_dir = Path(tempfile.mkdtemp())
+
+    results = {}
+    for w in workers:
+        results[w] = run(csv_path, out_dir / f"scores_w{w}.parquet", workers=w,
+                         chunk_size=args.chunk_size)
+    n = results[workers[0]]["rows"]
+
+    # 기준: predict_revpar 행 루프 (loop 행 실측 → 전체 환산)
+    artifacts = _load_artifacts(None, "bundle")
+    table = district_table(csv_path)
+    _, first = next(iter_chunks(csv_path, args.loop))
+    recs = listing_features_frame(first, table).to_dict("records")
+    t0 = time.perf_counter()
+    singles = [predict_revpar(rec, 0.0, **artifacts) for rec in recs]
+    loop_rps = len(recs) / (time.perf_counter() - t0)
+
+    print(f"{n:,}행 · 청크 {args.chunk_size:,}행 · CPU {cpus}개\n")
+    print(f"{'워커':>4} | {'총 s':>7} | {'행/s':>9} | {'속도 향상':>8} | {'효율':>6} | "
+          + " | ".join(f"{s:>8}" for s in STAGES))
+    print(f"{'loop':>4} | {n / loop_rps:>7.2f} | {loop_rps:>9,.0f} | {'':>8} | {'':>6} |  "
+          f"predict_revpar 행 루프 ({len(recs)}행 실측 환산)")
+    base = results.get(1, results[workers[0]])["rows_per_s"]
+    for w, r in results.items():
+        speedup = r["rows_per_s"] / base
+        eff = f"{speedup / w:>6.0%}" if w else f"{'':>6}"
+        print(f"{w:>4} | {r['seconds']:>7.2f} | {r['rows_per_s']:>9,.0f} | {speedup:>7.2f}x | {eff} | "
+              + " | ".join(f"{r['stages'][s]:>8.2f}" for s in STAGES))
+
+    # 출력 일치 — 워커 수와 무관, 단건 호출과 동일
+    frames = {w: pd.read_parquet(r["path"]) for w, r in results.items()}
+    ref = frames[workers[0]]
+    same = all(f.equals(ref) for f in frames.values())
+    err = max(np.nanmax(np.abs(ref[c].to_numpy()[:len(singles)] - [s[c] for s in singles]))
+              for c in _COLS)
+    print(f"\n워커 수별 출력 동일: {same} · predict_revpar 단건과 최대 차이 {err:.2e} ({len(singles)}행)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+benchmarks/bench_comps.py — 유사 숙소 kNN (CompsIndex) 생성·질의 지연
+=====================================================================
+
+실행:
+    python benchmarks/bench_comps.py [--queries 500] [--k 20]
+
+Active+Operating 리스팅으로 CompsIndex 를 만들고, 무작위 호스트 입력에 대해
+클러스터별 질의 지연(중앙값·p99)을 잽니다. 매 질의마다 DataFrame 에서 z-score 를
+다시 계산해 정렬하는 경로와 이웃 집합이 같은지도 확인합니다.
+data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _synth import ROOT, raw_listings_csv
+from listings_cache import load_listings
+from predict_utils import CompsIndex
+
+
+def _naive(grp, features, k):
+    X = grp[list(CompsIndex.FEATURES)].astype(np.float64)
+    X = X.fillna(X.median())
+    mu, sd = X.mean(), X.std(ddof=0).replace(0, 1.0)
+    x = pd.Series({f: features[f] for f in CompsIndex.FEATURES})
+    d2 = (((X - mu) / sd - (x - mu) / sd) ** 2).sum(axis=1)
+    d2 += (grp["room_type"].astype(str) != features["room_type"]) * CompsIndex.ROOM_TYPE_WEIGHT ** 2
+    return np.sort(np.sqrt(d2.to_numpy()))[:k]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=20)
+    args = ap.parse_args()
+
+    df = load_listings(csv_path=raw_listings_csv(),
+                       cache_path=Path(tempfile.mkdtemp()) / "listings.parquet")
+    cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    df = df.merge(cluster_df[["district", "cluster"]], on="district", how="left")
+    active_df = df[(df["refined_status"] == "Active") & (df["operation_status"] == "Operating")]
+
+    t0 = time.perf_counter()
+    index = CompsIndex(active_df)
+    print(f"CompsIndex: {(time.perf_counter() - t0) * 1000:.1f} ms ({len(index)}개 클러스터, "
+          f"{len(active_df):,}행)")
+
+    rng = np.random.default_rng(0)
+    rooms = ["entire_home", "private_room", "hotel_room", "shared_room"]
+    print(f"\n{'cluster':>7} | {'rows':>6} | {'naive ms':>8} | {'p50 ms':>7} | {'p99 ms':>7} | 이웃 거리 일치")
+    for c, grp in active_df.groupby("cluster"):
+        queries = [{
+            "bedrooms": int(rng.integers(0, 5)), "baths": float(rng.integers(1, 4)),
+            "guests": int(rng.integers(1, 9)), "nearest_poi_dist_km": float(rng.uniform(0, 2)),
+            "rating_overall": float(rng.uniform(4, 5)), "photos_count": int(rng.integers(5, 60)),
+            "room_type": rooms[int(rng.integers(0, 4))],
+        } for _ in range(args.queries)]
+        lat = []
+        for q in queries:
+            t0 = time.perf_counter()
+            index.query(c, q, k=args.k)
+            lat.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        naive = [_naive(grp, q, args.k) for q in queries[:50]]
+        t_naive = (time.perf_counter() - t0) / 50 * 1000
+        ok = all(np.allclose(d, index.query(c, q, k=args.k)["listings"]["distance"])
+                 for d, q in zip(naive, queries))
+        print(f"{int(c):>7} | {len(grp):>6,} | {t_naive:>8.2f} | {np.percentile(lat, 50):>7.2f} | "
+              f"{np.percentile(lat, 99):>7.2f} | {ok}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+benchmarks/bench_conformal.py — conformal 예측 구간의 커버리지·폭 + 예측 지연 오버헤드
+=====================================================================================
+
+실행:
+    python benchmarks/bench_conformal.py [--alpha 0.2] [--calib-frac 0.5] [--seeds 5]
+
+Active+Operating 리스팅을 고정 시드로 둘로 나눠 절반으로 캘리브레이션하고,
+나머지(캘리브레이션에 쓰지 않은 리스팅)에서
+
+    coverage : 실제 ADR·예약률·RevPAR 가 [lo, hi] 안에 들어간 비율 (목표 1-α)
+    width    : 구간 폭 중앙값 (ADR·RevPAR 는 원, 예약률은 %p)
+
+를 지표별·클러스터별로 보고합니다. 시드를 바꿔 여러 번 나눈 커버리지의 평균·최소도
+출력합니다. 이어서 구간 계산(ConformalTable.bounds_one / bounds) 자체의 시간과,
+predict_revpar (단일) / predict_revpar_batch 를 conformal 없이·있이 돌린 시간을 잽니다.
+data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _synth import ROOT, raw_listings_csv
+from conformal import ALPHA, METRICS, calibrate, calibration_frame, split_indices
+from listings_cache import load_listings
+from listings_stream import stream_aggregates
+from predict_utils import load_models, predict_revpar, predict_revpar_batch
+
+
+def _evaluate(table, features, actual, artifacts):
+    """평가 리스팅의 지표별 (덮임 여부 배열, 폭 배열)."""
+    pred = predict_revpar_batch(features, 0.0, conformal=table, **artifacts)
+    out = {}
+    for m in METRICS:
+        y, lo, hi = actual[m], pred[f"{m}_lo"].to_numpy(), pred[f"{m}_hi"].to_numpy()
+        out[m] = ((y >= lo) & (y <= hi), hi - lo)
+    return out
+
+
+def _median_us(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e6)
+    return statistics.median(times)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--alpha", type=float, default=ALPHA)
+    ap.add_argument("--calib-frac", type=float, default=0.5)
+    ap.add_argument("--seeds", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=500)
+    args = ap.parse_args()
+
+    cache = Path(tempfile.mkdtemp()) / "listings.parquet"
+    df = load_listings(csv_path=raw_listings_csv(), cache_path=cache)
+    cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    table = stream_aggregates(cache).district_features(cluster_df)   # 앱과 같은 시장 집계
+    features, actual = calibration_frame(df, cluster_df, table)
+    artifacts = {k: v for k, v in load_models(engine="numpy").items() if k != "conformal"}
+    clusters = features["cluster"].to_numpy()
+    print(f"리스팅 {len(features):,}개 (Active+Operating, TTM 요금·예약률 있음), "
+          f"목표 커버리지 {1 - args.alpha:.0%}\n")
+
+    # ── 커버리지 (시드 0: 상세, 나머지: 요약) ──────────────────────────────
+    runs = {m: [] for m in METRICS}
+    for seed in range(args.seeds):
+        calib, test = split_indices(len(features), args.calib_frac, seed)
+        table = calibrate(features.iloc[calib], {m: actual[m][calib] for m in METRICS},
+                          alpha=args.alpha, **artifacts)
+        res = _evaluate(table, features.iloc[test], {m: actual[m][test] for m in METRICS}, artifacts)
+        for m in METRICS:
+            runs[m].append(res[m][0].mean())
+        if seed:
+            continue
+
+        print(f"[시드 0] 캘리브레이션 {len(calib):,}개 / 평가 {len(test):,}개")
+        print(f"{'cluster':<8} | {'n test':>7} | " + " | ".join(
+            f"{m + ' cov':>10} | {m + ' width':>12}" for m in METRICS))
+        groups = [(f"c{int(c)}", clusters[test] == c) for c in np.unique(clusters[test])]
+        for label, sel in groups + [("전체", np.ones(len(test), dtype=bool))]:
+            cells = []
+            for m in METRICS:
+                covered, width = res[m]
+                w = np.median(width[sel])
+                cells.append(f"{covered[sel].mean():>10.1%} | "
+                             + (f"{w * 100:>10.1f}%p" if m == "Occ" else f"₩{w:>11,.0f}"))
+            print(f"{label:<8} | {sel.sum():>7,} | " + " | ".join(cells))
+        print()
+
+    print(f"커버리지 ({args.seeds}개 분할): " + " · ".join(
+        f"{m} 평균 {np.mean(v):.1%} (최소 {np.min(v):.1%})" for m, v in runs.items()))
+
+    # ── 예측 지연 오버헤드 ─────────────────────────────────────────────────
+    rec = features.iloc[0].to_dict()
+    single_off = _median_us(lambda: predict_revpar(rec, 500_000, **artifacts), args.repeat)
+    single_on = _median_us(lambda: predict_revpar(rec, 500_000, conformal=table, **artifacts), args.repeat)
+    batch_off = _median_us(lambda: predict_revpar_batch(features, 500_000, **artifacts), 5) / 1000
+    batch_on = _median_us(lambda: predict_revpar_batch(features, 500_000, conformal=table, **artifacts),
+                          5) / 1000
+    one_us = _median_us(lambda: table.bounds_one(rec["cluster"], 100_000.0, 0.5, 50_000.0), args.repeat)
+    n = len(features)
+    vals = [np.full(n, v) for v in (100_000.0, 0.5, 50_000.0)]
+    many_ms = _median_us(lambda: table.bounds(clusters, *vals), 20) / 1000
+    print(f"\n구간 계산만  bounds_one: {one_us:.1f} µs · bounds({n:,}행): {many_ms:.2f} ms")
+    print(f"predict_revpar 단일      : {single_off:>8.1f} µs → {single_on:>8.1f} µs "
+          f"({single_on - single_off:+.1f} µs)")
+    print(f"predict_revpar_batch {n:,}행: {batch_off:>8.1f} ms → {batch_on:>8.1f} ms "
+          f"({batch_on - batch_off:+.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
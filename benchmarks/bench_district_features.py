@@ -0,0 +1,111 @@
+"""
+benchmarks/bench_district_features.py — 자치구 루프 집계 vs district_features
+==============================================================================
+
+실행:
+    python benchmarks/bench_district_features.py [--repeat 5]
+
+app.py 의 예전 compute_district_stats() (자치구 groupby 루프 + 그룹별 median/mean/mode)
+와 groupby 1회 집계(compute_district_features), 내용 해시, 저장된 테이블 재사용
+(load_district_features) 시간을 비교하고 값이 같은지 확인합니다. 앱 경로인
+스트리밍 집계(listings_stream) + 리스팅 캐시 키(stream_features_key) 저장 테이블도 잽니다.
+data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from _synth import ROOT, raw_listings_csv
+from district_features import (compute_district_features, district_features_hash,
+                               load_district_features, load_stream_district_features,
+                               stream_features_key)
+from listings_cache import load_listings
+from listings_stream import stream_aggregates
+
+# 예전 키 → district_lookup.csv 컬럼명
+_RENAMED = {"median_revpar": "district_median_revpar", "listing_count": "district_listing_count",
+            "superhost_rate": "district_superhost_rate",
+            "entire_home_rate": "district_entire_home_rate", "ttm_pop_mode": "ttm_pop"}
+
+
+def _loop_stats(active_df, cluster_df):
+    pop_map = cluster_df.set_index("district")["median_pop"].to_dict()
+    result = {}
+    for district, grp in active_df.groupby("district", observed=True):
+        result[district] = {
+            "median_revpar":    float(grp["ttm_revpar"].median()),
+            "listing_count":    len(grp),
+            "superhost_rate":   float(grp["superhost"].mean()),
+            "entire_home_rate": float((grp["room_type"] == "entire_home").mean()),
+            "photos_mean":      float(grp["photos_count"].mean()),
+            "rating_mean":      float(grp["rating_overall"].mean()),
+            "reviews_mean":     float(grp["num_reviews"].mean()),
+            "min_nights_mean":  float(grp["min_nights"].mean()),
+            "cluster":          int(grp["cluster"].mode().iloc[0]),
+            "ttm_pop_mode":     int(pop_map.get(district, 100_000)),
+        }
+    return result
+
+
+def _best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    cache_path = Path(tempfile.mkdtemp()) / "listings.parquet"
+    df = load_listings(csv_path=raw_listings_csv(), cache_path=cache_path)
+    cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    df = df.merge(cluster_df[["district", "cluster", "cluster_name"]], on="district", how="left")
+    active_df = df[(df["refined_status"] == "Active") & (df["operation_status"] == "Operating")].copy()
+    path = Path(tempfile.mkdtemp()) / "district_features.parquet"
+
+    old = _loop_stats(active_df, cluster_df)
+    new = load_district_features(active_df, cluster_df, path=path).to_dict("index")
+    max_rel = 0.0
+    for district, stats in old.items():
+        for k, v in stats.items():
+            w = new[district][_RENAMED.get(k, k)]
+            max_rel = max(max_rel, abs(w - v) / max(abs(v), 1e-12))
+    print(f"자치구 {len(new)}개 · 키 일치 {sorted(old) == sorted(new)} · 최대 상대 오차 {max_rel:.2g}")
+
+    key = district_features_hash(active_df, cluster_df)
+    stream_key = stream_features_key(cluster_df, cache_path)
+    stream_path = path.with_name("district_features_stream.parquet")
+    streamed = load_stream_district_features(cluster_df, lambda: stream_aggregates(cache_path),
+                                             key=stream_key, path=stream_path)
+    diff = (streamed - compute_district_features(active_df, cluster_df)).abs().to_numpy().max()
+    print(f"스트리밍 집계 vs groupby 최대 절대 오차 {diff:.2g}")
+    rows = [
+        ("groupby 루프 (예전)", lambda: _loop_stats(active_df, cluster_df)),
+        ("groupby 1회 집계", lambda: compute_district_features(active_df, cluster_df)),
+        ("내용 해시", lambda: district_features_hash(active_df, cluster_df)),
+        ("저장 테이블 읽기 (해시 일치)", lambda: load_district_features(active_df, cluster_df,
+                                                                   key=key, path=path)),
+        ("스트리밍 집계 (캐시 훑기)", lambda: stream_aggregates(cache_path).district_features(cluster_df)),
+        ("리스팅 캐시 키", lambda: stream_features_key(cluster_df, cache_path)),
+        ("저장 테이블 읽기 (캐시 키 일치)", lambda: load_stream_district_features(
+            cluster_df, lambda: stream_aggregates(cache_path), key=stream_key, path=stream_path)),
+    ]
+    for label, fn in rows:
+        print(f"{label:<26} | {_best_ms(fn, args.repeat):8.2f} ms")
+
+    changed = active_df.copy()
+    changed.loc[changed.index[0], "ttm_revpar"] += 1
+    print(f"리스팅 1행 변경 시 해시 변경: {district_features_hash(changed, cluster_df) != key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmarks/bench_explain.py — 분리형 기여도(explain.py) 배치 처리량 + step5 조회 지연
+======================================================================================
+
+실행:
+    python benchmarks/bench_explain.py [--rows 14399] [--singles 50]
+
+explain.summary_inputs() 의 리스팅(cluster_listings_ao.csv 와 같은 Active+Operating
+14,399개)으로
+
+    batch   : explain_revpar_batch 전체 (Model A·B 네이티브 기여도 + 원 단위 변환 + 그룹 합)
+    single  : explain_revpar 를 행마다 부른 경로 (singles 개로 재서 전체로 환산)
+    summary : driver_summary — 클러스터·자치구별 평균 집계
+    step5   : 저장된 집계 읽기(프로세스당 1회) + 클러스터 행 조회(재실행마다)
+
+를 잽니다. 가법성(기준값 + 기여 합 = predict_revpar_batch 예측값)도 확인합니다.
+LightGBM 네이티브 기여도는 스레드를 쓰므로 코어 수에 따라 batch 시간이 달라집니다.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import _synth  # noqa: F401  (저장소 루트를 import 경로에)
+from explain import (driver_summary, explain_revpar, explain_revpar_batch, load_driver_summary,
+                     save_driver_summary, summary_inputs, top_drivers)
+from predict_utils import load_models, models_version, predict_revpar_batch
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=None, help="기본: 전체")
+    ap.add_argument("--singles", type=int, default=50)
+    args = ap.parse_args()
+
+    artifacts = load_models(engine="lightgbm")
+    features, district = summary_inputs()
+    if args.rows:
+        features, district = features.iloc[:args.rows], district[:args.rows]
+    n = len(features)
+    print(f"리스팅 {n:,}개 · CPU {os.cpu_count()}개\n")
+
+    t0 = time.perf_counter()
+    res = explain_revpar_batch(features, **artifacts)
+    batch_s = time.perf_counter() - t0
+
+    pred = predict_revpar_batch(features, 0.0, **artifacts)
+    adr_err = np.abs(res["base"]["ADR_base"] + res["price"].sum(axis=1) - pred["ADR_pred"]).max()
+    occ_err = np.abs(res["base"]["Occ_pred"] - pred["Occ_pred"]).max()
+
+    recs = features.iloc[:args.singles].to_dict("records")
+    times = []
+    for rec in recs:
+        t0 = time.perf_counter()
+        explain_revpar(rec, **artifacts)
+        times.append(time.perf_counter() - t0)
+    single_ms = statistics.median(times) * 1000
+
+    t0 = time.perf_counter()
+    summary = driver_summary(features, district, **artifacts)
+    summary_s = time.perf_counter() - t0
+
+    version = models_version()
+    path = save_driver_summary(summary, Path(tempfile.mkdtemp()) / "driver_summary.parquet", key=version)
+    t0 = time.perf_counter()
+    summary = load_driver_summary(path, version=version)
+    load_ms = (time.perf_counter() - t0) * 1000
+    key = summary.index[summary.index.get_level_values("level") == "cluster"][0]
+    lookup = []
+    for _ in range(200):
+        t0 = time.perf_counter()
+        top_drivers(summary.loc[key], "price")
+        top_drivers(summary.loc[key], "demand")
+        lookup.append(time.perf_counter() - t0)
+
+    print(f"explain_revpar_batch    : {batch_s:>8.2f} s  ({n / batch_s:,.0f} 리스팅/s)")
+    print(f"explain_revpar 행 루프  : {single_ms:>8.2f} ms/행 → 전체 환산 {single_ms * n / 1000:,.1f} s")
+    print(f"driver_summary (집계)   : {summary_s:>8.2f} s")
+    print(f"가법성 오차             : ADR {adr_err:.2e} 원 · Occ(clip 후 예측값) {occ_err:.2e}")
+    print(f"\nstep5 — 집계 파일 읽기 (프로세스당 1회): {load_ms:.1f} ms "
+          f"({path.stat().st_size / 1e3:.0f} KB, {len(summary)}행)")
+    print(f"step5 — 클러스터 요인 조회 (재실행마다): {statistics.median(lookup) * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+benchmarks/bench_health_score.py — DataFrame 스캔 vs PercentileIndex
+=======================================================================
+
+실행:
+    python benchmarks/bench_health_score.py [--calls 2000]
+
+cluster_listings_ao.csv 클러스터별로, 매 호출 DataFrame 을 넘기는 경로
+(호출마다 dropna + 정렬)와 미리 만든 PercentileIndex 를 넘기는 경로의
+compute_health_score() 지연을 비교하고 점수가 같은지 확인합니다.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from _synth import ROOT
+from predict_utils import build_cluster_percentiles, compute_health_score
+
+
+def _user_vals(rng):
+    return {
+        "my_reviews": int(rng.integers(0, 300)), "my_rating": float(rng.uniform(3.5, 5)),
+        "my_photos": int(rng.integers(5, 60)), "my_instant": bool(rng.integers(2)),
+        "my_min_nights": int(rng.integers(1, 10)), "my_extra_fee": bool(rng.integers(2)),
+        "my_poi_dist": float(rng.uniform(0, 2)), "my_bedrooms": int(rng.integers(0, 5)),
+        "my_baths": float(rng.integers(1, 4)),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=2000)
+    args = ap.parse_args()
+
+    ao = pd.read_csv(ROOT / "data" / "processed" / "cluster_listings_ao.csv")
+    t0 = time.perf_counter()
+    index = build_cluster_percentiles(ao)
+    print(f"build_cluster_percentiles: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({len(index)}개 클러스터, {len(ao):,}행)")
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'cluster':>7} | {'rows':>6} | {'DataFrame µs':>12} | {'index µs':>9} | speedup | 동일")
+    for c, grp in ao.groupby("cluster"):
+        vals = [_user_vals(rng) for _ in range(args.calls)]
+        t0 = time.perf_counter()
+        old = [compute_health_score(v, grp) for v in vals]
+        t_df = (time.perf_counter() - t0) / args.calls * 1e6
+        t0 = time.perf_counter()
+        new = [compute_health_score(v, index[c]) for v in vals]
+        t_ix = (time.perf_counter() - t0) / args.calls * 1e6
+        print(f"{c:>7} | {len(grp):>6,} | {t_df:>12.1f} | {t_ix:>9.1f} | {t_df / t_ix:6.1f}x | {old == new}")
+
+
+if __name__ == "__main__":
+    main()
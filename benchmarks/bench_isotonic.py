@@ -0,0 +1,63 @@
+"""
+benchmarks/bench_isotonic.py — IsotonicRegression.predict vs IsotonicTable
+=============================================================================
+
+실행:
+    python benchmarks/bench_isotonic.py [--sizes 1 100 10000]
+
+iso_reg.pkl 의 모든 브레이크포인트(±1ulp, 중점, 범위 밖 포함)에서 두 보정기의
+패리티를 (out_of_bounds='raise' 로 바꾼 복사본까지) 확인하고, 스칼라 1개(predict_revpar 경로)와 배열 보정 지연을 비교합니다.
+"""
+
+import argparse
+import copy
+import time
+
+import joblib
+import numpy as np
+
+from _synth import ROOT
+from predict_utils import IsotonicTable, check_isotonic_parity
+
+
+def _best_us(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    iso = joblib.load(ROOT / "models" / "iso_reg.pkl")
+    table = IsotonicTable.from_sklearn(iso)
+    print(f"parity — 브레이크포인트 {len(table.x)}개 · 범위 밖 · 임의값 최대 절대 오차 "
+          f"{check_isotonic_parity(iso, table):.3g}")
+    strict = copy.deepcopy(iso)
+    strict.out_of_bounds = "raise"
+    strict._build_f(strict.X_thresholds_, strict.y_thresholds_)   # sklearn 은 fit 때 보간기를 만듦
+    print(f"parity — out_of_bounds='raise' (범위 밖은 양쪽 ValueError) 최대 절대 오차 "
+          f"{check_isotonic_parity(strict):.3g}")
+
+    v = float(np.median(table.x))
+    t_s = _best_us(lambda: iso.predict([v]), args.repeat)
+    t_t = _best_us(lambda: table.predict_one(v), args.repeat)
+    print(f"\n스칼라 1개: sklearn {t_s:.1f} µs · predict_one {t_t:.1f} µs ({t_s / t_t:.0f}x)")
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'rows':>7} | {'sklearn µs':>10} | {'table µs':>9} | speedup")
+    for n in args.sizes:
+        T = rng.uniform(table.x_min, table.x_max, n)
+        t_s = _best_us(lambda: iso.predict(T), args.repeat)
+        t_t = _best_us(lambda: table.predict(T), args.repeat)
+        print(f"{n:>7,} | {t_s:>10.1f} | {t_t:>9.1f} | {t_s / t_t:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
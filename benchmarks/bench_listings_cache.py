@@ -0,0 +1,80 @@
+"""
+benchmarks/bench_listings_cache.py — 원본 CSV 파싱 vs 타입 지정 parquet 캐시
+==============================================================================
+
+실행:
+    python benchmarks/bench_listings_cache.py [--runs 5]
+
+app.load_data() 와 같은 작업(리스팅 로드 + district_clustered 병합)을 매 회 새
+파이썬 프로세스에서 실행해 로드 시간, 로드 전후 RSS 증가분, DataFrame 메모리를
+비교합니다 (pyarrow 는 streamlit 이 이미 올려 두므로 기준선에 포함).
+data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _synth import ROOT, raw_listings_csv
+from listings_cache import build_cache
+
+_CHILD = r"""
+import json, sys, time
+import pandas as pd
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(l.split()[1]) for l in f if l.startswith("VmRSS"))
+
+mode, csv_path, cache_path = sys.argv[1:4]
+import pyarrow.parquet  # streamlit 이 이미 import 하는 라이브러리 — 두 경로 모두 RSS 기준선에 포함
+from listings_cache import load_listings
+cluster_df = pd.read_csv("data/processed/district_clustered.csv")
+rss0 = rss_kb()
+t0 = time.perf_counter()
+if mode == "csv":
+    df = pd.read_csv(csv_path)
+else:
+    df = load_listings(csv_path=csv_path, cache_path=cache_path)
+df = df.merge(cluster_df[["district", "cluster", "cluster_name"]], on="district", how="left")
+elapsed = time.perf_counter() - t0
+print(json.dumps(dict(load_ms=elapsed * 1000, rss_delta_kb=rss_kb() - rss0,
+                      df_mb=df.memory_usage(deep=True).sum() / 1e6, shape=list(df.shape))))
+"""
+
+
+def _run(mode, csv_path, cache_path):
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", _CHILD, mode, str(csv_path),
+                          str(cache_path)], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    csv_path = raw_listings_csv()
+    cache_path = Path(tempfile.mkdtemp()) / "listings.parquet"
+    t0 = time.perf_counter()
+    build_cache(csv_path, cache_path)
+    print(f"원본: {csv_path} ({csv_path.stat().st_size / 1e6:.1f} MB)")
+    print(f"캐시 생성 {(time.perf_counter() - t0) * 1000:.0f} ms → "
+          f"{cache_path.stat().st_size / 1e6:.1f} MB\n")
+
+    print(f"{'path':<28} | {'load ms':>8} | {'RSS +MB':>8} | {'DataFrame MB':>12} | shape")
+    for label, mode in (("read_csv (42 cols)", "csv"), ("parquet cache (APP_COLUMNS)", "cache")):
+        runs = [_run(mode, csv_path, cache_path) for _ in range(args.runs)]
+        load = statistics.median(r["load_ms"] for r in runs)
+        rss = statistics.median(r["rss_delta_kb"] for r in runs) / 1024
+        last = runs[-1]
+        print(f"{label:<28} | {load:>8.0f} | {rss:>8.1f} | {last['df_mb']:>12.1f} | {tuple(last['shape'])}")
+
+
+if __name__ == "__main__":
+    main()
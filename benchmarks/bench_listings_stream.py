@@ -0,0 +1,127 @@
+"""
+benchmarks/bench_listings_stream.py — 스트리밍 집계(listings_stream.py)의 피크 메모리·처리량·정확도
+=====================================================================================================
+
+실행:
+    python benchmarks/bench_listings_stream.py [--copies 1 4 8] [--chunk-sizes 10000 50000]
+
+원본 CSV(없으면 _synth 합성 32,061행)를 copies 배로 이어 붙인 파일을 만들고, 각 파일에서
+
+    in-memory : pd.read_csv 전체 + Active+Operating 사본 (지금 load_data 방식)
+                + compute_district_features + build_benchmark_index (정확값)
+    stream    : stream_aggregates(chunk_size) — 청크 1개 + 스케치만 보관
+
+을 별도 프로세스로 돌려 피크 RSS 증가분(pandas import 이후 기준)과 rows/s 를 잽니다.
+stream 의 메모리는 파일 크기가 아니라 chunk_size 에 따라 늘어야 합니다.
+1배 파일에서는 스트리밍 결과를 compute_district_features / build_benchmark_index (정확값)와
+비교합니다 — 평균·개수는 같아야 하고, 분위수는 KLL 근사 오차만큼 다릅니다.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _synth import ROOT, raw_listings_csv
+
+_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+from listings_stream import active_mask, stream_aggregates
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if {mode!r} == "stream":
+    agg = stream_aggregates({csv!r}, chunk_size={chunk})
+    rows = agg.rows
+else:
+    from benchmark_table import build_benchmark_index
+    from district_features import compute_district_features
+    df = pd.read_csv({csv!r})
+    active = df[active_mask(df)].copy()
+    compute_district_features(active, pd.read_csv({clustered!r}))
+    build_benchmark_index(df)
+    rows = len(df)
+print(json.dumps({{"rows": rows, "seconds": time.perf_counter() - t0,
+                  "peak_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024}}))
+"""
+
+
+def _probe(mode: str, csv: Path, chunk: int = 0) -> dict:
+    code = _PROBE.format(root=str(ROOT), mode=mode, csv=str(csv), chunk=chunk,
+                         clustered=str(ROOT / "data" / "processed" / "district_clustered.csv"))
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _replicate(src: Path, copies: int, out_dir: Path) -> Path:
+    """src 의 데이터 행을 copies 번 이어 붙인 CSV (헤더 1줄)."""
+    if copies == 1:
+        return src
+    dst = out_dir / f"listings_x{copies}.csv"
+    with open(src, "rb") as f:
+        header, body = f.readline(), f.read()
+    with open(dst, "wb") as f:
+        f.write(header)
+        for _ in range(copies):
+            f.write(body)
+    return dst
+
+
+def _accuracy(csv: Path) -> None:
+    from benchmark_table import build_benchmark_index
+    from district_features import compute_district_features
+    from listings_stream import active_mask, stream_aggregates
+
+    cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    agg = stream_aggregates(csv)
+    df = pd.read_csv(csv)
+    exact = compute_district_features(df[active_mask(df)], cluster_df)
+    approx = agg.district_features(cluster_df)
+    mean_cols = [c for c in exact.columns if c != "district_median_revpar"]
+    mean_err = np.nanmax(np.abs(approx[mean_cols].to_numpy(float) - exact[mean_cols].to_numpy(float)))
+    med_err = np.max(np.abs(approx["district_median_revpar"] / exact["district_median_revpar"] - 1))
+
+    bi, si = build_benchmark_index(df), agg.benchmark_index()
+    rel, n_exact, n_total = [], 0, 0
+    for key in bi.cell_keys():
+        a, b = bi.cell(*key), si.cell(*key)
+        assert len(a) == len(b), key
+        for c, q in a.quantiles.items():
+            n_total += 1
+            n_exact += np.allclose(q, b.quantiles[c], rtol=0, atol=1e-9)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = np.abs(b.quantiles[c][[4, 9, 14]] / q[[4, 9, 14]] - 1)   # P25/P50/P75
+            rel.append(np.nanmax(np.where(np.isfinite(r), r, 0)))
+    print(f"\n정확도 (1배 파일, 정확값 대비): 자치구 평균·개수 최대 차이 {mean_err:.1e} · "
+          f"자치구 RevPAR 중앙값 최대 상대 오차 {med_err:.2%}")
+    print(f"  벤치마크 셀 {len(bi)}개 · 셀×컬럼 {n_total}개 중 P5…P95 정확 일치 {n_exact}개, "
+          f"P25/P50/P75 상대 오차 최대 {max(rel):.2%} · 중앙값 {np.median(rel):.2%}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--copies", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--chunk-sizes", type=int, nargs="+", default=[10_000, 50_000])
+    args = ap.parse_args()
+
+    src = raw_listings_csv()
+    out_dir = Path(tempfile.mkdtemp())
+    print(f"{'파일':>10} | {'방식':<18} | {'피크 +MB':>9} | {'행/s':>10}")
+    for copies in args.copies:
+        csv = _replicate(src, copies, out_dir)
+        runs = [("in-memory", _probe("memory", csv))]
+        runs += [(f"stream {c:,}", _probe("stream", csv, c)) for c in args.chunk_sizes]
+        for label, r in runs:
+            print(f"{r['rows']:>10,} | {label:<18} | {r['peak_mb']:>9.1f} | {r['rows'] / r['seconds']:>10,.0f}")
+    _accuracy(src)
+
+
+if __name__ == "__main__":
+    main()
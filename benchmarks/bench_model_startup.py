@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_model_startup.py — pickle 로드 vs mmap 번들 로드 콜드 스타트
+===============================================================================
+
+실행:
+    python benchmarks/bench_model_startup.py [--runs 5]
+
+새 워커 프로세스가 뜰 때와 같은 조건으로, 매 회 새 파이썬 프로세스에서
+`import predict_utils` + load_models() + predict_revpar() 1회까지의 시간을
+잽니다. 리눅스에서는 로드 직후 RSS 와 그중 파일 매핑(공유 가능) 크기도 출력합니다.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from _synth import ROOT
+
+_CHILD = r"""
+import json, time, sys
+t0 = time.perf_counter()
+from predict_utils import load_models, predict_revpar
+t_import = time.perf_counter()
+artifacts = load_models(**{kwargs})
+t_load = time.perf_counter()
+listing = {listing}
+predict_revpar(listing, 500_000, **artifacts)
+t_pred = time.perf_counter()
+
+rss = shared = None
+try:
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+    kb = lambda k: int(fields[k].split()[0])
+    rss, shared = kb("Rss"), kb("Shared_Clean") + kb("Private_Clean")
+except OSError:
+    pass
+print(json.dumps(dict(
+    import_ms=(t_import - t0) * 1000, load_ms=(t_load - t_import) * 1000,
+    first_pred_ms=(t_pred - t_load) * 1000, total_ms=(t_pred - t0) * 1000,
+    sklearn="sklearn" in sys.modules, lightgbm="lightgbm" in sys.modules,
+    rss_kb=rss, file_backed_kb=shared,
+)))
+"""
+
+_LISTING = {
+    "cluster": 2, "nearest_poi_dist_km": 0.5, "poi_dist_category": "보통",
+    "bedrooms": 2, "baths": 1, "guests": 4, "room_type": "entire_home",
+    "nearest_poi_type_name": "관광지", "district_median_revpar": 50000,
+    "district_listing_count": 800, "district_superhost_rate": 0.25,
+    "district_entire_home_rate": 0.70, "ttm_pop": 100000, "min_nights": 2,
+    "instant_book": 1, "superhost": 1, "rating_overall": 4.8, "photos_count": 25,
+    "num_reviews": 50, "extra_guest_fee_policy": "1", "photos_tier": "중상",
+    "is_active_operating": 1, "ttm_avg_rate": 120000,
+}
+
+_PATHS = {
+    "pickle (lightgbm)": {"engine": "lightgbm"},
+    "pickle (numpy)": {"engine": "numpy"},
+    "bundle (mmap)": {"fmt": "bundle"},
+}
+
+
+def _run(kwargs):
+    code = _CHILD.replace("{kwargs}", repr(kwargs)).replace("{listing}", repr(_LISTING))
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'path':<18} | {'import ms':>9} | {'load ms':>8} | {'1st pred ms':>11} | "
+          f"{'total ms':>8} | {'RSS MB':>6} | {'file-backed MB':>14} | sklearn/lightgbm")
+    for label, kwargs in _PATHS.items():
+        runs = [_run(kwargs) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs)
+               for k in ("import_ms", "load_ms", "first_pred_ms", "total_ms")}
+        last = runs[-1]
+        rss = f"{last['rss_kb'] / 1024:6.0f}" if last["rss_kb"] else "     -"
+        fb = f"{last['file_backed_kb'] / 1024:14.0f}" if last["file_backed_kb"] else " " * 13 + "-"
+        print(f"{label:<18} | {med['import_ms']:>9.0f} | {med['load_ms']:>8.0f} | "
+              f"{med['first_pred_ms']:>11.1f} | {med['total_ms']:>8.0f} | {rss} | {fb} | "
+              f"{last['sklearn']}/{last['lightgbm']}")
+
+
+if __name__ == "__main__":
+    main()
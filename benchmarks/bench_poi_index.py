@@ -0,0 +1,89 @@
+"""
+benchmarks/bench_poi_index.py — 전수 haversine vs PoiIndex 격자
+================================================================
+
+실행:
+    python benchmarks/bench_poi_index.py [--chunk 1000]
+
+리스팅 좌표(latitude_masked / longitude_masked) 전체에 대해 최근접 POI 와 500m 이내
+POI 수를 N×M 전수 haversine(청크 단위)과 PoiIndex 로 구하고, 시간과 결과 일치
+여부를 비교합니다. data/raw 원본이 없으면 같은 스키마의 합성 CSV(32,061행)를 씁니다.
+poi_dist_category 경계값·NaN(→ None) 결과도 확인합니다 (실패 시 종료 코드 1).
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from _synth import raw_listings_csv
+from poi_index import PoiIndex, haversine_km, poi_dist_category
+
+# (거리 km, 기대 범주) — NaN 은 None 이어야 인코더가 결측 기본값(-1)으로 보냄
+_CATEGORY_CASES = [(0.0, "초근접"), (0.2, "근접"), (0.49, "근접"), (0.5, "보통"),
+                   (1.0, "원거리"), (7.5, "원거리"), (np.nan, None)]
+
+
+def _brute(poi, lat, lng, chunk):
+    dist = np.empty(len(lat))
+    idx = np.empty(len(lat), dtype=np.int64)
+    n500 = np.empty(len(lat), dtype=np.int64)
+    for s in range(0, len(lat), chunk):
+        d = haversine_km(lat[s:s + chunk, None], lng[s:s + chunk, None], poi.lat[None], poi.lng[None])
+        idx[s:s + chunk] = d.argmin(axis=1)
+        dist[s:s + chunk] = d.min(axis=1)
+        n500[s:s + chunk] = (d <= 0.5).sum(axis=1)
+    return dist, idx, n500
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunk", type=int, default=1000)
+    args = ap.parse_args()
+
+    coords = pd.read_csv(raw_listings_csv(), usecols=["latitude_masked", "longitude_masked"])
+    lat = coords["latitude_masked"].to_numpy(np.float64)
+    lng = coords["longitude_masked"].to_numpy(np.float64)
+
+    t0 = time.perf_counter()
+    poi = PoiIndex.from_csv()
+    print(f"PoiIndex.from_csv: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({len(poi):,}개 POI, 셀 {poi.cell_km} km)")
+
+    t0 = time.perf_counter()
+    b_dist, b_idx, b_500 = _brute(poi, lat, lng, args.chunk)
+    t_brute = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    dist, idx = poi.nearest(lat, lng)
+    t_near = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    n500 = poi.count_within(lat, lng, 0.5)
+    t_count = time.perf_counter() - t0
+
+    print(f"{len(lat):,}개 좌표")
+    print(f"  전수 비교 (최근접 + 500m)  {t_brute * 1000:8.0f} ms")
+    print(f"  PoiIndex 최근접           {t_near * 1000:8.0f} ms")
+    print(f"  PoiIndex 500m 이내 개수    {t_count * 1000:8.0f} ms "
+          f"(합계 {(t_near + t_count) * 1000:.0f} ms, {t_brute / (t_near + t_count):.0f}x)")
+    print(f"  최근접 POI 일치 {np.array_equal(idx, b_idx)} · 거리 최대 오차 "
+          f"{np.abs(dist - b_dist).max():.2g} km · 500m 개수 일치 {np.array_equal(n500, b_500)}")
+
+    t0 = time.perf_counter()
+    for la, ln in zip(lat[:1000], lng[:1000]):
+        poi.nearest(la, ln)
+    print(f"  단일 좌표 질의             {(time.perf_counter() - t0) * 1000:8.3f} µs/건")
+
+    km = np.array([k for k, _ in _CATEGORY_CASES])
+    expected = [c for _, c in _CATEGORY_CASES]
+    ok = (list(poi_dist_category(km)) == expected
+          and [poi_dist_category(float(k)) for k in km] == expected)
+    print(f"  poi_dist_category 경계값·NaN 일치 {ok}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
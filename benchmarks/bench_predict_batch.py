@@ -0,0 +1,78 @@
+"""
+benchmarks/bench_predict_batch.py — predict_revpar vs predict_revpar_batch 처리량
+==================================================================================
+
+실행:
+    python benchmarks/bench_predict_batch.py [--sizes 1 1000 100000] [--loop-max 1000]
+
+각 배치 크기에서 rows/s를 출력합니다. 단일 예측 루프는 --loop-max 행까지만
+실측하고, 그보다 큰 배치는 실측 rows/s로 소요 시간을 추정합니다.
+샘플 행에 대해 단일 예측과 배치 예측 값이 일치하는지도 확인합니다 (rel_dist·
+ttm_avg_rate 에 NaN·None 을 섞은 행 포함).
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from _synth import synthetic_listings
+from predict_utils import load_models, predict_revpar, predict_revpar_batch
+
+_COLS = ["ADR_pred", "Occ_pred", "RevPAR_pred", "net_profit"]
+
+
+def _with_missing(df):
+    """선택 컬럼에 NaN·None 을 섞은 사본 — 두 경로의 결측 기본값이 같은지 확인용."""
+    df = df.copy()
+    for j, col in enumerate(("photos_rel_dist", "rating_rel_dist", "ttm_avg_rate")):
+        df[col] = df[col].astype(object)
+        df.iloc[j::7, df.columns.get_loc(col)] = np.nan
+        df.iloc[j + 3::7, df.columns.get_loc(col)] = None
+    return df
+
+
+def _check_parity(df, opex, artifacts, n_check=200):
+    df = _with_missing(df.iloc[:n_check])
+    batch = predict_revpar_batch(df.iloc[:n_check], opex[:n_check], **artifacts)
+    for i, rec in enumerate(df.iloc[:n_check].to_dict("records")):
+        single = predict_revpar(rec, opex[i], **artifacts)
+        for c in _COLS:
+            if single[c] != batch[c].iat[i]:
+                raise AssertionError(f"row {i} {c}: single={single[c]!r} batch={batch[c].iat[i]!r}")
+    print(f"parity OK — {n_check}행 단일/배치 결과 일치 (NaN·None 선택 컬럼 포함)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 1_000, 100_000])
+    ap.add_argument("--loop-max", type=int, default=1_000)
+    args = ap.parse_args()
+
+    artifacts = load_models()
+    df_all = synthetic_listings(max(args.sizes))
+    opex_all = np.random.default_rng(1).uniform(300_000, 900_000, len(df_all))
+    _check_parity(df_all, opex_all, artifacts)
+
+    print(f"{'rows':>8} | {'single loop rows/s':>18} | {'batch rows/s':>12} | speedup")
+    for n in args.sizes:
+        df, opex = df_all.iloc[:n], opex_all[:n]
+
+        m = min(n, args.loop_max)
+        records = df.iloc[:m].to_dict("records")
+        t0 = time.perf_counter()
+        for rec, o in zip(records, opex[:m]):
+            predict_revpar(rec, o, **artifacts)
+        loop_rps = m / (time.perf_counter() - t0)
+
+        predict_revpar_batch(df.iloc[:1], opex[:1], **artifacts)  # warm-up
+        t0 = time.perf_counter()
+        predict_revpar_batch(df, opex, **artifacts)
+        batch_rps = n / (time.perf_counter() - t0)
+
+        est = "" if m == n else " (loop 추정)"
+        print(f"{n:>8,} | {loop_rps:>18,.0f} | {batch_rps:>12,.0f} | {batch_rps / loop_rps:6.1f}x{est}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_prediction_cache.py — predict_revpar 직접 호출 vs PredictionCache
+==================================================================================
+
+실행:
+    python benchmarks/bench_prediction_cache.py [--requests 20000] [--configs 3000] [--maxsize 1024]
+
+합성 리스팅 --configs 개를 Zipf 인기도로 뽑아 --requests 번 예측하는 워크로드
+(같은 구성을 여러 호스트·재방문이 반복)를 만들고,
+
+    - 직접 호출과 캐시 경유의 요청당 시간, 적중률·축출 수
+    - 모든 요청에서 두 경로 결과가 같은지 (운영비는 요청마다 다름)
+    - --threads 개 스레드가 한 캐시를 공유할 때 카운터 합·크기 상한
+    - 가득 찬 캐시의 메모리 (tracemalloc)
+
+를 출력합니다.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import time
+import tracemalloc
+
+import numpy as np
+
+from _synth import synthetic_listings
+from prediction_cache import PredictionCache
+from predict_utils import load_models, models_version, predict_revpar
+
+_KEYS = ("ADR_pred", "Occ_pred", "RevPAR_pred", "monthly_revenue", "net_profit")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--configs", type=int, default=3_000)
+    ap.add_argument("--maxsize", type=int, default=1_024)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--zipf", type=float, default=1.2)
+    args = ap.parse_args()
+
+    artifacts = load_models(fmt="bundle")
+    version = models_version(fmt="bundle")
+    configs = synthetic_listings(args.configs).to_dict("records")
+    rng = np.random.default_rng(0)
+    picks = (rng.zipf(args.zipf, args.requests) - 1) % args.configs
+    opex = rng.integers(20, 120, args.requests) * 10_000
+    print(f"요청 {args.requests:,}개 · 구성 {args.configs:,}개 (고유 {len(np.unique(picks)):,}) · "
+          f"zipf {args.zipf} · maxsize {args.maxsize:,}\n")
+
+    t0 = time.perf_counter()
+    direct = [predict_revpar(configs[i], o, **artifacts) for i, o in zip(picks, opex)]
+    t_direct = time.perf_counter() - t0
+
+    cache = PredictionCache(args.maxsize)
+    t0 = time.perf_counter()
+    cached = [cache.predict(configs[i], o, version=version, **artifacts) for i, o in zip(picks, opex)]
+    t_cached = time.perf_counter() - t0
+
+    diff = max(abs(a[k] - b[k]) for a, b in zip(direct, cached) for k in _KEYS)
+    s = cache.stats()
+    print(f"{'path':<10} | {'µs/req':>8} | {'hit rate':>8} | {'evictions':>9}")
+    print(f"{'direct':<10} | {t_direct / args.requests * 1e6:>8.1f} | {'-':>8} | {'-':>9}")
+    print(f"{'cached':<10} | {t_cached / args.requests * 1e6:>8.1f} | {s['hit_rate']:>8.1%} | "
+          f"{s['evictions']:>9,}")
+    print(f"\n결과 최대 오차 (직접 vs 캐시): {diff:.3g}")
+
+    # ── 여러 세션(스레드)이 한 캐시를 공유 ────────────────────────────────────
+    shared = PredictionCache(args.maxsize)
+
+    def session(offset):
+        for j in range(offset, args.requests, args.threads):
+            shared.predict(configs[picks[j]], opex[j], version=version, **artifacts)
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(session, range(args.threads)))
+    s = shared.stats()
+    assert s["hits"] + s["misses"] == args.requests and s["size"] <= args.maxsize
+    print(f"{args.threads} 스레드 공유: hits {s['hits']:,} + misses {s['misses']:,} = {args.requests:,} · "
+          f"size {s['size']:,} ≤ {args.maxsize:,} · evictions {s['evictions']:,}")
+
+    # ── 가득 찬 캐시 메모리 ─────────────────────────────────────────────────
+    tracemalloc.start()
+    full = PredictionCache(args.maxsize)
+    for i in range(args.maxsize):
+        full.predict(configs[i % args.configs], 0, version=f"{version}:{i}", **artifacts)
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"가득 찬 캐시 ({len(full):,}개): {mem / 1e6:.2f} MB ({mem / len(full):.0f} B/항목)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+benchmarks/bench_price_curve.py — 요금 그리드 루프 vs simulate_price_curve
+============================================================================
+
+실행:
+    python benchmarks/bench_price_curve.py [--points 81]
+
+같은 리스팅에 대해 요금 그리드 점마다 predict_revpar() 를 부르는 루프와,
+Model B 를 그리드 전체에 1회 호출하는 simulate_price_curve() 를 비교합니다.
+두 경로의 요금별 예약률이 같은지도 확인합니다.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from _synth import synthetic_listings
+from predict_utils import load_models, predict_revpar, simulate_price_curve
+
+
+def _best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, default=81)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    listing = synthetic_listings(1).iloc[0].to_dict()
+    prices = listing["ttm_avg_rate"] * (1 + np.linspace(-0.30, 0.50, args.points))
+
+    for engine in ("lightgbm", "numpy"):
+        artifacts = load_models(engine=engine)
+
+        def loop():
+            return np.array([predict_revpar({**listing, "ttm_avg_rate": p}, 500_000,
+                                            **artifacts)["Occ_pred"] for p in prices])
+
+        def batch():
+            return simulate_price_curve(listing, 500_000, prices=prices, **artifacts)["Occ_pred"]
+
+        diff = np.max(np.abs(loop() - batch()))
+        t_l = _best_ms(loop, args.repeat)
+        t_b = _best_ms(batch, args.repeat)
+        print(f"{engine:<8} | {args.points}점 루프 {t_l:7.2f} ms · 배치 {t_b:6.2f} ms "
+              f"({t_l / t_b:5.1f}x) · 예약률 최대 오차 {diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
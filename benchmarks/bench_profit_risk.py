@@ -0,0 +1,112 @@
+"""
+benchmarks/bench_profit_risk.py — 월 손익 몬테카를로(profit_risk.py)의 지연·캐시·수렴
+====================================================================================
+
+실행:
+    python benchmarks/bench_profit_risk.py [--n 100000] [--reps 50]
+
+원본 리스팅(없으면 _synth 합성 CSV)의 Active+Operating 행으로 엔진을 만들고
+
+    생성     : ProfitRiskEngine.from_listings() — 공통 난수 + 클러스터별 경험 분포
+    시뮬레이션: 캐시를 거치지 않는 simulate() (매번 다른 요금) — interval / empirical 각각
+               중앙값·최대 지연, 목표 100 ms 미만
+    캐시 적중: 같은 입력 묶음을 다시 부를 때의 지연
+    기준     : 호출마다 난수를 새로 뽑는 방식 (공통 난수 없음) — 난수 생성 비용 비교
+    수렴     : 시드를 바꾼 엔진 5개의 적자 확률·P10 흩어짐 (표본 오차)
+
+을 출력합니다. 100 ms 를 넘는 경로가 있으면 종료 코드 1.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from _synth import ROOT, raw_listings_csv
+from listings_stream import active_mask
+from profit_risk import FEE_RATE, OPEX_CV, ProfitRiskEngine
+
+BUDGET_MS = 100.0
+OPEX = {"전기세": 80_000, "수도세": 30_000, "관리비": 150_000, "인터넷": 33_000,
+        "청소비": 200_000, "대출이자": 700_000, "기타": 50_000}
+ADR, OCC = 110_000.0, 0.55
+# predict_revpar() 결과 모양의 80% 구간 (ADR log1p ±0.35, 예약률 ±0.18)
+INTERVAL = {"ADR_pred": ADR, "ADR_lo": np.expm1(np.log1p(ADR) - 0.35), "ADR_hi": np.expm1(np.log1p(ADR) + 0.35),
+            "Occ_pred": OCC, "Occ_lo": OCC - 0.18, "Occ_hi": OCC + 0.18}
+
+
+def _timed(fn, reps: int) -> np.ndarray:
+    out = np.empty(reps)
+    for i in range(reps):
+        t0 = time.perf_counter()
+        fn(i)
+        out[i] = (time.perf_counter() - t0) * 1000
+    return out
+
+
+def _fresh_draws(n: int, i: int) -> float:
+    """기준: 호출마다 난수를 새로 뽑아 같은 interval 시나리오를 계산."""
+    rng = np.random.default_rng(i)
+    z = rng.standard_normal((2 + len(OPEX_CV), n))
+    adr = np.expm1(np.log1p(ADR + i) + 0.35 / 1.2816 * z[0])
+    occ = np.clip(OCC + 0.18 / 1.2816 * z[1], 0, 1)
+    opex = sum(v * np.maximum(1 + cv * zz, 0) for (v, cv, zz) in
+               zip(OPEX.values(), OPEX_CV.values(), z[2:]))
+    profit = adr * occ * 30 * (1 - FEE_RATE) - opex
+    np.percentile(profit, (10, 50, 90))
+    return float((profit < 0).mean())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--reps", type=int, default=50)
+    args = ap.parse_args()
+
+    df = pd.read_csv(raw_listings_csv(), usecols=["refined_status", "operation_status", "district",
+                                                  "ttm_avg_rate", "ttm_occupancy"])
+    clusters = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")[["district", "cluster"]]
+    active = df[active_mask(df)].merge(clusters, on="district", how="left")
+
+    t0 = time.perf_counter()
+    engine = ProfitRiskEngine.from_listings(active, n=args.n)
+    build_ms = (time.perf_counter() - t0) * 1000
+    cluster = max(engine.empirical, key=lambda c: len(engine.empirical[c][0]))
+    print(f"Active+Operating {len(active):,}행 · 클러스터 {len(engine.empirical)}개 · "
+          f"시나리오 {args.n:,}개 · 엔진 생성 {build_ms:.0f} ms\n")
+
+    runs = {
+        "interval": _timed(lambda i: engine.simulate(ADR + i, OCC, OPEX, interval=INTERVAL), args.reps),
+        "empirical": _timed(lambda i: engine.simulate(ADR + i, OCC, OPEX, source="empirical",
+                                                      cluster=cluster), args.reps),
+        "캐시 적중": _timed(lambda i: engine.simulate(ADR, OCC, OPEX, interval=INTERVAL), args.reps),
+        "기준(난수 매번)": _timed(lambda i: _fresh_draws(args.n, i), args.reps),
+    }
+    print(f"{'경로':<16} | {'중앙값 ms':>9} | {'최대 ms':>8}")
+    for label, ms in runs.items():
+        print(f"{label:<16} | {np.median(ms):>9.3f} | {ms.max():>8.3f}")
+
+    r = engine.simulate(ADR, OCC, OPEX, interval=INTERVAL)
+    e = engine.simulate(ADR, OCC, OPEX, source="empirical", cluster=cluster)
+    print(f"\n확정 계산 ₩{r['deterministic']:,.0f} (요금 ₩{ADR:,.0f} · 예약률 {OCC:.0%} · 운영비 "
+          f"₩{sum(OPEX.values()):,})")
+    for name, x in (("interval", r), ("empirical", e)):
+        print(f"  {name:<9}: 적자 확률 {x['loss_prob']:.1%} · P10 ₩{x['p10']:,.0f} · P50 ₩{x['p50']:,.0f} · "
+              f"P90 ₩{x['p90']:,.0f} · 하위 10% 평균 ₩{x['expected_shortfall']:,.0f}")
+
+    seeds = [ProfitRiskEngine(engine.empirical, n=args.n, seed=s).simulate(ADR, OCC, OPEX, interval=INTERVAL)
+             for s in range(5)]
+    loss, p10 = np.array([s["loss_prob"] for s in seeds]), np.array([s["p10"] for s in seeds])
+    print(f"\n시드 5개 흩어짐: 적자 확률 {loss.min():.2%}~{loss.max():.2%} · "
+          f"P10 ₩{p10.min():,.0f}~₩{p10.max():,.0f} · 캐시 {engine.stats()}")
+
+    slow = [k for k in ("interval", "empirical") if np.median(runs[k]) >= BUDGET_MS]
+    if slow:
+        print(f"목표 {BUDGET_MS:.0f} ms 초과: {slow}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+benchmarks/bench_quantile_sketch.py — 분위수 스케치(SketchTable)의 오차 한계 검사 + 증분·저장 비용
+====================================================================================================
+
+실행:
+    python benchmarks/bench_quantile_sketch.py [--ks 50 100 200] [--months 12]
+
+원본 리스팅(없으면 _synth 합성 CSV)의 Active+Operating 행으로
+
+    오차     : (district, room_type) 셀 × ttm_avg_rate·ttm_occupancy·ttm_revpar 의 P25/P50/P75
+               스케치 값과 np.percentile 정확값의 순위 오차·상대 오차. 셀 대부분은 k 보다 작아
+               정확값이므로, 서울 전체를 한 셀로 본 큰 셀(전체)도 함께 봅니다.
+               리스팅을 months 개 배치로 나눠 따로 만든 뒤 merge() 한 테이블로 잽니다
+               (월별 누적과 같은 경로).
+    검사     : 모든 질의의 순위 오차 ≤ rank_error_bound(k) 이어야 하며, 넘으면 종료 코드 1.
+    증분     : 새 배치 1,000행 update() 시간 vs 전체 재구성 시간
+    저장     : save()/load() 왕복 후 분위수 동일 여부, 파일 크기, quartiles() 조회 지연
+               (다른 지표로 load() 하면 ValueError 인지도)
+    테이블   : benchmark_table.npz 를 스냅숏에서 다시 만드는 write_benchmark_table() vs 저장소에
+               배치만 더하는 update_benchmark_table() 시간, 그리고 증분 결과가 (스냅숏 + 배치)를
+               한 번에 집계한 build_benchmark_index() 와 같은 리스팅 수·분위수인지
+
+순위 오차 = 스케치 값 v 의 연속 순위(np.percentile 보간의 역함수, 동점이면 구간)와 요청 분위 q 의
+거리 — 정확값이면 0.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _synth import raw_listings_csv
+from benchmark_table import (BENCH_COLUMNS, KEYS, build_benchmark_index, load_benchmark_index,
+                             update_benchmark_table, write_benchmark_table)
+from listings_stream import active_mask
+from quantile_sketch import SKETCH_METRICS, SketchTable, rank_error_bound
+
+QS = (25, 50, 75)
+
+
+def _rank_error(sorted_vals: np.ndarray, est: float, q: float) -> float:
+    """est 의 연속 순위(np.percentile linear 보간의 역함수, 동점은 구간)와 q 의 거리."""
+    n = len(sorted_vals)
+    if n == 1:
+        return 0.0
+    left = np.searchsorted(sorted_vals, est, side="left")
+    right = np.searchsorted(sorted_vals, est, side="right")
+    if left < right:                      # est 가 표본 값 — 동점 구간 전체
+        lo, hi = left, right - 1
+    elif left == 0 or left == n:          # 표본 범위 밖
+        lo = hi = 0 if left == 0 else n - 1
+    else:                                 # 인접 두 값 사이 — 보간 위치
+        a, b = sorted_vals[left - 1], sorted_vals[left]
+        lo = hi = left - 1 + (est - a) / (b - a)
+    lo, hi = lo / (n - 1), hi / (n - 1)
+    return max(0.0, lo - q, q - hi)
+
+
+def _build(active: pd.DataFrame, k: int, months: int) -> SketchTable:
+    """months 개 배치로 나눠 만든 테이블을 merge() — 월별 누적 경로."""
+    table = SketchTable(k=k)
+    for part in np.array_split(np.arange(len(active)), months):
+        table.merge(SketchTable(k=k).update(active.iloc[part]))
+    return table
+
+
+def _errors(table: SketchTable, groups: dict) -> pd.DataFrame:
+    rows = []
+    for key, frame in groups.items():
+        for m in SKETCH_METRICS:
+            vals = np.sort(frame[m].dropna().to_numpy(np.float64))
+            if not len(vals):
+                continue
+            est = table.percentile(*key, m, QS)
+            exact = np.percentile(vals, QS)
+            for q, e, x in zip(QS, est, exact):
+                rows.append({"cell": key, "metric": m, "n": len(vals), "q": q,
+                             "rank_err": _rank_error(vals, e, q / 100),
+                             "rel_err": abs(e / x - 1) if x else abs(e - x),
+                             "exact": e == x})
+    return pd.DataFrame(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ks", type=int, nargs="+", default=[50, 100, 200])
+    ap.add_argument("--months", type=int, default=12)
+    args = ap.parse_args()
+
+    df = pd.read_csv(raw_listings_csv(), usecols=["refined_status", "operation_status", *KEYS,
+                                                  *SKETCH_METRICS])
+    active = df[active_mask(df)].dropna(subset=list(KEYS)).reset_index(drop=True)
+    groups = {key: g for key, g in active.groupby(list(KEYS), sort=False)}
+    city = active.assign(district="전체", room_type="전체")
+    sizes = np.array([len(g) for g in groups.values()])
+    print(f"Active+Operating {len(active):,}행 · 셀 {len(groups)}개 (리스팅 수 중앙값 {np.median(sizes):.0f}, "
+          f"최대 {sizes.max():,}) · {args.months}개 배치 merge\n")
+
+    print(f"{'k':>4} | {'한계':>6} | {'셀 질의':>7} | {'정확':>6} | {'순위 오차 최대':>12} | "
+          f"{'상대 오차 최대':>12} | {'전체 셀 순위 오차':>15} | {'전체 셀 상대 오차':>15} | 결과")
+    failed = False
+    for k in args.ks:
+        bound = rank_error_bound(k)
+        cells = _errors(_build(active, k, args.months), groups)
+        whole = _errors(_build(city, k, args.months), {("전체", "전체"): city})
+        ok = cells["rank_err"].max() <= bound and whole["rank_err"].max() <= bound
+        failed |= not ok
+        print(f"{k:>4} | {bound:>6.2%} | {len(cells):>7,} | {cells['exact'].mean():>6.0%} | "
+              f"{cells['rank_err'].max():>12.3%} | {cells['rel_err'].max():>12.2%} | "
+              f"{whole['rank_err'].max():>15.3%} | {whole['rel_err'].max():>15.2%} | "
+              f"{'OK' if ok else '한계 초과'}")
+
+    # ── 증분 갱신 vs 재구성 ────────────────────────────────────────────────
+    table = _build(active, 200, args.months)
+    batch = active.sample(1_000, random_state=0, replace=len(active) < 1_000)
+    t0 = time.perf_counter()
+    SketchTable().update(active)
+    rebuild = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    table.update(batch)
+    incr = time.perf_counter() - t0
+    print(f"\n증분 update(1,000행): {incr * 1000:.1f} ms · 전체 재구성({len(active):,}행): {rebuild * 1000:.1f} ms")
+
+    # ── 저장 왕복·조회 ────────────────────────────────────────────────────
+    path = table.save(Path(tempfile.mkdtemp()) / "quantile_sketches.npz")
+    loaded = SketchTable.load(path, metrics=SKETCH_METRICS)
+    same = all(np.array_equal(table.percentile(*key, m, QS), loaded.percentile(*key, m, QS), equal_nan=True)
+               for key in table.cell_keys() for m in SKETCH_METRICS)
+    key = max(groups, key=lambda g: len(groups[g]))
+    t0 = time.perf_counter()
+    for _ in range(1_000):
+        loaded.quartiles(*key, "ttm_revpar")
+    query_us = (time.perf_counter() - t0) * 1000
+    print(f"저장 {path.stat().st_size / 1e3:.0f} KB · load 후 분위수 동일: {same} · "
+          f"quartiles() {query_us:.1f} µs (가장 큰 셀 {key})")
+
+    try:
+        SketchTable.load(path)   # 기본 STORE_METRICS ≠ 저장된 SKETCH_METRICS
+        checked = False
+    except ValueError:
+        checked = True
+    print(f"다른 지표로 load() → ValueError: {checked}")
+
+    # ── 테이블: 스냅숏 재생성 vs 저장소 증분 ───────────────────────────────
+    tmp = Path(tempfile.mkdtemp())
+    paths = {"csv_path": raw_listings_csv(), "cache_path": tmp / "listings.parquet",
+             "table_path": tmp / "benchmark_table.npz", "sketches_path": tmp / "quantile_sketches.npz"}
+    write_benchmark_table(**paths)   # 리스팅 캐시 생성 포함 — 시간에서 제외
+    t0 = time.perf_counter()
+    write_benchmark_table(**paths)
+    full = time.perf_counter() - t0
+    cols = ["refined_status", "operation_status", *KEYS, *BENCH_COLUMNS]
+    snapshot = pd.read_csv(paths["csv_path"], usecols=cols)
+    new = snapshot.sample(1_000, random_state=1).assign(ttm_avg_rate=lambda d: d["ttm_avg_rate"] * 1.1)
+    new.to_csv(tmp / "batch.csv", index=False)
+    t0 = time.perf_counter()
+    update_benchmark_table(tmp / "batch.csv", **paths)
+    step = time.perf_counter() - t0
+    got = load_benchmark_index(**{k: v for k, v in paths.items() if k != "sketches_path"})
+    both = pd.concat([snapshot, new], ignore_index=True)
+    want = build_benchmark_index(both)
+    want.add_empty(both[list(KEYS)].dropna().astype(str).itertuples(index=False, name=None))
+    match = sorted(got.cell_keys()) == sorted(want.cell_keys()) and all(
+        len(got.cell(*key)) == len(want.cell(*key)) and all(
+            np.allclose(got.cell(*key).quantiles.get(c, np.nan), want.cell(*key).quantiles.get(c, np.nan),
+                        rtol=1e-6, equal_nan=True) for c in BENCH_COLUMNS)
+        for key in want.cell_keys())
+    print(f"benchmark_table: 스냅숏 재생성 {full * 1000:.0f} ms · 배치 1,000행 증분 {step * 1000:.0f} ms · "
+          f"증분 = 스냅숏+배치 정확값: {match}")
+
+    if failed or not same or not checked or not match:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
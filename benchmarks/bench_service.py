@@ -0,0 +1,148 @@
+"""
+benchmarks/bench_service.py — revpar_service.py 부하 테스트 (마이크로 배칭 설정별)
+==================================================================================
+
+실행:
+    python benchmarks/bench_service.py [--clients 32] [--requests 3000] [--waits 0,2,5]
+
+설정마다 서비스를 별도 프로세스로 localhost 에 띄우고, 합성 리스팅(_synth)으로
+clients 개의 keep-alive 연결이 /predict 를 동시에 보냅니다.
+
+    no-batch : --max-batch 1 (요청마다 1건 배치)
+    wait=W   : --max-batch 64 --max-wait-ms W
+
+클라이언트 측 p50/p99 지연·처리량과 서버 /metrics 의 평균 배치 크기를 출력하고,
+서비스 응답이 같은 리스팅의 predict_revpar() 직접 호출과 같은지도 확인합니다 (요청 일부는
+ttm_avg_rate 를 null, photos_rel_dist 를 NaN 으로 보냄).
+부하 생성기와 서버가 같은 머신의 CPU 를 나눠 쓰므로 절대값보다 설정 간 비교로 보세요.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from _synth import ROOT, synthetic_listings
+from predict_utils import load_models, predict_revpar
+
+OPEX = 500_000
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _request(reader, writer, method: str, path: str, payload=None) -> dict:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f"{path} → {status}: {data}")
+    return data
+
+
+async def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        await _request(reader, writer, "GET", "/healthz")
+        writer.close()
+        return
+    raise TimeoutError("서비스가 뜨지 않았습니다")
+
+
+async def _load(port: int, bodies: list, clients: int) -> tuple[np.ndarray, float, list, dict]:
+    """clients 개 연결로 bodies 를 나눠 보내고 (지연 ms 배열, 경과 s, 응답들, 서버 지표)."""
+    latencies = np.zeros(len(bodies))
+    responses = [None] * len(bodies)
+
+    async def client(idx):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in idx:
+            t0 = time.perf_counter()
+            responses[i] = await _request(reader, writer, "POST", "/predict", bodies[i])
+            latencies[i] = (time.perf_counter() - t0) * 1000
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(range(c, len(bodies), clients)) for c in range(clients)))
+    elapsed = time.perf_counter() - t0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    metrics = await _request(reader, writer, "GET", "/metrics")
+    writer.close()
+    return latencies, elapsed, responses, metrics
+
+
+def _run(label: str, server_args: list, bodies: list, clients: int):
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, str(ROOT / "revpar_service.py"), "--port", str(port),
+                             *server_args], stdout=subprocess.DEVNULL, cwd=ROOT)
+    try:
+        asyncio.run(_wait_ready(port))
+        # 모델·스레드 예열 후 측정
+        asyncio.run(_load(port, bodies[:clients * 4], clients))
+        lat, elapsed, responses, metrics = asyncio.run(_load(port, bodies, clients))
+    finally:
+        proc.terminate()
+        proc.wait()
+    batching = metrics["batching"]
+    print(f"{label:<10} | {np.percentile(lat, 50):>8.2f} | {np.percentile(lat, 99):>8.2f} | "
+          f"{len(bodies) / elapsed:>9,.0f} | {batching['mean_size']:>10.1f} | {batching['max_size']:>6}")
+    return responses
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=3000)
+    ap.add_argument("--waits", default="0,2,5", help="비교할 --max-wait-ms 값 (쉼표 구분)")
+    ap.add_argument("--fmt", choices=("bundle", "pickle"), default="bundle")
+    args = ap.parse_args()
+
+    df = synthetic_listings(args.requests, seed=7)
+    listings = json.loads(df.to_json(orient="records"))
+    for i in range(0, len(listings), 5):      # 선택 입력 결측 — null 과 NaN
+        listings[i]["ttm_avg_rate"] = None
+        listings[i + 2 if i + 2 < len(listings) else i]["photos_rel_dist"] = float("nan")
+    bodies = [{"listing": rec, "opex": OPEX} for rec in listings]
+    print(f"/predict {args.requests:,}건 · 동시 연결 {args.clients}개 · 모델 {args.fmt}\n")
+    print(f"{'설정':<10} | {'p50 ms':>8} | {'p99 ms':>8} | {'req/s':>9} | {'평균 배치':>10} | {'최대':>6}")
+
+    runs = {"no-batch": _run("no-batch", ["--fmt", args.fmt, "--max-batch", "1"], bodies, args.clients)}
+    for w in args.waits.split(","):
+        label = f"wait={w}ms"
+        runs[label] = _run(label, ["--fmt", args.fmt, "--max-wait-ms", w], bodies, args.clients)
+
+    # 응답 일치 — 배칭 여부와 관계없이 predict_revpar 직접 호출과 같아야 함
+    artifacts = load_models()
+    sample = range(0, len(listings), 7)      # 5 와 서로소 — null·NaN 행이 고르게 섞임
+    expect = [predict_revpar(listings[i], OPEX, **artifacts) for i in sample]
+    for label, responses in runs.items():
+        err = {c: np.max(np.abs([responses[i][c] - e[c] for i, e in zip(sample, expect)]))
+               for c in ("Occ_pred", "RevPAR_pred")}
+        print(f"\n{label}: predict_revpar 직접 호출과 최대 차이 Occ {err['Occ_pred']:.2e} · "
+              f"RevPAR {err['RevPAR_pred']:.2e} 원 ({len(expect)}건, null·NaN 입력 포함)", end="")
+    print()
+
+
+if __name__ == "__main__":
+    main()
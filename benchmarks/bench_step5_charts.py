@@ -0,0 +1,168 @@
+"""
+benchmarks/bench_step5_charts.py — step5 차트 렌더링: matplotlib(st.pyplot) vs Plotly(charts.py)
+================================================================================================
+
+실행:
+    python benchmarks/bench_step5_charts.py [--repeat 10]
+
+step5 재실행 1회에 서버가 차트 3개(운영비 파이, 순이익 곡선, 포지셔닝 사분면)에 쓰는
+시간을 비교합니다.
+
+    matplotlib : 이전 app.py 코드 그대로 plt.subplots → tight_layout → st.pyplot 과 같은
+                 savefig(png, dpi=200, bbox_inches="tight")
+    plotly     : charts.py 그림 생성 + st.plotly_chart 와 같은 검증·JSON 직렬화.
+                 포지셔닝 배경은 클러스터별 1회(콜드)만 만들고 재실행마다 별만 얹음
+
+클러스터 산점도는 합성 원본(32,061행)에서 가장 큰 클러스터를 씁니다. 앱은 더 이상
+matplotlib 을 쓰지 않으므로, 이 비교를 돌리려면 matplotlib 이 따로 설치돼 있어야 합니다.
+"""
+
+import argparse
+import io
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import plotly.io as pio
+import plotly.tools
+
+from _synth import ROOT, synthetic_raw_listings
+from charts import opex_pie, positioning_base, positioning_chart, profit_curve
+from predict_utils import PercentileIndex
+
+_OPEX = {"전기세": 80_000, "수도세": 30_000, "관리비": 150_000, "인터넷": 30_000,
+         "청소비": 200_000, "대출이자": 0, "기타": 50_000}
+_DELTAS = np.linspace(-0.30, 0.50, 81)
+
+
+def _st_pyplot(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+
+def _st_plotly(fig):
+    fig = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    return len(pio.to_json(fig, validate=False))
+
+
+# ── 이전 app.py 의 matplotlib 코드 ────────────────────────────────────────────
+def mpl_pie(opex_items):
+    nonzero = {k: v for k, v in opex_items.items() if v > 0}
+    fig, ax = plt.subplots(figsize=(4.5, 4))
+    colors = ["#FF5A5F", "#FF8A8D", "#FFB3B5", "#00A699", "#4DB6AC", "#FFB400", "#EBEBEB"]
+    ax.pie(nonzero.values(), labels=nonzero.keys(), autopct="%1.0f%%", startangle=90,
+           colors=colors[:len(nonzero)], textprops={"fontsize": 10},
+           wedgeprops={"linewidth": 1, "edgecolor": "white"})
+    ax.set_title(f"월 운영비 구성 (총 ₩{sum(opex_items.values()):,})", fontsize=11)
+    fig.patch.set_facecolor("#FAFAFA")
+    fig.tight_layout()
+    return _st_pyplot(fig)
+
+
+def mpl_profit(profits, delta_pct, new_net, band):
+    fig4, ax4 = plt.subplots(figsize=(5.5, 4))
+    ax4.plot(_DELTAS * 100, profits, color="#FF5A5F", linewidth=2.5)
+    ax4.axhline(0, color="#767676", linestyle="--", lw=1.2, alpha=0.6, label="손익분기선")
+    ax4.axvline(delta_pct, color="#FFB400", linestyle="--", lw=1.5, label=f"현재 ({delta_pct:+d}%)")
+    ax4.scatter([delta_pct], [new_net], color="#FFB400", s=70, zorder=6)
+    ax4.fill_between(_DELTAS * 100, profits, 0, where=profits > 0, alpha=0.07, color="#4CAF50")
+    ax4.fill_between(_DELTAS * 100, profits, 0, where=profits <= 0, alpha=0.07, color="#FF5A5F")
+    ax4.axvspan(max(band[0], -30), min(band[1], 50), alpha=0.06, color="#767676", label="클러스터 Q1~Q3")
+    ax4.set_xlabel("요금 변화율 (%)")
+    ax4.set_ylabel("월 순이익 (원)")
+    ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda y, _: f"₩{y/10000:.0f}만"))
+    ax4.legend(fontsize=8)
+    ax4.spines["top"].set_visible(False)
+    ax4.spines["right"].set_visible(False)
+    ax4.set_facecolor("#FAFAFA")
+    fig4.patch.set_facecolor("#FAFAFA")
+    fig4.tight_layout()
+    return _st_pyplot(fig4)
+
+
+def mpl_quadrant(adr_pct, occ_pct, ux, uy, title):
+    fig_q, ax_q = plt.subplots(figsize=(5, 5))
+    for y0, y1, x0, x1, c in ((50, 100, 0, 0.5, "#FFB400"), (50, 100, 0.5, 1.0, "#2E7D32"),
+                              (0, 50, 0, 0.5, "#C62828"), (0, 50, 0.5, 1.0, "#FF8C00")):
+        ax_q.axhspan(y0, y1, xmin=x0, xmax=x1, alpha=0.06, color=c)
+    ax_q.axhline(50, color="#CCCCCC", lw=1, ls="--")
+    ax_q.axvline(50, color="#CCCCCC", lw=1, ls="--")
+    for x, y, t, c in ((25, 75, "물량형", "#B45309"), (75, 75, "고수익형", "#1B5E20"),
+                       (25, 25, "침체형", "#B71C1C"), (75, 25, "고가위험형", "#E65100")):
+        ax_q.text(x, y, t, ha="center", va="center", fontsize=9, color=c, alpha=0.7)
+    ax_q.scatter(adr_pct, occ_pct, s=15, alpha=0.18, color="#9CA3AF", zorder=2)
+    ax_q.scatter([ux], [uy], s=200, marker="*", color="#FF5A5F", zorder=5, label="내 숙소")
+    ax_q.annotate("내 숙소", (ux, uy), textcoords="offset points", xytext=(8, 6),
+                  fontsize=9, color="#FF5A5F", fontweight="bold")
+    ax_q.set_xlim(0, 100)
+    ax_q.set_ylim(0, 100)
+    ax_q.set_xlabel("ADR 분위 (클러스터 내, %)", fontsize=9)
+    ax_q.set_ylabel("예약률 분위 (클러스터 내, %)", fontsize=9)
+    ax_q.set_title(title, fontsize=10, fontweight="bold")
+    ax_q.spines["top"].set_visible(False)
+    ax_q.spines["right"].set_visible(False)
+    ax_q.set_facecolor("#FAFAFA")
+    fig_q.patch.set_facecolor("#FAFAFA")
+    fig_q.tight_layout()
+    return _st_pyplot(fig_q)
+
+
+def _median_ms(fn, repeat):
+    times, size = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    raw = synthetic_raw_listings()
+    cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    raw = raw.merge(cluster_df[["district", "cluster"]], on="district", how="left")
+    cid = int(raw["cluster"].value_counts().idxmax())
+    grp = raw[raw["cluster"] == cid]
+    pct = PercentileIndex.from_frame(grp, ("ttm_avg_rate", "ttm_occupancy"))
+    adr_pct = pct.ranks("ttm_avg_rate", grp["ttm_avg_rate"], nan_rank=50.0)
+    occ_pct = pct.ranks("ttm_occupancy", grp["ttm_occupancy"], nan_rank=50.0)
+
+    my_adr, my_occ, opex = 100_000, 0.45, sum(_OPEX.values())
+    profits = my_adr * (1 + _DELTAS) * np.clip(my_occ * (1 - 0.8 * _DELTAS), 0, 1) * 30 * 0.97 - opex
+    band = (-20.0, 25.0)
+    title = "포지셔닝"
+
+    t0 = time.perf_counter()
+    base = positioning_base(adr_pct, occ_pct, title)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    cases = (
+        ("운영비 파이", lambda: mpl_pie(_OPEX), lambda: _st_plotly(opex_pie(_OPEX))),
+        ("순이익 곡선", lambda: mpl_profit(profits, 20, profits[50], band),
+         lambda: _st_plotly(profit_curve(_DELTAS, profits, 20, profits[50], band))),
+        (f"포지셔닝 ({len(grp):,}점)", lambda: mpl_quadrant(adr_pct, occ_pct, 62.0, 35.0, title),
+         lambda: _st_plotly(positioning_chart(base, 62.0, 35.0))),
+    )
+    print(f"{'chart':<22} | {'matplotlib ms':>13} | {'plotly ms':>9} | {'png KB':>7} | {'json KB':>7}")
+    tot_m = tot_p = 0.0
+    for label, mpl_fn, plotly_fn in cases:
+        m, png = _median_ms(mpl_fn, args.repeat)
+        p, js = _median_ms(plotly_fn, args.repeat)
+        tot_m, tot_p = tot_m + m, tot_p + p
+        print(f"{label:<22} | {m:>13.1f} | {p:>9.1f} | {png / 1e3:>7.0f} | {js / 1e3:>7.0f}")
+    print(f"{'재실행 1회 합계':<22} | {tot_m:>13.1f} | {tot_p:>9.1f} |")
+    print(f"\n포지셔닝 배경 생성 (클러스터별 1회, 콜드): {cold_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+benchmarks/bench_step5_rerun.py — 요금 슬라이더 드래그 1회의 재실행 시간 (step5)
+==================================================================================
+
+실행:
+    python benchmarks/bench_step5_rerun.py [--runs 7] [--district Mapo-gu]
+
+streamlit.testing.v1.AppTest 로 app.py 를 step5 까지 띄운 뒤 슬라이더 값을 바꿔
+두 가지 재실행을 잽니다.
+
+    full     : 스크립트 전체 재실행 — fragment 도입 전 슬라이더가 일으키던 재실행이자,
+               지금도 fragment 밖 위젯이 바뀔 때의 경로 (무거운 계산은 session_memo 적중)
+    fragment : 브라우저가 fragment 안 위젯 변경 때 보내는 것과 같은 fragment 단위
+               재실행 — render_price_simulation() 만 실행
+
+AppTest.run() 은 항상 전체 재실행을 요청하므로, fragment 경로는 RerunData 에
+fragment_id_queue 를 채워 요청합니다. data/raw 원본도 리스팅 캐시도 없으면 임시
+디렉터리에 저장소를 심볼릭 링크로 비추고 합성 CSV(32,061행)로 캐시를 만들어 실행합니다.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from _synth import ROOT, raw_listings_csv
+from listings_cache import CACHE_PATH, RAW_CSV, build_cache
+
+_CHILD = r"""
+import functools, json, sys, time
+from streamlit.testing.v1 import AppTest
+import streamlit.testing.v1.local_script_runner as local_script_runner
+
+district, runs = sys.argv[1], int(sys.argv[2])
+
+def timed(at, value):
+    at.slider[0].set_value(value)
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - t0) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+at.session_state["step"] = 5
+at.session_state["district"] = district
+at.run()   # 콜드: 캐시 생성 + session_memo 채움
+values = [v for v in range(-30, 55, 5) if v != 0]
+full = [timed(at, values[i % len(values)]) for i in range(runs)]
+
+# 브라우저와 같은 fragment 단위 재실행 요청
+fragment_ids = list(at._fragment_storage._fragments)
+local_script_runner.RerunData = functools.partial(local_script_runner.RerunData,
+                                                  fragment_id_queue=fragment_ids)
+frag = [timed(at, values[-1 - i % len(values)]) for i in range(runs)]
+print(json.dumps(dict(full=full, fragment=frag, fragments=len(fragment_ids))))
+"""
+
+
+def _app_dir():
+    """app.py 를 실행할 디렉터리. 리스팅 데이터가 없으면 합성 캐시를 넣은 임시 사본."""
+    if RAW_CSV.exists() or CACHE_PATH.exists():
+        return ROOT
+    mirror = Path(tempfile.mkdtemp(prefix="step5_bench_"))
+    for entry in ROOT.iterdir():
+        if entry.name != "data":
+            (mirror / entry.name).symlink_to(entry)
+    (mirror / "data").mkdir()
+    for entry in (ROOT / "data").iterdir():
+        if entry.name not in ("raw", "cache"):
+            (mirror / "data" / entry.name).symlink_to(entry)
+    build_cache(raw_listings_csv(), mirror / "data" / "cache" / "listings.parquet")
+    return mirror
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--district", default="Mapo-gu")
+    args = ap.parse_args()
+
+    # app.py 는 data/processed 를 상대 경로로 읽으므로 앱 디렉터리에서 실행
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", _CHILD, args.district, str(args.runs)],
+                         cwd=_app_dir(), capture_output=True, text=True, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"step5 슬라이더 재실행 ({args.district}, {args.runs}회, fragment {res['fragments']}개)\n")
+    print(f"{'path':<10} | {'p50 ms':>8} | {'min ms':>8} | {'max ms':>8}")
+    for label in ("full", "fragment"):
+        xs = res[label]
+        print(f"{label:<10} | {statistics.median(xs):>8.0f} | {min(xs):>8.0f} | {max(xs):>8.0f}")
+    print(f"\n드래그 1회: {statistics.median(res['full']) / statistics.median(res['fragment']):.1f}× 빠름")
+
+
+if __name__ == "__main__":
+    main()
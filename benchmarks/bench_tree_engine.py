@@ -0,0 +1,116 @@
+"""
+benchmarks/bench_tree_engine.py — LightGBM 래퍼 vs NumPy 트리 엔진
+=====================================================================
+
+실행:
+    python benchmarks/bench_tree_engine.py [--sizes 1 10 100 1000]
+
+각 배치 크기에서 Model A/B predict() 지연(ms)과, step5 경로인
+predict_revpar() 1회 지연을 두 엔진으로 비교합니다.
+실제 리스팅 피처로 두 엔진의 예측값 패리티도 확인합니다.
+마지막으로 pkl 을 재학습한 사본에서 engine="numpy" 가 옛 npz 대신 새 모델을
+서빙하는지 검사합니다 (실패 시 종료 코드 1).
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from _synth import synthetic_listings
+from predict_utils import load_models, predict_revpar, predict_revpar_batch
+from tree_engine import FlatTreeEnsemble, check_parity
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+
+
+def _best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def check_retrained_pkl(X: np.ndarray, feature_names: list) -> float:
+    """model_a.pkl 만 재학습한 사본에서 numpy 엔진 예측과 새 pkl 예측의 최대 오차."""
+    import joblib
+    import pandas as pd
+    from lightgbm import LGBMRegressor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        for f in MODELS_DIR.iterdir():
+            if f.is_file():
+                shutil.copy2(f, d / f.name)
+        rng = np.random.default_rng(0)
+        X_df = pd.DataFrame(X, columns=feature_names)
+        new = LGBMRegressor(n_estimators=5, num_leaves=4, verbose=-1)
+        new.fit(X_df, rng.normal(size=len(X_df)))
+        joblib.dump(new, d / "model_a.pkl")
+        served = load_models(d, engine="numpy")["model_A"]
+        err = float(np.max(np.abs(served.predict(X) - new.predict(X_df))))
+        # npz 도 새 pkl 기준으로 다시 써져 다음 로드에서 재평탄화하지 않아야 함
+        rewritten = FlatTreeEnsemble.load(d / "model_a.npz")
+        if rewritten.source_sha256 != served.source_sha256:
+            return float("inf")
+    return err
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    lgb = load_models(engine="lightgbm")
+    npy = load_models(engine="numpy")
+    df = synthetic_listings(max(args.sizes + [2000]))
+
+    # ── 패리티: 실제 분포 피처로 검사 (인코딩은 배치 경로와 동일) ─────────
+    a = predict_revpar_batch(df, 0, **lgb)
+    b = predict_revpar_batch(df, 0, **npy)
+    diff = np.max(np.abs(a[["ADR_pred", "Occ_pred", "RevPAR_pred"]].to_numpy()
+                         - b[["ADR_pred", "Occ_pred", "RevPAR_pred"]].to_numpy()))
+    print(f"parity — predict_revpar_batch {len(df):,}행 최대 절대 오차 {diff:.3g}")
+    for name in ("model_A", "model_B"):
+        print(f"parity — {name} 합성 경계값 입력 최대 절대 오차 "
+              f"{check_parity(lgb[name], npy[name]):.3g}")
+
+    X = df.copy()
+    for col, table in lgb["encoders"].items():
+        X[col] = table.encode(X[col].to_numpy())
+    X["price_gap_oof"] = X["ttm_avg_rate"] - a["ADR_pred"]
+
+    # 각 엔진이 predict_revpar 안에서 받는 입력 형태 그대로: lightgbm=DataFrame, numpy=ndarray
+    for name in ("model_A", "model_B"):
+        X_df = X[npy[name].feature_names]
+        X_np = X_df.to_numpy(dtype=np.float64)
+        print(f"\n{'rows':>6} | {'lightgbm ms':>11} | {'numpy ms':>9} | speedup   ({name}.predict)")
+        for n in args.sizes:
+            t_l = _best_ms(lambda: lgb[name].predict(X_df.iloc[:n]), args.repeat)
+            t_n = _best_ms(lambda: npy[name].predict(X_np[:n]), args.repeat)
+            print(f"{n:>6,} | {t_l:>11.3f} | {t_n:>9.3f} | {t_l / t_n:6.1f}x")
+
+    rec = df.iloc[0].to_dict()
+    t_l = _best_ms(lambda: predict_revpar(rec, 500_000, **lgb), args.repeat)
+    t_n = _best_ms(lambda: predict_revpar(rec, 500_000, **npy), args.repeat)
+    print(f"\npredict_revpar 1회 (step5 경로): lightgbm {t_l:.2f} ms · numpy {t_n:.2f} ms "
+          f"({t_l / t_n:.1f}x)")
+
+    # ── 재학습된 pkl: 옛 npz 를 쓰지 않아야 함 ─────────────────────────────
+    names = npy["model_A"].feature_names
+    err = check_retrained_pkl(X[names].to_numpy(dtype=np.float64)[:500], names)
+    print(f"\nretrained pkl — numpy 엔진 vs 새 model_a.pkl 최대 절대 오차 {err:.3g}")
+    if not err < 1e-9:
+        print("FAIL: engine='numpy' 가 재학습 전 npz 를 서빙합니다")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
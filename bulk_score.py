@@ -0,0 +1,270 @@
+"""
+bulk_score.py — 전체 시장 일괄 스코어링 (청크 스트리밍 + 프로세스 풀)
+=====================================================================
+
+매일 밤 원본 리스팅 CSV(32,061행) 전체를 다시 스코어링해 리스팅별 시장 적정 ADR·RevPAR 와
+현재 요금과의 차이(gap)를 운영팀용 parquet 로 만듭니다. predict_revpar 행 루프 대신
+
+    읽기   : 메인 프로세스가 CSV 를 chunk_size 행씩 스트리밍 (필요한 컬럼만)
+    피처   : 워커가 listing_features_frame() — build_listing_features 와 같은 규칙,
+             자치구 통계는 district_lookup.csv, rel_dist 분모 평균은 입력 CSV 한 패스 집계
+    예측   : 워커가 predict_revpar_batch() — 모델은 워커 시작 시 1회 로드
+             (기본 bundle 은 mmap 이라 워커끼리 페이지 공유)
+    쓰기   : 메인이 끝난 청크부터 원래 순서대로 parquet row group 으로 추가
+
+로 나눠 워커 수만큼 병렬로 처리합니다. 메모리는 진행 중인 청크(워커 수 × 2)만큼만 씁니다.
+
+사용법:
+    python bulk_score.py [--csv data/raw/final_seoul_airbnb_cleaned.csv]
+                         [--out data/processed/market_scores.parquet]
+                         [--workers 4] [--chunk-size 4000] [--fmt bundle]
+
+    --workers 0 이면 풀 없이 현재 프로세스에서 같은 경로로 처리합니다 (비교·디버깅용).
+
+출력 컬럼 (행 = 원본 CSV 의 행, row = 0부터 센 원본 위치):
+    row, district, room_type, is_active_operating, cluster, ttm_avg_rate, ttm_revpar,
+    ADR_pred, Occ_pred, RevPAR_pred, adr_gap, revpar_gap, revpar_trend, trend_label
+    (+ conformal.json 이 있으면 ADR_lo … RevPAR_hi)
+    adr_gap = ttm_avg_rate - ADR_pred, revpar_gap = ttm_revpar - RevPAR_pred (음수 = 시장 대비 낮음)
+
+확장성 측정: python benchmarks/bench_bulk_score.py
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from district_features import listing_features_frame
+from listings_cache import RAW_CSV
+from listings_stream import iter_listing_chunks, stream_aggregates
+from predict_utils import load_models, predict_revpar_batch
+
+ROOT = Path(__file__).parent
+LOOKUP_PATH = ROOT / "data" / "processed" / "district_lookup.csv"
+SCORES_PATH = ROOT / "data" / "processed" / "market_scores.parquet"
+
+CHUNK_SIZE = 4_000
+
+# 원본 CSV 에서 읽는 컬럼 (피처 + 출력 + revpar_trend)
+READ_COLUMNS = (
+    "district", "room_type", "refined_status", "operation_status",
+    "ttm_avg_rate", "ttm_revpar", "l90d_revpar",
+    "superhost", "instant_book", "photos_count", "rating_overall", "num_reviews",
+    "min_nights", "extra_guest_fee_policy", "nearest_poi_dist_km", "nearest_poi_type_name",
+    "bedrooms", "baths", "guests",
+)
+_MEAN_COLUMNS = ("photos_mean", "rating_mean", "reviews_mean", "min_nights_mean")
+_PRED_COLUMNS = ("ADR_pred", "Occ_pred", "RevPAR_pred", "revpar_trend", "trend_label")
+_INTERVAL_COLUMNS = ("ADR_lo", "ADR_hi", "Occ_lo", "Occ_hi", "RevPAR_lo", "RevPAR_hi")
+STAGES = ("read", "features", "predict", "write", "wait")
+
+
+def district_table(csv_path: str | Path | None = None,
+                   lookup_path: str | Path | None = None) -> pd.DataFrame:
+    """listing_features_frame() 용 자치구 테이블 (index = district).
+
+    자치구 통계·cluster 는 district_lookup.csv 에서 읽습니다. 상대 경쟁력(rel_dist) 분모인
+    자치구 평균(photos_mean …)은 lookup 에 없으므로 스코어링할 CSV 의 Active+Operating 행을
+    listings_stream 으로 한 번 훑어 계산합니다 (앱의 compute_district_stats 와 같은 집계 —
+    캐시 파일 유무와 무관하게 입력이 같으면 같은 값).
+    """
+    table = pd.read_csv(lookup_path or LOOKUP_PATH).set_index("district")
+    table = table.drop(columns=["cluster_name"], errors="ignore")
+    means = stream_aggregates(csv_path or RAW_CSV).district_means()
+    return table.join(means[list(_MEAN_COLUMNS)], how="left")
+
+
+def iter_chunks(csv_path: str | Path, chunk_size: int = CHUNK_SIZE):
+    """(시작 행 번호, 청크 DataFrame) 를 차례로 — READ_COLUMNS 중 CSV 에 있는 것만 읽습니다."""
+    start = 0
+    for chunk in iter_listing_chunks(csv_path, READ_COLUMNS, chunk_size):
+        yield start, chunk
+        start += len(chunk)
+
+
+def score_chunk(start: int, chunk: pd.DataFrame, *, artifacts: dict,
+                table: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """원본 청크 → (출력 DataFrame, {'features': s, 'predict': s})."""
+    t0 = time.perf_counter()
+    features = listing_features_frame(chunk, table)
+    for col in ("ttm_revpar", "l90d_revpar"):
+        if col in chunk.columns:
+            features[col] = chunk[col].to_numpy(dtype=np.float64)
+    t1 = time.perf_counter()
+    pred = predict_revpar_batch(features, 0.0, **artifacts)
+    t2 = time.perf_counter()
+
+    def raw(col, dtype=np.float64):
+        return chunk[col].to_numpy(dtype=dtype) if col in chunk.columns else np.full(len(chunk), np.nan)
+
+    out = pd.DataFrame({
+        "row": np.arange(start, start + len(chunk), dtype=np.int64),
+        "district": chunk["district"].astype(str).to_numpy(),
+        "room_type": raw("room_type", object),
+        "is_active_operating": features["is_active_operating"].to_numpy().astype(bool),
+        "cluster": features["cluster"].to_numpy(),
+        "ttm_avg_rate": raw("ttm_avg_rate"),
+        "ttm_revpar": raw("ttm_revpar"),
+    })
+    for col in _PRED_COLUMNS + tuple(c for c in _INTERVAL_COLUMNS if c in pred.columns):
+        out[col] = pred[col].to_numpy()
+    out["adr_gap"] = out["ttm_avg_rate"] - out["ADR_pred"]
+    out["revpar_gap"] = out["ttm_revpar"] - out["RevPAR_pred"]
+    return out, {"features": t1 - t0, "predict": t2 - t1}
+
+
+# ── 워커 ─────────────────────────────────────────────────────────────────────
+_WORKER = {}   # 워커 프로세스마다 1회 채움: artifacts, table
+
+
+def _init_worker(models_dir, fmt: str, table: pd.DataFrame) -> None:
+    _WORKER["artifacts"] = _load_artifacts(models_dir, fmt)
+    _WORKER["table"] = table
+
+
+def _score_in_worker(start: int, chunk: pd.DataFrame):
+    return score_chunk(start, chunk, **_WORKER)
+
+
+def _load_artifacts(models_dir, fmt: str) -> dict:
+    try:
+        return load_models(models_dir, fmt=fmt)
+    except FileNotFoundError:
+        if fmt != "bundle":
+            raise
+        return load_models(models_dir, engine="numpy")   # 번들 미생성 — pkl 을 평탄화
+
+
+def _output_schema(columns):
+    import pyarrow as pa
+
+    types = {"row": pa.int64(), "district": pa.string(), "room_type": pa.string(),
+             "is_active_operating": pa.bool_(), "cluster": pa.int64(), "trend_label": pa.string()}
+    return pa.schema([(c, types.get(c, pa.float64())) for c in columns])
+
+
+# ── 실행 ─────────────────────────────────────────────────────────────────────
+def run(csv_path: str | Path | None = None, out_path: str | Path | None = None, *,
+        workers: int | None = None, chunk_size: int = CHUNK_SIZE,
+        models_dir: str | Path | None = None, fmt: str = "bundle",
+        lookup_path: str | Path | None = None) -> dict:
+    """CSV 전체를 스코어링해 out_path 에 씁니다 (임시 파일 → 교체).
+
+    Parameters
+    ----------
+    csv_path    : 원본 리스팅 CSV (기본 RAW_CSV)
+    out_path    : 출력 parquet (기본 SCORES_PATH)
+    workers     : 프로세스 수 (None = CPU 수, 0 = 현재 프로세스에서 처리)
+    chunk_size  : 청크 행 수
+    models_dir, fmt : load_models 인자 (bundle 이 없으면 pkl → numpy 엔진)
+    lookup_path : district_lookup.csv (기본 data/processed/)
+
+    Returns
+    -------
+    dict — rows, chunks, workers, seconds, rows_per_s, path,
+           stages {read, features, predict, write, wait} (초; features·predict 는 워커 합계)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    src = Path(csv_path) if csv_path else RAW_CSV
+    dst = Path(out_path) if out_path else SCORES_PATH
+    workers = os.cpu_count() if workers is None else workers
+    table = district_table(src, lookup_path)
+    stages = dict.fromkeys(STAGES, 0.0)
+    rows = n_chunks = 0
+    t_start = time.perf_counter()
+
+    if workers:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                   initargs=(models_dir, fmt, table))
+        submit = pool.submit
+    else:
+        pool = None
+        _init_worker(models_dir, fmt, table)
+
+        def submit(fn, *args):   # 풀 없이 같은 인터페이스 (즉시 계산)
+            fut = Future()
+            fut.set_result(fn(*args))
+            return fut
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    writer = None
+    pending = []   # 제출 순서대로 — 원본 행 순서를 유지하며 씀
+
+    def drain(limit):
+        nonlocal writer, rows, n_chunks
+        while len(pending) > limit:
+            t0 = time.perf_counter()
+            out, timing = pending.pop(0).result()
+            t1 = time.perf_counter()
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, _output_schema(out.columns), compression="zstd")
+            writer.write_table(pa.Table.from_pandas(out, schema=writer.schema, preserve_index=False))
+            stages["wait"] += t1 - t0
+            stages["write"] += time.perf_counter() - t1
+            stages["features"] += timing["features"]
+            stages["predict"] += timing["predict"]
+            rows += len(out)
+            n_chunks += 1
+
+    try:
+        chunks = iter_chunks(src, chunk_size)
+        while True:
+            t0 = time.perf_counter()
+            item = next(chunks, None)
+            stages["read"] += time.perf_counter() - t0
+            if item is None:
+                break
+            pending.append(submit(_score_in_worker, *item))
+            drain(max(1, 2 * workers))
+        drain(0)
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp, dst)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if tmp.exists():
+            tmp.unlink()
+
+    seconds = time.perf_counter() - t_start
+    return {"rows": rows, "chunks": n_chunks, "workers": workers, "seconds": seconds,
+            "rows_per_s": rows / seconds if seconds else 0.0, "path": dst, "stages": stages}
+
+
+def _print_report(stats: dict) -> None:
+    labels = {"read": "읽기 (메인)", "features": "피처 (워커 합계)", "predict": "예측 (워커 합계)",
+              "write": "쓰기 (메인)", "wait": "결과 대기 (메인)"}
+    print(f"{stats['rows']:,}행 · 청크 {stats['chunks']}개 · 워커 {stats['workers']}개 "
+          f"→ {stats['path']}")
+    print(f"총 {stats['seconds']:.2f} s ({stats['rows_per_s']:,.0f} 행/s)")
+    for key in STAGES:
+        print(f"  {labels[key]:<16} {stats['stages'][key]:>8.2f} s")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="전체 리스팅 일괄 스코어링 → parquet")
+    ap.add_argument("--csv", default=None, help=f"기본 {RAW_CSV.relative_to(ROOT)}")
+    ap.add_argument("--out", default=None, help=f"기본 {SCORES_PATH.relative_to(ROOT)}")
+    ap.add_argument("--workers", type=int, default=None, help="기본 CPU 수, 0 = 풀 없이")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--models-dir", default=None)
+    ap.add_argument("--fmt", choices=("bundle", "pickle"), default="bundle")
+    args = ap.parse_args(argv)
+
+    _print_report(run(args.csv, args.out, workers=args.workers, chunk_size=args.chunk_size,
+                      models_dir=args.models_dir, fmt=args.fmt))
+
+
+if __name__ == "__main__":
+    main()
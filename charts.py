@@ -0,0 +1,145 @@
+"""
+charts.py — step5 결과 화면 차트 (Plotly, 브라우저 렌더링)
+==========================================================
+
+matplotlib 으로 매 재실행마다 Agg 래스터화(plt.subplots → tight_layout → st.pyplot)하던
+세 차트를 Plotly 그림으로 만듭니다. 그리기는 브라우저가 하므로 서버 쪽 비용은
+그림 dict 생성 + JSON 직렬화뿐입니다.
+
+    opex_pie(opex_items)                              월 운영비 구성 파이
+    profit_curve(deltas, profits, delta_pct, ...)     요금 변화율별 월 순이익 곡선
+    positioning_base(adr_pct, occ_pct, title)         사분면 배경 + 클러스터 산점도 (클러스터별 캐시용)
+    positioning_chart(base, user_adr_pct, user_occ_pct)  위 배경에 내 숙소(별)만 얹음
+
+사용법 (app.py):
+    @st.cache_resource
+    def positioning_background(_active_df, cluster_id, cluster_name):
+        return positioning_base(*cluster_positioning(_active_df, cluster_id), f"{cluster_name} 포지셔닝")
+
+    st.plotly_chart(positioning_chart(base, 62.0, 35.5), **PLOTLY_KW)
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+# st.plotly_chart 공통 인자 — 모드바 숨김, 컬럼 폭에 맞춤
+PLOTLY_KW = {"use_container_width": True, "config": {"displayModeBar": False}}
+
+_FONT = "Inter, -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', sans-serif"
+_BG = "#FAFAFA"
+_PIE_COLORS = ["#FF5A5F", "#FF8A8D", "#FFB3B5", "#00A699", "#4DB6AC", "#FFB400", "#EBEBEB"]
+
+# 사분면 (x0, x1, y0, y1, 배경색, 라벨, 라벨색) — x = ADR 분위, y = 예약률 분위
+_QUADRANTS = (
+    (0, 50, 50, 100, "#FFB400", "물량형", "#B45309"),
+    (50, 100, 50, 100, "#2E7D32", "고수익형", "#1B5E20"),
+    (0, 50, 0, 50, "#C62828", "침체형", "#B71C1C"),
+    (50, 100, 0, 50, "#FF8C00", "고가위험형", "#E65100"),
+)
+
+
+def _layout(fig: go.Figure, height: int, **kw) -> go.Figure:
+    fig.update_layout(
+        height=height, margin=dict(l=10, r=10, t=40, b=10),
+        paper_bgcolor=_BG, plot_bgcolor=_BG, font=dict(family=_FONT, size=12, color="#484848"),
+        **kw,
+    )
+    return fig
+
+
+def opex_pie(opex_items: dict) -> go.Figure:
+    """월 운영비 구성 파이 (0원 항목 제외)."""
+    nonzero = {k: v for k, v in opex_items.items() if v > 0}
+    fig = go.Figure(go.Pie(
+        labels=list(nonzero), values=list(nonzero.values()),
+        marker=dict(colors=_PIE_COLORS[:len(nonzero)], line=dict(color="white", width=1)),
+        textinfo="label+percent", texttemplate="%{label}<br>%{percent:.0%}",
+        hovertemplate="%{label}: ₩%{value:,}<extra></extra>",
+        sort=False, direction="counterclockwise", rotation=90, showlegend=False,
+    ))
+    return _layout(fig, 360, title=dict(text=f"월 운영비 구성 (총 ₩{sum(nonzero.values()):,})",
+                                         font_size=13, x=0.5))
+
+
+def profit_curve(deltas, profits, delta_pct: int, new_net: float,
+                 band_pct: tuple[float, float] | None = None) -> go.Figure:
+    """요금 변화율(%) → 월 순이익 곡선 + 현재 슬라이더 위치.
+
+    Parameters
+    ----------
+    deltas    : 요금 변화율 그리드 (비율, 예: SIM_DELTAS)
+    profits   : 그리드별 월 순이익 (원)
+    delta_pct : 슬라이더 값 (%) — 세로선·점 위치
+    new_net   : 슬라이더 위치의 월 순이익 (원)
+    band_pct  : 클러스터 Q1~Q3 요금 구간을 변화율(%)로 — 회색 음영 (없으면 생략)
+    """
+    x = np.asarray(deltas) * 100
+    y = np.asarray(profits, dtype=np.float64) / 10_000          # 축 단위: 만원
+    # 기준선·구간은 layout shape 로 직접 — add_hline/add_vrect 헬퍼는 호출마다 수 ms
+    shapes = [
+        dict(type="line", xref="paper", x0=0, x1=1, y0=0, y1=0, opacity=0.6,
+             line=dict(color="#767676", dash="dash", width=1.2)),
+        dict(type="line", yref="paper", x0=delta_pct, x1=delta_pct, y0=0, y1=1,
+             line=dict(color="#FFB400", dash="dash", width=1.5)),
+    ]
+    notes = [dict(xref="paper", x=1, y=0, text="손익분기선", showarrow=False, xanchor="right",
+                  yanchor="top", font=dict(size=10, color="#767676"))]
+    if band_pct is not None and band_pct[0] < x[-1] and band_pct[1] > x[0]:
+        lo, hi = max(band_pct[0], x[0]), min(band_pct[1], x[-1])
+        shapes.append(dict(type="rect", yref="paper", x0=lo, x1=hi, y0=0, y1=1, layer="below",
+                           fillcolor="#767676", opacity=0.06, line_width=0))
+        notes.append(dict(yref="paper", x=lo, y=1, text="클러스터 Q1~Q3", showarrow=False,
+                          xanchor="left", yanchor="top", font=dict(size=10, color="#767676")))
+    fill = dict(x=x, fill="tozeroy", mode="none", hoverinfo="skip", showlegend=False)
+    fig = go.Figure([
+        go.Scatter(y=np.maximum(y, 0), fillcolor="rgba(76,175,80,0.10)", **fill),
+        go.Scatter(y=np.minimum(y, 0), fillcolor="rgba(255,90,95,0.10)", **fill),
+        go.Scatter(x=x, y=y, mode="lines", line=dict(color="#FF5A5F", width=2.5), showlegend=False,
+                   hovertemplate="%{x:+.0f}% → ₩%{y:,.0f}만<extra></extra>"),
+        go.Scatter(x=[delta_pct], y=[new_net / 10_000], mode="markers", showlegend=False,
+                   marker=dict(color="#FFB400", size=11),
+                   hovertemplate=f"현재 ({delta_pct:+d}%) → ₩%{{y:,.0f}}만<extra></extra>"),
+    ])
+    return _layout(
+        fig, 340, shapes=shapes, annotations=notes,
+        xaxis=dict(title="요금 변화율 (%)", range=[x[0], x[-1]], showgrid=False, zeroline=False),
+        yaxis=dict(title="월 순이익 (원)", tickprefix="₩", ticksuffix="만", tickformat=",.0f",
+                   gridcolor="#EEEEEE", zeroline=False),
+    )
+
+
+def positioning_base(adr_pct, occ_pct, title: str) -> go.Figure:
+    """사분면 배경·라벨 + 클러스터 전체 산점도 — 사용자와 무관하므로 클러스터별로 한 번만 만듭니다."""
+    shapes = [dict(type="rect", x0=x0, x1=x1, y0=y0, y1=y1, fillcolor=fill, opacity=0.06,
+                   line_width=0, layer="below") for x0, x1, y0, y1, fill, _, _ in _QUADRANTS]
+    divider = dict(color="#CCCCCC", width=1, dash="dash")
+    shapes += [dict(type="line", x0=0, x1=100, y0=50, y1=50, line=divider),
+               dict(type="line", x0=50, x1=50, y0=0, y1=100, line=divider)]
+    notes = [dict(x=(x0 + x1) / 2, y=(y0 + y1) / 2, text=label, showarrow=False,
+                  font=dict(size=11, color=color), opacity=0.7)
+             for x0, x1, y0, y1, _, label, color in _QUADRANTS]
+    # float32 — 브라우저로 보내는 배열 크기를 절반으로 (분위 0~100 표시에는 충분)
+    fig = go.Figure(go.Scattergl(
+        x=np.asarray(adr_pct, dtype=np.float32), y=np.asarray(occ_pct, dtype=np.float32),
+        mode="markers", marker=dict(size=5, color="#9CA3AF", opacity=0.18),
+        hoverinfo="skip", showlegend=False,
+    ))
+    return _layout(
+        fig, 440, title=dict(text=f"<b>{title}</b>", font_size=13, x=0.5),
+        shapes=shapes, annotations=notes,
+        xaxis=dict(title="ADR 분위 (클러스터 내, %)", range=[0, 100], showgrid=False, zeroline=False),
+        yaxis=dict(title="예약률 분위 (클러스터 내, %)", range=[0, 100], showgrid=False, zeroline=False),
+    )
+
+
+def positioning_chart(base: go.Figure, user_adr_pct: float, user_occ_pct: float) -> go.Figure:
+    """캐시된 배경(positioning_base)을 복사해 내 숙소 별 표시만 더합니다. base 는 바꾸지 않습니다."""
+    fig = go.Figure(base)
+    fig.add_trace(go.Scatter(
+        x=[user_adr_pct], y=[user_occ_pct], mode="markers+text", text=["<b>내 숙소</b>"],
+        textposition="top right", textfont=dict(size=11, color="#FF5A5F"),
+        marker=dict(symbol="star", size=20, color="#FF5A5F", line=dict(color="white", width=1)),
+        hovertemplate="ADR %{x:.0f}분위 · 예약률 %{y:.0f}분위<extra>내 숙소</extra>",
+        showlegend=False,
+    ))
+    return fig
@@ -0,0 +1,291 @@
+"""
+conformal.py — ADR·예약률·RevPAR 예측 구간 (클러스터별 split conformal)
+=======================================================================
+
+notebooks/07_model.md 5-2 의 80% 예측 구간입니다. 노트북은 CQR(분위 회귀 + conformal)
+을 제안하지만 배포된 Model A/B 는 점 예측 모델이므로, 점 예측의 잔차를 conformity
+score 로 쓰는 split conformal 을 클러스터별로 적용합니다.
+
+    score_ADR    = |log1p(ADR 실제) - log1p(ADR_pred)|        (Model A 타깃과 같은 로그 척도)
+    score_Occ    = |예약률 실제 - Occ_pred|
+    score_RevPAR = |log1p(RevPAR 실제) - log1p(RevPAR_pred)|
+
+캘리브레이션 리스팅 n 개의 score 에서 ⌈(n+1)(1-α)⌉ 번째 값을 q 로 두면, 새 리스팅이
+캘리브레이션 리스팅과 교환 가능할 때 [pred ∓ q] 가 실제값을 1-α 이상 확률로 덮습니다.
+q 는 클러스터마다 따로 구하고, 표본이 MIN_CLUSTER_N 보다 적은 클러스터는 전체 q 를
+씁니다. 예측 시에는 클러스터 → q 조회와 덧셈뿐입니다.
+
+사용법:
+    python conformal.py --calib-csv holdout.csv [--alpha 0.2]
+                                          # 떼어 둔 리스팅으로 캘리브레이션 → models/conformal.json
+                                          # (models/bundle 이 있으면 번들도 다시 변환)
+
+    artifacts = load_models(fmt="bundle")  # artifacts["conformal"] = ConformalTable | None
+    predict_revpar(listing, opex, **artifacts)
+    # → ADR_lo/hi, Occ_lo/hi, RevPAR_lo/hi, net_profit_lo/hi 추가
+
+주의:
+    캘리브레이션 리스팅이 모델 학습에 쓰였다면 잔차가 작게 나와 구간이 좁아집니다.
+    notebooks/07_model.md 는 Train/Test 분할의 시드·비율을 남기지 않았으므로 학습 스냅숏에서
+    테스트 행을 다시 뽑을 수 없습니다. 그래서 --calib-csv (학습 때 떼어 둔 리스팅 또는 그 뒤
+    스냅숏)가 필수이고, 학습 원본(data/raw 스냅숏)을 주면 거절합니다. 자치구 피처는 앱과 같은
+    시장 집계(리스팅 캐시의 listings_stream 한 패스)에서 가져옵니다.
+    benchmarks/bench_conformal.py 가 캘리브레이션에 쓰지 않은 리스팅으로 커버리지를 잽니다.
+
+    저장소에는 models/conformal.json 이 들어 있지 않습니다. 만들기 전까지는 예측 구간(ADR_lo …),
+    step5 의 구간 캡션, profit_risk 의 "interval" 소스가 동작하지 않습니다 (profit_risk 는
+    "empirical" 로 대체).
+"""
+
+from pathlib import Path
+import argparse
+import json
+import math
+
+import numpy as np
+
+ROOT = Path(__file__).parent
+CONFORMAL_FILE = "conformal.json"
+
+ALPHA = 0.2              # 80% 구간
+MIN_CLUSTER_N = 50       # 이보다 적은 클러스터는 전체 q 사용
+METRICS = ("ADR", "Occ", "RevPAR")
+# 지표별 conformity score 척도 — log: |Δlog1p|, abs: |Δ|
+_SCALES = {"ADR": "log", "Occ": "abs", "RevPAR": "log"}
+# 캘리브레이션 타깃 (원본 리스팅 컬럼)
+TARGETS = {"ADR": "ttm_avg_rate", "Occ": "ttm_occupancy", "RevPAR": "ttm_revpar"}
+
+
+def conformity_scores(pred: dict, actual: dict) -> dict:
+    """지표별 score 배열. pred·actual = {ADR|Occ|RevPAR: 배열}."""
+    out = {}
+    for m in METRICS:
+        p = np.asarray(pred[m], dtype=np.float64)
+        y = np.asarray(actual[m], dtype=np.float64)
+        out[m] = np.abs(np.log1p(y) - np.log1p(p)) if _SCALES[m] == "log" else np.abs(y - p)
+    return out
+
+
+def conformal_quantile(scores, alpha: float = ALPHA) -> float:
+    """split conformal 의 유한 표본 보정 분위수 — 정렬 score 의 ⌈(n+1)(1-α)⌉ 번째 (없으면 inf)."""
+    s = np.sort(np.asarray(scores, dtype=np.float64))
+    k = math.ceil((len(s) + 1) * (1 - alpha))
+    return float(s[k - 1]) if 0 < k <= len(s) else math.inf
+
+
+class ConformalTable:
+    """클러스터별 conformity score 분위수 — 예측값을 [lo, hi] 구간으로 바꾸는 조회 테이블.
+
+    Parameters
+    ----------
+    alpha    : 미포함 확률 (0.2 → 80% 구간)
+    q        : {지표: {클러스터 번호: q}} — 클러스터별 분위수
+    q_global : {지표: q} — 표본이 적거나 없는 클러스터용
+    n        : {클러스터 번호: 캘리브레이션 표본 수} + {"*": 전체}
+    """
+
+    __slots__ = ("alpha", "q", "q_global", "n", "_ids", "_q_arr")
+
+    def __init__(self, alpha: float, q: dict, q_global: dict, n: dict):
+        self.alpha = float(alpha)
+        self.q = {m: {int(c): float(v) for c, v in q[m].items()} for m in METRICS}
+        self.q_global = {m: float(q_global[m]) for m in METRICS}
+        self.n = {k if k == "*" else int(k): int(v) for k, v in n.items()}
+        # 배치 조회용: 정렬된 클러스터 번호 + 지표별 [클러스터…, 전체] 배열
+        self._ids = np.array(sorted(self.q["ADR"]), dtype=np.float64)
+        self._q_arr = {m: np.array([self.q[m][int(c)] for c in self._ids] + [self.q_global[m]])
+                       for m in METRICS}
+
+    @property
+    def coverage(self) -> float:
+        return 1.0 - self.alpha
+
+    # ── 구간 계산 ───────────────────────────────────────────────────────────
+    def bounds_one(self, cluster, adr: float, occ: float, revpar: float) -> dict:
+        """단일 예측의 ADR·Occ·RevPAR lo/hi (float 6개). 모르는 클러스터는 전체 q."""
+        try:
+            c = int(cluster)
+        except (TypeError, ValueError):
+            c = None
+        out = {}
+        for m, v in (("ADR", adr), ("Occ", occ), ("RevPAR", revpar)):
+            q = self.q[m].get(c, self.q_global[m])
+            if _SCALES[m] == "log":
+                base = math.log1p(max(v, 0.0))
+                out[f"{m}_lo"] = max(math.expm1(base - q), 0.0)
+                out[f"{m}_hi"] = math.expm1(base + q)
+            else:
+                out[f"{m}_lo"] = min(max(v - q, 0.0), 1.0)
+                out[f"{m}_hi"] = min(max(v + q, 0.0), 1.0)
+        return out
+
+    def bounds(self, cluster, adr, occ, revpar) -> dict:
+        """배치 구간 — 클러스터 배열을 q 배열 위치로 한 번 바꾼 뒤 원소별 연산."""
+        c = np.asarray(cluster, dtype=np.float64)
+        ids = self._ids
+        if len(ids):
+            pos = np.minimum(np.searchsorted(ids, c), len(ids) - 1)
+            pos = np.where(ids[pos] == c, pos, len(ids))     # 없는 클러스터·NaN → 전체 q
+        else:
+            pos = np.zeros(c.shape, dtype=np.intp)
+        out = {}
+        for m, v in (("ADR", adr), ("Occ", occ), ("RevPAR", revpar)):
+            q = self._q_arr[m][pos]
+            v = np.asarray(v, dtype=np.float64)
+            if _SCALES[m] == "log":
+                base = np.log1p(np.maximum(v, 0.0))
+                out[f"{m}_lo"] = np.maximum(np.expm1(base - q), 0.0)
+                out[f"{m}_hi"] = np.expm1(base + q)
+            else:
+                out[f"{m}_lo"] = np.clip(v - q, 0.0, 1.0)
+                out[f"{m}_hi"] = np.clip(v + q, 0.0, 1.0)
+        return out
+
+    # ── 저장 형식 (JSON) ────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {
+            "method": "split-conformal",
+            "alpha": self.alpha,
+            "scales": _SCALES,
+            "targets": TARGETS,
+            "n": {str(k): v for k, v in self.n.items()},
+            "q_global": self.q_global,
+            "q": {m: {str(c): v for c, v in self.q[m].items()} for m in METRICS},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ConformalTable":
+        if d.get("method") != "split-conformal" or d.get("scales") != _SCALES:
+            raise ValueError("지원하지 않는 conformal 테이블입니다. python conformal.py 로 다시 만드세요.")
+        return cls(d["alpha"], d["q"], d["q_global"], d["n"])
+
+
+def calibrate_scores(scores: dict, clusters, *, alpha: float = ALPHA,
+                     min_cluster_n: int = MIN_CLUSTER_N) -> ConformalTable:
+    """conformity_scores() 결과 + 행별 클러스터 → ConformalTable.
+
+    세 지표 중 하나라도 score 가 NaN(실제값 결측)인 행은 빠집니다.
+    """
+    clusters = np.asarray(clusters, dtype=np.float64)
+    ok = np.logical_and.reduce([~np.isnan(scores[m]) for m in METRICS])
+    q_global = {m: conformal_quantile(scores[m][ok], alpha) for m in METRICS}
+    q, n = {m: {} for m in METRICS}, {"*": int(ok.sum())}
+    for c in np.unique(clusters[ok & ~np.isnan(clusters)]):
+        sel = ok & (clusters == c)
+        if sel.sum() < min_cluster_n:
+            continue
+        n[int(c)] = int(sel.sum())
+        for m in METRICS:
+            q[m][int(c)] = conformal_quantile(scores[m][sel], alpha)
+    return ConformalTable(alpha, q, q_global, n)
+
+
+def calibrate(features, actual, *, alpha: float = ALPHA, min_cluster_n: int = MIN_CLUSTER_N,
+              **artifacts) -> ConformalTable:
+    """캘리브레이션 리스팅으로 ConformalTable 을 만듭니다.
+
+    Parameters
+    ----------
+    features : pd.DataFrame — predict_revpar_batch() 입력 (cluster 컬럼 포함)
+    actual   : {ADR|Occ|RevPAR: 실제값 배열} (또는 같은 키의 DataFrame)
+    alpha, min_cluster_n : 구간 수준, 클러스터별 q 를 따로 둘 최소 표본 수
+    **artifacts : load_models() 반환값 (conformal 항목은 무시)
+    """
+    from predict_utils import predict_revpar_batch
+
+    artifacts = {k: v for k, v in artifacts.items() if k != "conformal"}
+    pred = predict_revpar_batch(features, 0.0, **artifacts)
+    scores = conformity_scores(
+        {"ADR": pred["ADR_pred"], "Occ": pred["Occ_pred"], "RevPAR": pred["RevPAR_pred"]},
+        {m: np.asarray(actual[m], dtype=np.float64) for m in METRICS},
+    )
+    return calibrate_scores(scores, features["cluster"].to_numpy(dtype=np.float64),
+                            alpha=alpha, min_cluster_n=min_cluster_n)
+
+
+def save_conformal(table: ConformalTable, models_dir: str | Path | None = None) -> Path:
+    d = Path(models_dir) if models_dir else ROOT / "models"
+    path = d / CONFORMAL_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table.to_dict(), f, ensure_ascii=False, indent=1)
+    return path
+
+
+def load_conformal(models_dir: str | Path | None = None) -> ConformalTable | None:
+    """models/conformal.json (없으면 None)."""
+    d = Path(models_dir) if models_dir else ROOT / "models"
+    path = d / CONFORMAL_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return ConformalTable.from_dict(json.load(f))
+
+
+# ── 떼어 둔 리스팅 → 캘리브레이션 데이터 ───────────────────────────────────────
+def calibration_frame(listings, cluster_df=None, table=None):
+    """Active+Operating 이고 TTM 요금·예약률이 있는 리스팅의 (피처 프레임, 실제값 dict).
+
+    listings 는 모델 학습에 쓰지 않은 리스팅이어야 합니다 (모듈 docstring 주의 참조).
+    cluster_df 가 None 이면 data/processed/district_clustered.csv, table(자치구 피처)이 None 이면
+    앱의 compute_district_stats 와 같은 리스팅 캐시 시장 집계 — 캘리브레이션 행만으로 자치구
+    통계를 다시 내지 않습니다.
+    """
+    import pandas as pd
+    from district_features import listing_features_frame
+
+    if cluster_df is None:
+        cluster_df = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")
+    if table is None:
+        from listings_cache import ensure_cache
+        from listings_stream import stream_aggregates
+        table = stream_aggregates(ensure_cache()).district_features(cluster_df)
+    active = listings[(listings["refined_status"] == "Active")
+                      & (listings["operation_status"] == "Operating")
+                      & (listings["ttm_avg_rate"] > 0) & listings["ttm_occupancy"].notna()]
+    features = listing_features_frame(active, table)
+    actual = {m: active[col].to_numpy(dtype=np.float64) for m, col in TARGETS.items()}
+    return features, actual
+
+
+def split_indices(n: int, calib_frac: float = 0.5, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """고정 시드로 행 위치를 (캘리브레이션, 평가) 둘로 나눕니다."""
+    perm = np.random.default_rng(seed).permutation(n)
+    k = int(round(n * calib_frac))
+    return np.sort(perm[:k]), np.sort(perm[k:])
+
+
+def main(argv=None):
+    from predict_utils import load_models
+
+    ap = argparse.ArgumentParser(description="클러스터별 conformal 예측 구간 캘리브레이션")
+    ap.add_argument("--calib-csv", required=True,
+                    help="모델 학습에 쓰지 않은 리스팅 CSV (학습 때 떼어 둔 행 또는 그 뒤 스냅숏)")
+    ap.add_argument("--alpha", type=float, default=ALPHA)
+    ap.add_argument("--min-cluster-n", type=int, default=MIN_CLUSTER_N)
+    ap.add_argument("--models-dir", default=None)
+    args = ap.parse_args(argv)
+
+    import pandas as pd
+    from listings_cache import RAW_CSV
+
+    calib_csv = Path(args.calib_csv)
+    if RAW_CSV.exists() and calib_csv.resolve() == RAW_CSV.resolve():
+        ap.error(f"{calib_csv} 는 모델 학습 스냅숏입니다 — 학습에 쓰지 않은 리스팅으로 캘리브레이션하세요")
+    features, actual = calibration_frame(pd.read_csv(calib_csv, low_memory=False))
+    table = calibrate(features, actual, alpha=args.alpha, min_cluster_n=args.min_cluster_n,
+                      **load_models(args.models_dir, engine="numpy"))
+    path = save_conformal(table, args.models_dir)
+    print(f"conformal 저장: {path} ({table.coverage:.0%} 구간, 캘리브레이션 {table.n['*']:,}개)")
+    for m in METRICS:
+        per = " · ".join(f"c{c} {v:.3f}" for c, v in sorted(table.q[m].items()))
+        print(f"  {m:<6} q 전체 {table.q_global[m]:.3f} | {per}")
+
+    bundle = Path(args.models_dir or ROOT / "models") / "bundle"
+    if bundle.exists():
+        from model_bundle import convert_models
+        convert_models(args.models_dir)
+        print(f"번들 다시 변환: {bundle}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+district_features.py — 자치구 피처 테이블 (build_listing_features 입력)
+=====================================================================
+
+Active+Operating 리스팅을 자치구 단위로 한 번에 집계해, district_lookup.csv 와
+같은 이름의 컬럼을 가진 타입 지정 테이블을 만듭니다. 결과는
+data/processed/district_features.parquet 에 입력 키와 함께 저장되어
+프로세스·재시작 간에 재사용되고, 앱은 같은 키를 st.cache_data 키로 씁니다.
+
+사용법:
+    # 앱 — 리스팅 캐시를 스트리밍 집계 (listings_stream.MarketAggregates)
+    from district_features import load_stream_district_features, stream_features_key
+    key = stream_features_key(cluster_df)
+    table = load_stream_district_features(cluster_df, lambda: stream_aggregates(...), key=key)
+
+    # 메모리에 올린 리스팅 프레임에서 (groupby 1회)
+    from district_features import district_features_hash, load_district_features
+    key = district_features_hash(active_df, cluster_df)
+    table = load_district_features(active_df, cluster_df, key=key)   # index = district
+    row = table.loc["Mapo-gu"]          # district_median_revpar, ttm_pop, cluster, ...
+
+    features = listing_features_frame(listings, table)   # 리스팅 → predict_revpar_batch 입력
+
+캐시 무효화:
+    district_features_hash 는 집계에 쓰이는 컬럼 값(리스팅 + district_clustered 의
+    cluster·median_pop)으로, stream_features_key 는 리스팅 캐시 parquet 의 메타데이터
+    (원본 CSV 크기·수정 시각, CACHE_VERSION) + 같은 district_clustered 컬럼으로 계산하고
+    둘 다 FEATURES_VERSION 을 포함합니다. 데이터가 바뀌면 키가 달라져 다시 집계합니다.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent
+FEATURES_PATH = ROOT / "data" / "processed" / "district_features.parquet"
+
+# 집계 규칙·컬럼을 바꾸면 올려서 저장된 테이블을 무효화
+FEATURES_VERSION = 1
+_META_KEY = b"district_features"
+
+# 리스팅 쪽 입력 컬럼 (없으면 DEFAULTS 값으로 채움)
+_LISTING_COLUMNS = ("district", "room_type", "ttm_revpar", "superhost", "photos_count",
+                    "rating_overall", "num_reviews", "min_nights")
+
+# 컬럼 → dtype. district_lookup.csv 컬럼 + 상대 경쟁력(rel_dist) 분모용 평균
+SCHEMA = {
+    "cluster":                   "int8",
+    "district_median_revpar":    "float64",
+    "district_listing_count":    "int32",
+    "district_superhost_rate":   "float64",
+    "district_entire_home_rate": "float64",
+    "ttm_pop":                   "int64",
+    "photos_mean":               "float64",
+    "rating_mean":               "float64",
+    "reviews_mean":              "float64",
+    "min_nights_mean":           "float64",
+}
+
+# 입력 컬럼이 없거나 자치구가 district_clustered 에 없을 때 쓰는 값
+DEFAULTS = {
+    "cluster": 2,
+    "district_superhost_rate": 0.25,
+    "ttm_pop": 100_000,
+    "photos_mean": 22.0,
+    "rating_mean": 4.7,
+    "reviews_mean": 20.0,
+    "min_nights_mean": 2.0,
+}
+
+
+_CLUSTER_COLUMNS = ("district", "cluster", "median_pop")
+
+
+def _hash_frame(h, frame: pd.DataFrame, cols) -> None:
+    present = [c for c in cols if c in frame.columns]
+    h.update(",".join(present).encode())
+    h.update(pd.util.hash_pandas_object(frame[present], index=False).to_numpy().tobytes())
+
+
+def district_features_hash(active_df: pd.DataFrame, cluster_df: pd.DataFrame) -> str:
+    """집계 입력(리스팅 컬럼 + 자치구 cluster·median_pop)의 내용 해시 (16자리 hex)."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"v{FEATURES_VERSION}".encode())
+    _hash_frame(h, active_df, _LISTING_COLUMNS)
+    _hash_frame(h, cluster_df, _CLUSTER_COLUMNS)
+    return h.hexdigest()
+
+
+def stream_features_key(cluster_df: pd.DataFrame, cache_path: str | Path | None = None) -> str:
+    """리스팅 캐시 parquet 핑거프린트 + 자치구 cluster·median_pop 의 키 (16자리 hex).
+
+    리스팅 행을 해시하지 않고 캐시 메타데이터(원본 CSV 크기·수정 시각, CACHE_VERSION)만
+    읽으므로 매 재실행마다 불러도 됩니다. 캐시가 없거나 오래됐으면 먼저 다시 만듭니다.
+    """
+    from listings_cache import ensure_cache, read_cache_meta
+
+    meta = read_cache_meta(ensure_cache(cache_path=cache_path))
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"v{FEATURES_VERSION}:stream".encode())
+    h.update(json.dumps(meta, sort_keys=True).encode())
+    _hash_frame(h, cluster_df, _CLUSTER_COLUMNS)
+    return h.hexdigest()
+
+
+def compute_district_features(active_df: pd.DataFrame, cluster_df: pd.DataFrame) -> pd.DataFrame:
+    """자치구별 피처 테이블을 자치구 그룹 키 하나로 한 번에 집계합니다 (자치구 루프 없음).
+
+    Parameters
+    ----------
+    active_df  : Active+Operating 리스팅 (district, room_type, ttm_revpar, ...)
+    cluster_df : district_clustered.csv (district, cluster, median_pop)
+
+    Returns
+    -------
+    pd.DataFrame — index = district, 컬럼·dtype 은 SCHEMA
+    """
+    means = {"district_entire_home_rate": active_df["room_type"].eq("entire_home").to_numpy(np.float64)}
+    for name, col in (("district_superhost_rate", "superhost"), ("photos_mean", "photos_count"),
+                      ("rating_mean", "rating_overall"), ("reviews_mean", "num_reviews"),
+                      ("min_nights_mean", "min_nights")):
+        if col in active_df.columns:
+            means[name] = active_df[col].to_numpy(np.float64)
+
+    # 평균 컬럼은 한 번의 groupby.mean — 중앙값·행 수도 같은 그룹 키로
+    g = pd.DataFrame(means, index=active_df.index).groupby(
+        active_df["district"].astype(str), sort=True)
+    table = g.mean()
+    table.insert(0, "district_listing_count", g.size())
+    table.insert(0, "district_median_revpar",
+                 active_df["ttm_revpar"].groupby(active_df["district"].astype(str), sort=True).median())
+    table.index.name = "district"
+
+    # 클러스터·인구는 자치구 단위 값 — district_clustered 에서 바로 붙임
+    by_district = cluster_df.set_index("district")
+    table["cluster"] = by_district["cluster"].reindex(table.index) if "cluster" in by_district else np.nan
+    table["ttm_pop"] = by_district["median_pop"].reindex(table.index)
+
+    for col, default in DEFAULTS.items():
+        if col not in table.columns:
+            table[col] = default
+        table[col] = table[col].fillna(default)
+    return table[list(SCHEMA)].astype(SCHEMA)
+
+
+def load_district_features(active_df: pd.DataFrame, cluster_df: pd.DataFrame, *,
+                           key: str | None = None,
+                           path: str | Path | None = None) -> pd.DataFrame:
+    """저장된 테이블의 해시가 key 와 같으면 읽고, 아니면 집계해 저장한 뒤 반환합니다.
+
+    Parameters
+    ----------
+    active_df, cluster_df : compute_district_features() 와 같음
+    key  : district_features_hash() 결과 (None 이면 여기서 계산)
+    path : 기본 FEATURES_PATH
+    """
+    key = key or district_features_hash(active_df, cluster_df)
+    return _load_or_build(Path(path) if path else FEATURES_PATH, key,
+                          lambda: compute_district_features(active_df, cluster_df))
+
+
+def load_stream_district_features(cluster_df: pd.DataFrame, aggregates, *, key: str,
+                                  path: str | Path | None = None) -> pd.DataFrame:
+    """저장된 테이블의 키가 key 와 같으면 읽고, 아니면 스트리밍 집계로 만들어 저장합니다.
+
+    Parameters
+    ----------
+    cluster_df : district_clustered.csv (district, cluster, median_pop)
+    aggregates : 인자 없는 callable → listings_stream.MarketAggregates
+                 (저장 테이블이 맞지 않을 때만 호출 — 리스팅 캐시를 훑는 비용)
+    key  : stream_features_key() 결과
+    path : 기본 FEATURES_PATH
+    """
+    return _load_or_build(Path(path) if path else FEATURES_PATH, key,
+                          lambda: aggregates().district_features(cluster_df))
+
+
+def _load_or_build(dst: Path, key: str, build) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if dst.exists() and (pq.read_schema(dst).metadata or {}).get(_META_KEY) == key.encode():
+        return pd.read_parquet(dst)
+
+    table = build()
+    arrow = pa.Table.from_pandas(table)
+    arrow = arrow.replace_schema_metadata({**(arrow.schema.metadata or {}), _META_KEY: key.encode()})
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    pq.write_table(arrow, tmp)
+    os.replace(tmp, dst)
+    return table
+
+
+# build_listing_features(app.py) 가 자치구 통계가 없을 때 쓰는 값 — DEFAULTS 에 없는 것만
+_LOOKUP_FALLBACK = {"district_median_revpar": 40_000, "district_listing_count": 100,
+                    "district_entire_home_rate": 0.7}
+
+
+def listing_features_frame(listings: pd.DataFrame, table: pd.DataFrame) -> pd.DataFrame:
+    """리스팅 프레임 → predict_revpar_batch() 입력 프레임 (행 = 리스팅).
+
+    app.py build_listing_features() 와 같은 규칙을 행 전체에 벡터로 적용합니다.
+    사용자 입력 대신 리스팅 자신의 값(사진 수·평점·TTM 요금 …)을 쓰고, 자치구 통계는
+    table(compute_district_features / load_district_features 결과)에서 가져옵니다.
+    결측 수치는 NaN 그대로 두며 (트리 모델이 결측 분기를 가짐) rel_dist 는
+    predict_revpar_batch 가 1.0 으로 채웁니다. listings 에 없는 컬럼(예: cluster_listings_ao.csv
+    의 guests·room_type·superhost …)도 결측으로 둡니다.
+    """
+    from poi_index import poi_dist_category
+
+    d = table.reindex(listings["district"].astype(str).to_numpy())
+    stat = {c: d[c].fillna(v).to_numpy() if c in d.columns else np.full(len(d), v)
+            for c, v in {**DEFAULTS, **_LOOKUP_FALLBACK}.items()}
+    n = len(listings)
+
+    def num(col):
+        return listings[col].to_numpy(dtype=np.float64) if col in listings.columns else np.full(n, np.nan)
+
+    def cat(col):
+        return listings[col].astype(object).to_numpy() if col in listings.columns else np.full(n, None)
+
+    def flag(col):
+        if col not in listings.columns:
+            return np.full(n, np.nan)
+        return listings[col].astype(bool).astype(np.int8).to_numpy()
+
+    photos, rating = num("photos_count"), num("rating_overall")
+    reviews, min_nights = num("num_reviews"), num("min_nights")
+    poi_km = num("nearest_poi_dist_km")
+    photos_tier = np.array(["하", "중하", "중상", "상"], dtype=object)[
+        np.searchsorted([14, 23, 36], photos, side="right")]   # <14 | 14-22 | 23-35 | 36+
+    active = ((listings["refined_status"] == "Active") & (listings["operation_status"] == "Operating")
+              if "refined_status" in listings.columns else pd.Series(True, index=listings.index))
+
+    def rel(x, mean, floor):
+        return np.clip(x / np.maximum(mean, floor), 0.0, 5.0)
+
+    return pd.DataFrame({
+        # Model A
+        "cluster":                   stat["cluster"].astype(np.int64),
+        "nearest_poi_dist_km":       poi_km,
+        "poi_dist_category":         poi_dist_category(poi_km),
+        "bedrooms":                  num("bedrooms"),
+        "baths":                     num("baths"),
+        "guests":                    num("guests"),
+        "room_type":                 cat("room_type"),
+        "nearest_poi_type_name":     cat("nearest_poi_type_name"),
+        "district_median_revpar":    stat["district_median_revpar"],
+        "district_listing_count":    stat["district_listing_count"],
+        "district_superhost_rate":   stat["district_superhost_rate"],
+        "district_entire_home_rate": stat["district_entire_home_rate"],
+        "ttm_pop":                   stat["ttm_pop"],
+        # Model B
+        "min_nights":             min_nights,
+        "instant_book":           flag("instant_book"),
+        "superhost":              flag("superhost"),
+        "rating_overall":         rating,
+        "photos_count":           photos,
+        "num_reviews":            reviews,
+        "extra_guest_fee_policy": np.where(num("extra_guest_fee_policy") > 0, "1", "0").astype(object),
+        "photos_tier":            photos_tier,
+        "is_active_operating":    active.to_numpy().astype(np.int8),
+        # 자치구 내 상대 경쟁력
+        "photos_rel_dist":     rel(photos, stat["photos_mean"], 1),
+        "rating_rel_dist":     rel(rating, stat["rating_mean"], 0.1),
+        "reviews_rel_dist":    rel(reviews, stat["reviews_mean"], 1),
+        "min_nights_rel_dist": rel(min_nights, stat["min_nights_mean"], 1),
+        # 현재 요금 (price_gap 계산용)
+        "ttm_avg_rate":        num("ttm_avg_rate"),
+    }, index=listings.index)
@@ -0,0 +1,317 @@
+"""
+explain.py — 분리형 피처 기여도 (Price SHAP · Demand SHAP)
+============================================================
+
+notebooks/07_model.md 3.2 의 분리형 SHAP 분석입니다. LightGBM 부스터의 네이티브
+기여도 출력(predict(..., pred_contrib=True), TreeSHAP)으로
+
+    price  : Model A — 피처별 ADR 기여 (원).  "위치 프리미엄이 ₩15,000 상승을 견인 중"
+    demand : Model B — 피처별 예약률 기여 (0~1). "높은 가격 설정이 예약률을 12%p 깎는 중"
+
+을 구합니다. Model A 는 log1p(ADR) 를 예측하므로 로그 척도 기여 φ 를
+ADR_pred - ADR_base 를 φ 비율대로 나누는 방식으로 원 단위로 바꿉니다 (행 합이 정확히
+ADR_pred - ADR_base). Model B 기여의 합은 clip 전 예약률 - Occ_base 입니다.
+
+사용법:
+    python explain.py                     # 클러스터·자치구별 평균 기여 → data/processed/driver_summary.parquet
+
+    from explain import explain_revpar, explain_revpar_batch, load_driver_summary
+    artifacts = load_models(engine="lightgbm")      # 네이티브 기여도는 LightGBM 모델만
+    ex = explain_revpar(listing, **artifacts)        # ex["price_groups"]["location"] → 원
+    batch = explain_revpar_batch(listings_df, **artifacts)
+
+    summary = load_driver_summary()       # 저장된 집계만 읽음 (lightgbm 불필요, 앱 step5 용, 모델 버전이 다르면 None)
+    summary.loc[("cluster", "3")]         # n, ADR_base, price:location, demand:price, ...
+
+집계 입력:
+    cluster_listings_ao.csv (Active+Operating 14,399개) 와 같은 리스팅입니다. 리스팅
+    캐시(data/cache/listings.parquet 또는 원본 CSV)가 있으면 그 Active+Operating 행을
+    써서 모든 피처를 채우고, 없으면 cluster_listings_ao.csv + district_lookup.csv 로
+    만들어 ao 파일에 없는 컬럼(guests·room_type·POI 유형·superhost·TTM 요금)은 결측으로 둡니다.
+"""
+
+from pathlib import Path
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from predict_utils import _model_input, batch_model_inputs
+
+ROOT = Path(__file__).parent
+SUMMARY_PATH = ROOT / "data" / "processed" / "driver_summary.parquet"
+_META_KEY = b"driver_summary_key"
+
+# 그룹 → (화면 라벨, 피처). 어느 그룹에도 없는 피처는 "other" 로 묶여 행 합이 보존됨
+PRICE_GROUPS = {
+    "location":  ("위치 프리미엄", ("cluster", "nearest_poi_dist_km", "poi_dist_category",
+                                    "nearest_poi_type_name", "district_median_revpar",
+                                    "district_listing_count", "district_superhost_rate",
+                                    "district_entire_home_rate", "ttm_pop")),
+    "space":     ("공간·규모", ("bedrooms", "baths", "guests")),
+    "room_type": ("숙소 유형", ("room_type",)),
+}
+DEMAND_GROUPS = {
+    "price":   ("요금 설정", ("price_gap_oof",)),
+    "reviews": ("리뷰·평점", ("num_reviews", "rating_overall", "reviews_rel_dist", "rating_rel_dist")),
+    "photos":  ("사진", ("photos_count", "photos_tier", "photos_rel_dist")),
+    "policy":  ("예약 정책", ("min_nights", "min_nights_rel_dist", "instant_book",
+                              "extra_guest_fee_policy")),
+    "host":    ("슈퍼호스트", ("superhost",)),
+    "market":  ("시장·숙소 유형", ("cluster", "room_type", "is_active_operating")),
+}
+OTHER_LABEL = "기타"
+
+
+def _native_contrib(model, X: np.ndarray, columns: list[str]) -> np.ndarray:
+    """(n, 피처 수 + 1) — 마지막 열은 기준값(expected value)."""
+    if not hasattr(model, "booster_") and not hasattr(model, "dump_model"):
+        raise TypeError(
+            f"{type(model).__name__} 는 네이티브 기여도를 지원하지 않습니다. "
+            "load_models(engine='lightgbm') 으로 로드한 모델을 넘기세요."
+        )
+    return np.asarray(model.predict(_model_input(model, X, columns), pred_contrib=True), dtype=np.float64)
+
+
+def group_contributions(contrib: pd.DataFrame, groups: dict) -> pd.DataFrame:
+    """피처별 기여 → 그룹별 합 (컬럼 = 그룹 키, 남는 피처는 "other")."""
+    out, used = {}, set()
+    for key, (_, features) in groups.items():
+        cols = [c for c in features if c in contrib.columns]
+        used.update(cols)
+        out[key] = contrib[cols].sum(axis=1)
+    rest = [c for c in contrib.columns if c not in used]
+    if rest:
+        out["other"] = contrib[rest].sum(axis=1)
+    return pd.DataFrame(out, index=contrib.index)
+
+
+def group_label(key: str) -> str:
+    """그룹 키 → 화면 라벨 (PRICE_GROUPS · DEMAND_GROUPS)."""
+    for groups in (PRICE_GROUPS, DEMAND_GROUPS):
+        if key in groups:
+            return groups[key][0]
+    return OTHER_LABEL
+
+
+def explain_revpar_batch(
+    listings,
+    *,
+    model_A,
+    model_B,
+    encoders: dict,
+    feature_config: dict,
+    **_,
+) -> dict:
+    """여러 리스팅의 Price SHAP · Demand SHAP (배치당 부스터 호출 3회).
+
+    Parameters
+    ----------
+    listings : pd.DataFrame | pyarrow.Table — predict_revpar_batch() 입력과 같음
+    **artifacts : load_models(engine="lightgbm") 반환값 (iso_reg 등 나머지는 쓰지 않음)
+
+    Returns
+    -------
+    dict with keys (DataFrame 은 모두 index = listings.index):
+        price         : 피처별 ADR 기여 (원), 컬럼 = FEATURES_A. 행 합 = ADR_pred - ADR_base
+        demand        : 피처별 예약률 기여, 컬럼 = FEATURES_B_BASE + price_gap_oof.
+                        행 합 = Occ_raw - Occ_base
+        price_groups  : price 를 PRICE_GROUPS 로 묶은 합
+        demand_groups : demand 를 DEMAND_GROUPS 로 묶은 합
+        base          : ADR_base, ADR_pred, Occ_base, Occ_raw, Occ_pred
+                        (Occ_raw = clip 전 Model B 출력, Occ_pred = clip 후)
+    """
+    FEATURES_A = feature_config["FEATURES_A"]
+    FEATURES_B = feature_config["FEATURES_B_BASE"] + ["price_gap_oof"]
+
+    if not isinstance(listings, pd.DataFrame) and hasattr(listings, "to_pandas"):
+        listings = listings.to_pandas()  # pyarrow.Table
+    X_a, X_b, adr_pred = batch_model_inputs(
+        listings, model_A=model_A, encoders=encoders, feature_config=feature_config)
+
+    # ── Price SHAP: log1p(ADR) 기여 → 원 ────────────────────────────────────
+    phi_a = _native_contrib(model_A, X_a, FEATURES_A)
+    log_base, log_delta = phi_a[:, -1], phi_a[:, :-1].sum(axis=1)
+    adr_base = np.expm1(log_base)
+    # 원 단위 합 / 로그 합 — 로그 합이 0 에 가까우면 극한값 exp(base) (d expm1 / dx)
+    small = np.abs(log_delta) < 1e-12
+    scale = np.where(small, np.exp(log_base),
+                     (np.expm1(log_base + log_delta) - adr_base) / np.where(small, 1.0, log_delta))
+    price = pd.DataFrame(phi_a[:, :-1] * scale[:, None], columns=FEATURES_A, index=listings.index)
+
+    # ── Demand SHAP: 예약률 기여 (price_gap_oof = 요금 설정 효과) ──────────
+    phi_b = _native_contrib(model_B, X_b, FEATURES_B)
+    occ_raw = phi_b.sum(axis=1)
+    demand = pd.DataFrame(phi_b[:, :-1], columns=FEATURES_B, index=listings.index)
+
+    return {
+        "price": price,
+        "demand": demand,
+        "price_groups": group_contributions(price, PRICE_GROUPS),
+        "demand_groups": group_contributions(demand, DEMAND_GROUPS),
+        "base": pd.DataFrame({
+            "ADR_base": adr_base,
+            "ADR_pred": adr_pred,
+            "Occ_base": phi_b[:, -1],
+            "Occ_raw": occ_raw,
+            "Occ_pred": np.clip(occ_raw, 0, 1),
+        }, index=listings.index),
+    }
+
+
+def explain_revpar(listing_features: dict, **artifacts) -> dict:
+    """단일 리스팅의 Price SHAP · Demand SHAP.
+
+    explain_revpar_batch() 를 1행으로 호출한 결과를 dict 로 풉니다.
+
+    Returns
+    -------
+    dict with keys:
+        ADR_base, ADR_pred, Occ_base, Occ_raw, Occ_pred : float
+        price, demand                : {피처: 기여}  (원 / 예약률)
+        price_groups, demand_groups  : {그룹 키: 기여}
+    """
+    res = explain_revpar_batch(pd.DataFrame([listing_features]), **artifacts)
+    out = {k: float(v) for k, v in res["base"].iloc[0].items()}
+    for key in ("price", "demand", "price_groups", "demand_groups"):
+        out[key] = {k: float(v) for k, v in res[key].iloc[0].items()}
+    return out
+
+
+# ── 클러스터·자치구 집계 ──────────────────────────────────────────────────────
+def driver_summary(features: pd.DataFrame, district=None, **artifacts) -> pd.DataFrame:
+    """리스팅 평균 기여를 클러스터별·자치구별·전체로 집계합니다.
+
+    Parameters
+    ----------
+    features : predict_revpar_batch() 입력 프레임 (cluster 컬럼 포함)
+    district : 행별 자치구 (features 와 같은 길이). None 이면 자치구 집계 생략
+    **artifacts : load_models(engine="lightgbm") 반환값
+
+    Returns
+    -------
+    pd.DataFrame — index = (level, key), level ∈ {"all", "cluster", "district"}, key 는 문자열.
+        n, ADR_base, ADR_pred, Occ_base, Occ_pred — 평균
+        price:<그룹>  — 평균 ADR 기여 (원)
+        demand:<그룹> — 평균 예약률 기여 (0~1)
+    """
+    res = explain_revpar_batch(features, **artifacts)
+    flat = pd.concat([
+        res["base"][["ADR_base", "ADR_pred", "Occ_base", "Occ_pred"]],
+        res["price_groups"].add_prefix("price:"),
+        res["demand_groups"].add_prefix("demand:"),
+    ], axis=1)
+    flat.insert(0, "n", 1)
+
+    keys = {"all": np.full(len(flat), "*", dtype=object),
+            "cluster": features["cluster"].astype("Int64").astype(str).to_numpy()}
+    if district is not None:
+        keys["district"] = np.asarray(district, dtype=str)
+    parts = []
+    for level, key in keys.items():
+        g = flat.groupby(key, sort=True)
+        part = g.mean()
+        part["n"] = g.size()
+        part.index = pd.MultiIndex.from_product([[level], part.index], names=["level", "key"])
+        parts.append(part)
+    out = pd.concat(parts)
+    out["n"] = out["n"].astype(np.int64)
+    return out
+
+
+def summary_inputs(listings=None) -> tuple[pd.DataFrame, np.ndarray]:
+    """집계 입력 (피처 프레임, 행별 자치구) — 모듈 docstring 의 "집계 입력" 참고."""
+    from district_features import compute_district_features, listing_features_frame
+    from listings_cache import CACHE_PATH, RAW_CSV, load_listings
+
+    processed = ROOT / "data" / "processed"
+    if listings is None and (CACHE_PATH.exists() or RAW_CSV.exists()):
+        listings = load_listings()
+    if listings is not None:
+        cluster_df = pd.read_csv(processed / "district_clustered.csv")
+        active = listings[(listings["refined_status"] == "Active")
+                          & (listings["operation_status"] == "Operating")]
+        table = compute_district_features(active, cluster_df)
+        return listing_features_frame(active, table), active["district"].astype(str).to_numpy()
+
+    ao = pd.read_csv(processed / "cluster_listings_ao.csv")
+    lookup = pd.read_csv(processed / "district_lookup.csv").set_index("district")
+    return listing_features_frame(ao, lookup), ao["district"].astype(str).to_numpy()
+
+
+def save_driver_summary(summary: pd.DataFrame, path: str | Path | None = None, *,
+                        key: str = "") -> Path:
+    """집계를 parquet 로 저장합니다 (임시 파일 → 교체). key 는 메타데이터에 기록할 모델 버전."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dst = Path(path) if path else SUMMARY_PATH
+    arrow = pa.Table.from_pandas(summary)
+    arrow = arrow.replace_schema_metadata({**(arrow.schema.metadata or {}), _META_KEY: key.encode()})
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    pq.write_table(arrow, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+def write_driver_summary(models_dir: str | Path | None = None, listings=None,
+                         path: str | Path | None = None) -> Path:
+    """summary_inputs() → driver_summary() → save_driver_summary() (모델 버전 기록)."""
+    from predict_utils import load_models, models_version
+
+    features, district = summary_inputs(listings)
+    summary = driver_summary(features, district, **load_models(models_dir, engine="lightgbm"))
+    return save_driver_summary(summary, path, key=models_version(models_dir))
+
+
+def load_driver_summary(path: str | Path | None = None, *, version: str | None = None,
+                        models_dir: str | Path | None = None) -> pd.DataFrame | None:
+    """저장된 집계. 없거나, 기록된 모델 버전이 지금 모델과 다르면 None.
+
+    version 이 None 이면 models_version(models_dir) — write_driver_summary 가 기록한 것과 같은
+    pickle 버전입니다. 모델 파일이 바뀐 뒤 python explain.py 를 다시 돌리기 전까지는 옛 기여도를
+    보여 주지 않습니다. 읽기만 하므로 lightgbm 없이 동작합니다.
+    """
+    import pyarrow.parquet as pq
+
+    src = Path(path) if path else SUMMARY_PATH
+    if not src.exists():
+        return None
+    if version is None:
+        from predict_utils import models_version
+        try:
+            version = models_version(models_dir)
+        except FileNotFoundError:
+            return None
+    stored = (pq.read_schema(src).metadata or {}).get(_META_KEY, b"").decode()
+    if stored != version:
+        return None
+    return pd.read_parquet(src)
+
+
+def top_drivers(row: pd.Series, prefix: str, k: int = 3) -> list[tuple[str, float]]:
+    """집계 1행에서 절댓값이 큰 그룹 k개 — [(화면 라벨, 기여), ...]."""
+    vals = {c.split(":", 1)[1]: float(v) for c, v in row.items()
+            if c.startswith(prefix + ":") and pd.notna(v)}
+    ranked = sorted(vals.items(), key=lambda kv: -abs(kv[1]))[:k]
+    return [(group_label(g), v) for g, v in ranked]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="클러스터·자치구별 평균 피처 기여 집계")
+    ap.add_argument("--models-dir", default=None)
+    args = ap.parse_args(argv)
+
+    path = write_driver_summary(args.models_dir)
+    summary = load_driver_summary(path, models_dir=args.models_dir)
+    print(f"기여도 집계 저장: {path} (리스팅 {summary.loc[('all', '*'), 'n']:,}개)")
+    for (level, key), row in summary.loc[["all", "cluster"]].iterrows():
+        price = " · ".join(f"{label} {'+' if v >= 0 else '-'}₩{abs(v):,.0f}" for label, v in top_drivers(row, "price"))
+        demand = " · ".join(f"{label} {v * 100:+.1f}%p" for label, v in top_drivers(row, "demand"))
+        print(f"  {level}:{key:<3} n={row['n']:>6,} | {price} | {demand}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+listings_cache.py — 원본 리스팅 CSV → 타입 지정 컬럼형(parquet) 캐시
+=====================================================================
+
+data/raw/final_seoul_airbnb_cleaned.csv (32,061행 × 42컬럼) 를 매 콜드 스타트마다
+텍스트 파싱·dtype 추론하는 대신, 한 번 명시적 dtype(카테고리·다운캐스트 정수)으로
+변환해 data/cache/listings.parquet 에 저장하고 필요한 컬럼만 읽습니다.
+
+사용법:
+    python listings_cache.py [csv_path]        # 캐시 (재)생성
+
+    from listings_cache import load_listings
+    df = load_listings()                        # 대시보드 컬럼만 (APP_COLUMNS)
+    df = load_listings(columns=None)            # 42개 전체
+
+캐시 무효화:
+    parquet 메타데이터에 원본 CSV 의 크기·수정 시각과 CACHE_VERSION 을 기록합니다.
+    load_listings() 는 둘 중 하나라도 다르면 캐시를 다시 만듭니다. 원본 CSV 가 없는
+    배포 환경에서는 기존 캐시를 그대로 읽습니다.
+"""
+
+from pathlib import Path
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent
+RAW_CSV = ROOT / "data" / "raw" / "final_seoul_airbnb_cleaned.csv"
+CACHE_PATH = ROOT / "data" / "cache" / "listings.parquet"
+
+# 스키마나 변환 규칙을 바꾸면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+_META_KEY = b"listings_cache"
+
+# app.py 가 실제로 읽는 컬럼 (nearest_poi_image · nearest_poi_addr · l90d_* 등은 제외)
+APP_COLUMNS = (
+    "district", "room_type", "refined_status", "operation_status",
+    "ttm_avg_rate", "ttm_occupancy", "ttm_revpar",
+    "superhost", "instant_book", "photos_count", "rating_overall", "num_reviews",
+    "min_nights", "extra_guest_fee_policy", "nearest_poi_dist_km", "nearest_poi_type_name",
+    "bedrooms", "baths", "guests", "ttm_pop",
+)
+
+# 컬럼별 저장 dtype. 정수는 값 범위에 맞게 줄이고, 실수는 float32 로 값이
+# 바뀌는 컬럼(요금·예약률·평점·좌표)은 float64 를 유지합니다.
+SCHEMA = {
+    "baths": "float32",                 # 0.5 단위 → float32 로 정확히 표현
+    "bedrooms": "int16",
+    "beds": "int16",
+    "district": "category",
+    "extra_guest_fee": "int32",
+    "guests": "int16",
+    "instant_book": "bool",
+    "l90d_avg_rate": "float64",
+    "l90d_occupancy": "float64",
+    "l90d_revenue": "float64",
+    "l90d_revpar": "float64",
+    "l90_pop": "int32",
+    "listing_type": "category",
+    "min_nights": "int16",
+    "num_reviews": "int32",
+    "photos_count": "int16",
+    "rating_overall": "float64",
+    "room_type": "category",
+    "superhost": "bool",
+    "ttm_avg_rate": "float64",
+    "ttm_occupancy": "float64",
+    "ttm_revenue": "float64",
+    "ttm_revpar": "float64",
+    "ttm_pop": "int32",
+    "latitude_masked": "float64",
+    "longitude_masked": "float64",
+    "refined_status": "category",
+    "baths_group": "category",
+    "bedrooms_group": "category",
+    "guests_group": "category",
+    "extra_guest_fee_policy": "int8",
+    "operation_status": "category",
+    "nearest_poi_name": "str",
+    "nearest_poi_addr": "str",
+    "nearest_poi_type": "int8",
+    "nearest_poi_type_name": "category",
+    "nearest_poi_lat": "float64",
+    "nearest_poi_lng": "float64",
+    "nearest_poi_image": "str",
+    "nearest_poi_dist_km": "float64",
+    "exng": "float64",
+    "ttm_exng": "float64",
+}
+
+
+def _source_fingerprint(csv_path: Path) -> dict:
+    st = csv_path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """SCHEMA 대로 dtype 을 바꾸고, 수치 컬럼은 값이 그대로 보존되는지 확인합니다."""
+    out = {}
+    for col in df.columns:
+        dtype = SCHEMA.get(col)
+        s = df[col]
+        if dtype is None:
+            out[col] = s
+        elif dtype == "category":
+            out[col] = s.astype("category")
+        elif dtype == "str":
+            out[col] = s   # 자유 텍스트 — parquet 문자열 컬럼 그대로
+        else:
+            cast = s.astype(dtype)
+            if not np.array_equal(cast.to_numpy(dtype=np.float64), s.to_numpy(dtype=np.float64),
+                                  equal_nan=True):
+                raise ValueError(f"{col}: {s.dtype} → {dtype} 변환에서 값이 달라집니다. "
+                                 "SCHEMA 를 넓히고 CACHE_VERSION 을 올리세요.")
+            out[col] = cast
+    return pd.DataFrame(out, index=df.index)
+
+
+def build_cache(csv_path: str | Path | None = None,
+                cache_path: str | Path | None = None) -> Path:
+    """원본 CSV 를 한 번 파싱해 타입 지정 parquet 캐시를 씁니다 (임시 파일 → 교체)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    src = Path(csv_path) if csv_path else RAW_CSV
+    dst = Path(cache_path) if cache_path else CACHE_PATH
+    fingerprint = _source_fingerprint(src)
+
+    df = _apply_schema(pd.read_csv(src))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": src.name,
+        **fingerprint,
+    }
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _META_KEY: json.dumps(meta).encode("utf-8"),
+    })
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, dst)   # 여러 워커가 동시에 만들어도 반쯤 쓴 파일을 읽지 않음
+    return dst
+
+
+def read_cache_meta(cache_path: str | Path | None = None) -> dict | None:
+    """캐시 parquet 의 listings_cache 메타데이터 (없으면 None). 데이터는 읽지 않습니다."""
+    import pyarrow.parquet as pq
+
+    dst = Path(cache_path) if cache_path else CACHE_PATH
+    if not dst.exists():
+        return None
+    raw = (pq.read_schema(dst).metadata or {}).get(_META_KEY)
+    return json.loads(raw) if raw else None
+
+
+def cache_is_fresh(csv_path: str | Path | None = None,
+                   cache_path: str | Path | None = None) -> bool:
+    """캐시가 현재 CACHE_VERSION 이고 원본 CSV 의 크기·수정 시각과 일치하는지."""
+    src = Path(csv_path) if csv_path else RAW_CSV
+    meta = read_cache_meta(cache_path)
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return False
+    if not src.exists():
+        return True   # 원본 없이 캐시만 배포된 환경
+    fp = _source_fingerprint(src)
+    return meta.get("size") == fp["size"] and meta.get("mtime_ns") == fp["mtime_ns"]
+
+
+def ensure_cache(csv_path: str | Path | None = None, cache_path: str | Path | None = None) -> Path:
+    """캐시가 없거나 오래됐으면 다시 만들고 캐시 경로를 반환합니다 (원본이 없으면 기존 캐시 그대로)."""
+    src = Path(csv_path) if csv_path else RAW_CSV
+    dst = Path(cache_path) if cache_path else CACHE_PATH
+    if not cache_is_fresh(src, dst):
+        if not src.exists():
+            raise FileNotFoundError(f"리스팅 원본도 캐시도 없습니다: {src}")
+        build_cache(src, dst)
+    return dst
+
+
+def load_listings(columns=APP_COLUMNS, *, csv_path: str | Path | None = None,
+                  cache_path: str | Path | None = None, filters=None) -> pd.DataFrame:
+    """리스팅 테이블을 캐시에서 읽습니다. 캐시가 없거나 오래됐으면 먼저 다시 만듭니다.
+
+    Parameters
+    ----------
+    columns : 읽을 컬럼 목록 (기본 APP_COLUMNS, None 이면 전체)
+    csv_path, cache_path : 기본 RAW_CSV / CACHE_PATH
+    filters : pyarrow 행 필터 (예: listings_stream.ACTIVE_FILTERS) — 조건에 맞는 행만 메모리에 올림
+
+    Returns
+    -------
+    pd.DataFrame — 카테고리 컬럼은 category dtype, 정수는 SCHEMA 의 다운캐스트 dtype
+    """
+    dst = ensure_cache(csv_path, cache_path)
+    return pd.read_parquet(dst, columns=None if columns is None else list(columns), filters=filters)
+
+
+if __name__ == "__main__":
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else RAW_CSV
+    path = build_cache(target)
+    meta = read_cache_meta(path)
+    print(f"캐시 저장: {path} ({path.stat().st_size / 1e6:.1f} MB, "
+          f"원본 {meta['size'] / 1e6:.1f} MB, v{meta['version']})")
@@ -0,0 +1,241 @@
+"""
+listings_stream.py — 메모리보다 큰 리스팅 스냅숏을 청크로 읽어 한 번에 집계
+==========================================================================
+
+원본 전체를 DataFrame 으로 올려 집계하면 여러 해의 월간 스냅숏(수천만 행)은 메모리에
+들어가지 않습니다. 이 모듈은 파일을 chunk_size 행씩 읽으며 Active+Operating 행만 골라
+
+    자치구           : 리스팅 수, 평균 컬럼(슈퍼호스트·전체 숙소 비율, 사진·평점·리뷰·최소 숙박)
+                       의 합·개수, ttm_revpar 중앙값 스케치   → compute_district_stats
+    (자치구, 숙소 유형): 리스팅 수, BENCH_COLUMNS 분위수 스케치  → get_bench (P5…P95)
+                       (quantile_sketch.SketchTable — 저장·월 단위 병합 가능)
+
+를 한 번의 패스로 접습니다. 피크 메모리는 청크 하나 + 스케치(셀 수 × O(k log n))로,
+파일 크기와 무관합니다. 분위수는 KLL 스케치(quantile_sketch.py) 근사이며, 셀의 리스팅이
+k 개 이하이면 정확값입니다 (자치구 RevPAR 중앙값은 자치구가 25개뿐이라 DISTRICT_K 로 크게 —
+자치구당 8,192행까지 정확값). 평균·개수는 정확합니다.
+
+입력은 원본 CSV 또는 리스팅 캐시(listings_cache.py 의 parquet, 행 그룹 단위로 읽음)입니다.
+app.py 는 리스팅 캐시를 이 모듈로 한 번 훑어 자치구 통계(compute_district_stats)와
+벤치마크 테이블(benchmark_table.write_benchmark_table — 셀 스케치는 quantile_sketch.STORE_K 라
+현재 규모에서는 정확값, 셀 스케치는 증분 갱신용 저장소로도 저장)을 만듭니다.
+
+사용법:
+    python listings_stream.py [csv_path] [--chunk-size 50000] [--bench-table]
+
+    from listings_stream import stream_aggregates
+    agg = stream_aggregates("snapshots_2023_2025.csv", chunk_size=50_000)
+    table = agg.district_features(cluster_df)   # compute_district_features() 와 같은 스키마
+    index = agg.benchmark_index()               # load_benchmark_index() 와 같은 셀·분위수 구조
+
+    agg.merge(other)                            # 다른 파일·프로세스에서 접은 집계 합치기
+
+    listings_cache.load_listings(filters=ACTIVE_FILTERS)   # Active+Operating 행만 메모리에 (parquet 필터)
+"""
+
+from pathlib import Path
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmark_table import BENCH_COLUMNS, KEYS, BenchmarkIndex
+from district_features import DEFAULTS, SCHEMA
+from listings_cache import RAW_CSV
+from quantile_sketch import DEFAULT_K, KLLSketch, SketchTable, numeric_values
+
+ROOT = Path(__file__).parent
+
+CHUNK_SIZE = 50_000
+DISTRICT_K = 8_192     # 자치구 RevPAR 중앙값 스케치 — 자치구 25개라 메모리 ~1.6 MB
+
+# 자치구 평균 컬럼 → 원본 컬럼 (compute_district_features 와 같은 이름)
+_MEANS = {
+    "district_entire_home_rate": "room_type",    # room_type == "entire_home" 비율
+    "district_superhost_rate": "superhost",
+    "photos_mean": "photos_count",
+    "rating_mean": "rating_overall",
+    "reviews_mean": "num_reviews",
+    "min_nights_mean": "min_nights",
+}
+STREAM_COLUMNS = tuple(dict.fromkeys(
+    ("refined_status", "operation_status", *KEYS, "ttm_revpar", "superhost", *_MEANS.values(),
+     *BENCH_COLUMNS)))
+
+
+# active_mask 와 같은 조건의 pyarrow 행 필터 (listings_cache.load_listings(filters=...))
+ACTIVE_FILTERS = [("refined_status", "==", "Active"), ("operation_status", "==", "Operating")]
+
+
+def active_mask(chunk: pd.DataFrame) -> np.ndarray:
+    """Active+Operating 행 (app.py load_data() 의 active_df 조건)."""
+    return ((chunk["refined_status"] == "Active")
+            & (chunk["operation_status"] == "Operating")).to_numpy()
+
+
+def iter_listing_chunks(csv_path: str | Path | None = None, columns=STREAM_COLUMNS,
+                        chunk_size: int = CHUNK_SIZE):
+    """원본 CSV(또는 .parquet 리스팅 캐시)를 chunk_size 행씩 — columns 중 파일에 있는 컬럼만 읽습니다."""
+    src = Path(csv_path) if csv_path else RAW_CSV
+    if src.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        f = pq.ParquetFile(src)
+        usecols = [c for c in columns if c in f.schema_arrow.names]
+        for batch in f.iter_batches(batch_size=chunk_size, columns=usecols):
+            yield batch.to_pandas()
+        return
+    header = pd.read_csv(src, nrows=0).columns
+    usecols = [c for c in columns if c in header]
+    yield from pd.read_csv(src, usecols=usecols, chunksize=chunk_size)
+
+
+class MarketAggregates:
+    """청크 단위로 접는 자치구·(자치구, 숙소 유형) 집계.
+
+    Parameters
+    ----------
+    k          : (자치구, 숙소 유형) 셀 분위수 스케치 크기 (quantile_sketch.DEFAULT_K)
+    district_k : 자치구 RevPAR 중앙값 스케치 크기 (DISTRICT_K)
+    """
+
+    def __init__(self, k: int = DEFAULT_K, district_k: int = DISTRICT_K):
+        self.k = k
+        self.district_k = district_k
+        self.rows = 0          # 읽은 전체 행
+        self.active_rows = 0   # 그중 Active+Operating
+        self.cells = SketchTable(BENCH_COLUMNS, k)   # (district, room_type) × BENCH_COLUMNS
+        self._districts = {}   # district → {"n", "sums", "counts", "revpar"}
+
+    def _sketch(self) -> KLLSketch:
+        return KLLSketch(self.district_k, seed=len(self._districts))
+
+    def update(self, chunk: pd.DataFrame) -> "MarketAggregates":
+        """원본 청크 하나를 접습니다 (Active+Operating 필터는 여기서)."""
+        self.rows += len(chunk)
+        # 전체 리스팅의 (district, room_type) — Active+Operating 이 없으면 리스팅 수 0 셀
+        self.cells.add_keys(chunk[list(KEYS)].dropna().astype(str).itertuples(index=False, name=None))
+        active = chunk[active_mask(chunk)]
+        self.active_rows += len(active)
+        if active.empty:
+            return self
+
+        # 자치구 평균 — (NaN 제외) 합·개수를 자치구 그룹 키 하나로
+        district = active["district"].astype(str).to_numpy()
+        vals = np.column_stack([
+            active["room_type"].eq("entire_home").to_numpy(np.float64) if col == "room_type"
+            else numeric_values(active[col]) if col in active.columns else np.full(len(active), np.nan)
+            for col in _MEANS.values()])
+        revpar = numeric_values(active["ttm_revpar"])
+        for d, rows in pd.Series(district).groupby(district, sort=False).indices.items():
+            entry = self._districts.get(d)
+            if entry is None:
+                entry = self._districts[d] = {"n": 0, "sums": np.zeros(len(_MEANS)),
+                                              "counts": np.zeros(len(_MEANS), dtype=np.int64),
+                                              "revpar": self._sketch()}
+            v = vals[rows]
+            entry["n"] += len(rows)
+            entry["sums"] += np.nansum(v, axis=0)
+            entry["counts"] += (~np.isnan(v)).sum(axis=0)
+            entry["revpar"].update(revpar[rows])
+
+        # (자치구, 숙소 유형) 분위수 스케치
+        self.cells.update(active)
+        return self
+
+    def merge(self, other: "MarketAggregates") -> "MarketAggregates":
+        """other 의 집계를 더합니다 (다른 파일·월·프로세스). other 는 바뀌지 않음."""
+        self.rows += other.rows
+        self.active_rows += other.active_rows
+        self.cells.merge(other.cells)
+        for d, o in other._districts.items():
+            entry = self._districts.setdefault(d, {"n": 0, "sums": np.zeros(len(_MEANS)),
+                                                   "counts": np.zeros(len(_MEANS), dtype=np.int64),
+                                                   "revpar": self._sketch()})
+            entry["n"] += o["n"]
+            entry["sums"] = entry["sums"] + o["sums"]
+            entry["counts"] = entry["counts"] + o["counts"]
+            entry["revpar"].merge(o["revpar"])
+        return self
+
+    def district_means(self) -> pd.DataFrame:
+        """자치구별 평균 컬럼 (슈퍼호스트·전체 숙소 비율, photos_mean …) — 값이 없는 컬럼은 NaN.
+
+        Returns
+        -------
+        pd.DataFrame — index = district (정렬), 컬럼 = _MEANS 의 키
+        """
+        districts = sorted(self._districts)
+        entries = [self._districts[d] for d in districts]
+        sums = np.array([e["sums"] for e in entries]).reshape(len(entries), len(_MEANS))
+        counts = np.array([e["counts"] for e in entries]).reshape(len(entries), len(_MEANS))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        return pd.DataFrame(means, columns=list(_MEANS), index=pd.Index(districts, name="district"))
+
+    def district_features(self, cluster_df: pd.DataFrame) -> pd.DataFrame:
+        """compute_district_features() 와 같은 자치구 테이블 (중앙값만 스케치 근사).
+
+        Parameters
+        ----------
+        cluster_df : district_clustered.csv (district, cluster, median_pop)
+
+        Returns
+        -------
+        pd.DataFrame — index = district, 컬럼·dtype 은 district_features.SCHEMA
+        """
+        table = self.district_means()
+        entries = [self._districts[d] for d in table.index]
+        table.insert(0, "district_listing_count", [e["n"] for e in entries])
+        table.insert(0, "district_median_revpar", [e["revpar"].percentile(50) for e in entries])
+
+        by_district = cluster_df.set_index("district")
+        table["cluster"] = by_district["cluster"].reindex(table.index) if "cluster" in by_district else np.nan
+        table["ttm_pop"] = by_district["median_pop"].reindex(table.index)
+        for col, default in DEFAULTS.items():
+            if col not in table.columns:
+                table[col] = default
+            table[col] = table[col].fillna(default)
+        return table[list(SCHEMA)].astype(SCHEMA)
+
+    def benchmark_index(self) -> BenchmarkIndex:
+        """build_benchmark_index() 와 같은 셀 구조의 BenchmarkIndex (행 위치 없음, P5…P95).
+
+        Active+Operating 셀은 스케치 분위수, 전체 리스팅에만 있는 조합은 리스팅 수 0 셀.
+        """
+        return self.cells.benchmark_index()
+
+
+def stream_aggregates(csv_path: str | Path | None = None, *, chunk_size: int = CHUNK_SIZE,
+                      k: int = DEFAULT_K) -> MarketAggregates:
+    """원본 CSV(또는 리스팅 캐시 parquet)를 한 번 훑어 MarketAggregates 를 만듭니다
+    (메모리 ≈ 청크 1개 + 스케치)."""
+    agg = MarketAggregates(k)
+    for chunk in iter_listing_chunks(csv_path, STREAM_COLUMNS, chunk_size):
+        agg.update(chunk)
+    return agg
+
+
+def main(argv=None):
+    from benchmark_table import save_benchmark_index
+
+    ap = argparse.ArgumentParser(description="리스팅 CSV 스트리밍 집계")
+    ap.add_argument("csv", nargs="?", default=None)
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--bench-table", action="store_true",
+                    help="셀 스케치를 data/cache/quantile_sketches.npz 저장소로, 그 분위수로 "
+                         "benchmark_table.npz 를 씀 (원본이 메모리에 안 들어갈 때)")
+    args = ap.parse_args(argv)
+
+    src = Path(args.csv) if args.csv else RAW_CSV
+    agg = stream_aggregates(src, chunk_size=args.chunk_size)
+    print(f"{agg.rows:,}행 중 Active+Operating {agg.active_rows:,}행 · 자치구 {len(agg._districts)}개 · "
+          f"(자치구, 숙소 유형) 셀 {len(agg.cells)}개")
+    if args.bench_table:
+        store = agg.cells.save()   # 이후 배치는 quantile_sketch.py update 로 이 저장소에 더함
+        path = save_benchmark_index(agg.benchmark_index(), csv_path=src)
+        print(f"스케치 저장소 {store} · 벤치마크 테이블 저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
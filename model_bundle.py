@@ -0,0 +1,283 @@
+"""
+model_bundle.py — 빠른 시작용 모델 아티팩트 번들 (mmap 로드)
+==============================================================
+
+models/*.pkl 4개 + feature_config.json 을 하나의 번들 폴더로 변환합니다.
+번들은 작은 JSON 헤더(manifest.json)와 배열 섹션(.npy 파일)으로 구성되며,
+로드 시 np.load(mmap_mode="r") 로 매핑하므로 unpickle·joblib·sklearn·lightgbm
+import 가 없고, 같은 호스트의 여러 Streamlit 워커가 같은 페이지 캐시를 공유합니다.
+
+사용법:
+    python model_bundle.py [models_dir]          # models/ → models/bundle/ 변환 + 패리티 검증
+
+    from predict_utils import load_models
+    artifacts = load_models(fmt="bundle")         # = load_bundle("models/bundle")
+
+번들 구조 (models/bundle/):
+    manifest.json
+        format, version           — 포맷 식별자 / BUNDLE_VERSION
+        feature_config            — feature_config.json 원문
+        trees                     — {model_A|model_B: {feature_names}}
+        iso_reg                   — {x_min, x_max, out_of_bounds}
+        encoders                  — categorical_cols 순서
+        conformal                 — conformal.json 원문 (예측 구간, 없으면 null)
+        source                    — 변환에 쓴 원본 파일별 sha256 (로드 시 현재 파일과 대조)
+        sections                  — {섹션명: {file, dtype, shape, sha256}}
+        checksum                  — 위 필드 전체(JSON 정규화)의 sha256
+    model_A.<array>.npy, model_B.<array>.npy   — tree_engine.FlatTreeEnsemble 배열
+    iso_reg.x.npy, iso_reg.y.npy               — Isotonic 브레이크포인트
+    encoders.<col>.npy                          — 카테고리 vocabulary (LabelEncoder.classes_ 순서)
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import shutil
+import sys
+
+import numpy as np
+
+from conformal import CONFORMAL_FILE, ConformalTable
+from tree_engine import FlatTreeEnsemble, flatten_pkl, load_flat_model
+
+BUNDLE_FORMAT = "seoul-revpar-bundle"
+BUNDLE_VERSION = 1
+
+_MODELS_DIR = Path(__file__).parent / "models"
+_MANIFEST = "manifest.json"
+_TREE_MODELS = ("model_A", "model_B")
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_files(models_dir: Path) -> list[Path]:
+    """번들로 변환되는 원본 파일 — manifest 의 source 에 sha256 을 기록합니다.
+
+    npz 도 포함하므로 pkl 없이 npz 만 배포된 폴더에서 npz 를 바꿔도 번들이 낡은 것으로 잡힙니다.
+    """
+    return sorted([*models_dir.glob("*.pkl"), *models_dir.glob("*.npz")]) + [
+        models_dir / "feature_config.json", *models_dir.glob(CONFORMAL_FILE)]
+
+
+class StaleBundleError(FileNotFoundError):
+    """원본(pkl·npz·feature_config.json·conformal.json)이 변환 뒤 바뀐 번들.
+
+    FileNotFoundError 의 하위 클래스라, 번들이 없을 때 load_models(engine="numpy") 로
+    대체하는 호출부(app.load_ml_models·revpar_service·bulk_score·conformal)가 재학습한
+    모델을 씁니다 — npz 는 기록된 pkl 해시가 어긋나면 pkl 에서 다시 평탄화됩니다
+    (tree_engine.load_flat_model).
+    """
+
+
+def _manifest_checksum(manifest: dict) -> str:
+    body = {k: v for k, v in manifest.items() if k != "checksum"}
+    canonical = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def convert_models(models_dir: str | Path | None = None,
+                   bundle_dir: str | Path | None = None) -> Path:
+    """현재 models/ 폴더(pkl + feature_config.json)를 번들로 변환합니다.
+
+    임시 폴더에 쓴 뒤 교체하므로 변환 도중 다른 프로세스가 반쯤 쓴 번들을
+    읽지 않습니다. 변환 후 원본 pkl 과 예측값이 같은지 검증합니다.
+    """
+    import joblib
+    from conformal import load_conformal
+    from predict_utils import IsotonicTable, check_isotonic_parity, compile_encoders
+
+    d = Path(models_dir) if models_dir else _MODELS_DIR
+    out = Path(bundle_dir) if bundle_dir else d / "bundle"
+
+    # 트리는 pkl 에서 직접 평탄화 — 재학습 뒤 남아 있는 옛 npz 를 번들로 옮기지 않음
+    trees = {name: _flatten_tree(d, name.lower()) for name in _TREE_MODELS}
+
+    iso = joblib.load(d / "iso_reg.pkl")
+    table = IsotonicTable.from_sklearn(iso)
+    if check_isotonic_parity(iso, table) != 0.0:
+        raise AssertionError("IsotonicTable 이 iso_reg.pkl 과 다른 값을 반환합니다.")
+    with open(d / "feature_config.json", encoding="utf-8") as f:
+        feature_config = json.load(f)
+    encoders = compile_encoders(joblib.load(d / "encoders.pkl"),
+                                feature_config.get("categorical_cols"))
+    conformal = load_conformal(d)
+
+    arrays = {}
+    for name in _TREE_MODELS:
+        for key in FlatTreeEnsemble._ARRAYS:
+            arrays[f"{name}.{key}"] = getattr(trees[name], key)
+    arrays["iso_reg.x"] = table.x
+    arrays["iso_reg.y"] = table.y
+    for col, cat in encoders.items():
+        arrays[f"encoders.{col}"] = cat.classes
+
+    tmp = out.with_name(out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    sections = {}
+    for key, arr in arrays.items():
+        fname = f"{key}.npy"
+        np.save(tmp / fname, np.ascontiguousarray(arr), allow_pickle=False)
+        sections[key] = {
+            "file": fname,
+            "dtype": np.asarray(arr).dtype.str,
+            "shape": list(np.shape(arr)),
+            "sha256": _sha256_file(tmp / fname),
+        }
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "feature_config": feature_config,
+        "trees": {name: {"feature_names": trees[name].feature_names} for name in _TREE_MODELS},
+        "iso_reg": {"x_min": table.x_min, "x_max": table.x_max,
+                    "out_of_bounds": table.out_of_bounds},
+        "encoders": list(encoders),
+        "conformal": conformal.to_dict() if conformal is not None else None,
+        "source": {p.name: _sha256_file(p) for p in _source_files(d)},
+        "sections": sections,
+    }
+    manifest["checksum"] = _manifest_checksum(manifest)
+    with open(tmp / _MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    shutil.rmtree(out, ignore_errors=True)
+    tmp.rename(out)
+
+    _check_parity(d, load_bundle(out))
+    return out
+
+
+def _flatten_tree(models_dir: Path, stem: str) -> FlatTreeEnsemble:
+    """{stem}.pkl → FlatTreeEnsemble. lightgbm 이 없으면 pkl 해시가 일치하는 npz 만 씁니다."""
+    try:
+        return flatten_pkl(models_dir / f"{stem}.pkl")[1]
+    except ImportError:  # npz 가 낡았으면 load_flat_model 이 재평탄화를 시도하다 ImportError
+        return load_flat_model(models_dir, stem)
+
+
+def _check_parity(models_dir: Path, bundled: dict) -> None:
+    """번들 트리 모델이 원본 LightGBM pkl 과 같은 예측을 내는지 확인합니다."""
+    import joblib
+    from tree_engine import check_parity
+
+    for name in _TREE_MODELS:
+        try:
+            original = joblib.load(models_dir / f"{name.lower()}.pkl")
+        except ImportError:  # lightgbm 없는 환경 — pkl 해시가 일치하는 npz 를 옮겼으므로 생략
+            continue
+        err = check_parity(original, bundled[name])
+        if err != 0.0:
+            raise AssertionError(f"번들 {name} 예측이 원본과 다릅니다 (최대 오차 {err:.3g}).")
+
+
+def check_source(manifest: dict, models_dir: Path) -> None:
+    """models_dir 의 현재 원본 파일이 번들 변환 때(manifest["source"])와 같은지 확인합니다.
+
+    바뀐 파일이나 변환 뒤 새로 생긴 파일(예: conformal.json)이 있으면 StaleBundleError.
+    원본이 아예 없는 폴더(번들만 배포)는 비교할 것이 없으므로 통과합니다.
+    """
+    recorded = manifest.get("source", {})
+    changed = [p.name for p in _source_files(models_dir)
+               if p.exists() and recorded.get(p.name) != _sha256_file(p)]
+    if changed:
+        raise StaleBundleError(
+            f"모델 번들이 원본보다 오래되었습니다 ({', '.join(changed)} 변경): {models_dir / 'bundle'}\n"
+            "python model_bundle.py 로 다시 변환하세요."
+        )
+
+
+def read_manifest(bundle_dir: str | Path | None = None, *, source_dir: str | Path | None = None) -> dict:
+    """manifest.json 을 읽고 포맷·버전·헤더 체크섬·원본 일치(check_source)를 확인합니다.
+
+    source_dir 는 원본 pkl 폴더 (기본: 번들 폴더의 상위 = models/).
+    """
+    b = Path(bundle_dir) if bundle_dir else _MODELS_DIR / "bundle"
+    path = b / _MANIFEST
+    if not path.exists():
+        raise FileNotFoundError(
+            f"모델 번들을 찾을 수 없습니다: {b}\n"
+            "python model_bundle.py 로 models/ 폴더를 변환하세요."
+        )
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"모델 번들 포맷이 아닙니다: {path}")
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(
+            f"번들 버전 {manifest.get('version')} 은 지원하지 않습니다 "
+            f"(현재 {BUNDLE_VERSION}). python model_bundle.py 로 다시 변환하세요."
+        )
+    if manifest.get("checksum") != _manifest_checksum(manifest):
+        raise ValueError(f"번들 헤더 체크섬 불일치: {path}")
+    check_source(manifest, Path(source_dir) if source_dir else b.parent)
+    return manifest
+
+
+def load_bundle(bundle_dir: str | Path | None = None, *, verify: bool = True) -> dict:
+    """번들을 mmap 으로 로드해 load_models() 와 같은 artifacts dict 를 반환합니다.
+
+    Parameters
+    ----------
+    bundle_dir : 번들 폴더 (기본: models/bundle)
+    verify : True 면 각 섹션 파일의 sha256 을 manifest 와 대조합니다
+             (번들 전체 ~1MB, 수 ms).
+
+    변환 뒤 원본이 바뀌었으면 StaleBundleError (read_manifest → check_source).
+
+    Returns
+    -------
+    dict with keys:
+        model_A, model_B  : FlatTreeEnsemble (배열은 read-only memmap)
+        iso_reg           : IsotonicTable
+        encoders          : {categorical_col: CategoryTable}
+        feature_config    : dict
+        conformal         : ConformalTable | None
+    """
+    from predict_utils import CategoryTable, IsotonicTable
+
+    b = Path(bundle_dir) if bundle_dir else _MODELS_DIR / "bundle"
+    manifest = read_manifest(b)
+
+    arrays = {}
+    for key, sec in manifest["sections"].items():
+        path = b / sec["file"]
+        if verify and _sha256_file(path) != sec["sha256"]:
+            raise ValueError(f"번들 섹션 체크섬 불일치: {path}")
+        arr = np.load(path, mmap_mode="r", allow_pickle=False)
+        if arr.dtype.str != sec["dtype"] or list(arr.shape) != sec["shape"]:
+            raise ValueError(f"번들 섹션 형식 불일치: {path}")
+        arrays[key] = arr
+
+    artifacts = {
+        name: FlatTreeEnsemble(
+            **{k: arrays[f"{name}.{k}"] for k in FlatTreeEnsemble._ARRAYS},
+            feature_names=manifest["trees"][name]["feature_names"],
+        )
+        for name in _TREE_MODELS
+    }
+    iso = manifest["iso_reg"]
+    artifacts["iso_reg"] = IsotonicTable(arrays["iso_reg.x"], arrays["iso_reg.y"],
+                                         iso["x_min"], iso["x_max"], iso["out_of_bounds"])
+    artifacts["encoders"] = {col: CategoryTable(arrays[f"encoders.{col}"])
+                             for col in manifest["encoders"]}
+    artifacts["feature_config"] = manifest["feature_config"]
+    conformal = manifest.get("conformal")
+    artifacts["conformal"] = ConformalTable.from_dict(conformal) if conformal else None
+    return artifacts
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else None
+    path = convert_models(target)
+    m = read_manifest(path)
+    size = sum((path / s["file"]).stat().st_size for s in m["sections"].values())
+    print(f"번들 저장: {path} (v{m['version']}, 섹션 {len(m['sections'])}개, "
+          f"{size / 1024:.0f} KB, checksum {m['checksum'][:12]}…)")
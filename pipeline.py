@@ -0,0 +1,356 @@
+"""
+pipeline.py — data/processed 산출물 증분 재생성 파이프라인
+==========================================================
+
+원본 리스팅(data/raw/final_seoul_airbnb_cleaned.csv)과 data/external/*.csv 로부터
+아래 네 파일을 단계(stage) 의존 그래프로 다시 만듭니다.
+
+    listings ──► district_partials ──► district_aggregated ──► district_clustered ──► district_lookup
+    population ─────────────────────────────┘                          ▲ (frozen labels)       ▲
+    listings ──► cluster_listings_ao ◄── (frozen labels)               └── district_partials ──┘
+
+각 단계의 입력은 내용 해시로 식별합니다. 입력 해시가 지난 실행과 같고 출력 파일이
+그대로면 건너뛰고, 자치구별 집계(district_partials)는 행 내용이 바뀐 자치구만 다시
+계산합니다. 상태는 data/processed/.pipeline/ 에 저장됩니다.
+
+사용법:
+    python pipeline.py                       # 바뀐 단계만 재실행
+    python pipeline.py --raw new_scrape.csv  # 다른 원본으로
+    python pipeline.py --force               # 전 단계 재실행
+
+클러스터 라벨:
+    cluster · cluster_rank · cluster_name 은 Model A 학습에 쓰인 값이라 재군집하지
+    않고 현재 district_clustered.csv 의 라벨을 그대로 유지합니다 (frozen labels).
+"""
+
+from pathlib import Path
+import argparse
+import codecs
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from listings_cache import CACHE_PATH, RAW_CSV, load_listings
+
+ROOT = Path(__file__).parent
+PROCESSED_DIR = ROOT / "data" / "processed"
+EXTERNAL_DIR = ROOT / "data" / "external"
+STATE_DIRNAME = ".pipeline"
+
+# 집계 규칙·출력 컬럼을 바꾸면 올려서 모든 단계를 다시 실행
+PIPELINE_VERSION = 1
+
+# 휴면 리스팅으로 세는 refined_status 값
+DORMANT_STATUSES = ("Dormant",)
+
+# cluster_listings_ao.csv 의 리스팅 컬럼 (cluster · cluster_name · district 뒤)
+AO_COLUMNS = ("num_reviews", "rating_overall", "photos_count", "instant_book", "min_nights",
+              "extra_guest_fee_policy", "nearest_poi_dist_km", "bedrooms", "baths")
+
+_LISTING_COLUMNS = ("district", "room_type", "refined_status", "operation_status",
+                    "ttm_revpar", "superhost") + AO_COLUMNS
+_LABEL_COLUMNS = ("district", "cluster", "cluster_rank", "cluster_name")
+
+# UTF-8 BOM 을 붙여 배포된 산출물 — 출력 파일이 아직 없을 때의 기본값 (있으면 그 파일을 따름)
+_BOM_OUTPUTS = ("district_aggregated.csv", "district_clustered.csv")
+
+# monthly_population.csv 의 시군구명 → 리스팅 district
+DISTRICT_EN = {
+    "강남구": "Gangnam-gu", "강동구": "Gangdong-gu", "강북구": "Gangbuk-gu",
+    "강서구": "Gangseo-gu", "관악구": "Gwanak-gu", "광진구": "Gwangjin-gu",
+    "구로구": "Guro-gu", "금천구": "Geumcheon-gu", "노원구": "Nowon-gu",
+    "도봉구": "Dobong-gu", "동대문구": "Dongdaemun-gu", "동작구": "Dongjak-gu",
+    "마포구": "Mapo-gu", "서대문구": "Seodaemun-gu", "서초구": "Seocho-gu",
+    "성동구": "Seongdong-gu", "성북구": "Seongbuk-gu", "송파구": "Songpa-gu",
+    "양천구": "Yangcheon-gu", "영등포구": "Yeongdeungpo-gu", "용산구": "Yongsan-gu",
+    "은평구": "Eunpyeong-gu", "종로구": "Jongno-gu", "중구": "Jung-gu",
+    "중랑구": "Jungnang-gu",
+}
+
+
+# ── 해시 ──────────────────────────────────────────────────────────────────────
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _csv_encoding(path: Path) -> str:
+    """path 를 다시 쓸 때의 인코딩 — 기존 파일에 BOM 이 있었을 때만 utf-8-sig."""
+    if path.exists():
+        with open(path, "rb") as f:
+            return "utf-8-sig" if f.read(3) == codecs.BOM_UTF8 else "utf-8"
+    return "utf-8-sig" if path.name in _BOM_OUTPUTS else "utf-8"
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def district_row_hashes(listings: pd.DataFrame) -> dict:
+    """자치구 → 해당 자치구 리스팅 행(_LISTING_COLUMNS, 원본 순서)의 내용 해시."""
+    rows = pd.util.hash_pandas_object(listings[list(_LISTING_COLUMNS)], index=False).to_numpy()
+    groups = listings.groupby(listings["district"].astype(str), sort=True).indices
+    return {d: _digest(rows[idx].tobytes()) for d, idx in groups.items()}
+
+
+# ── 단계별 집계 ────────────────────────────────────────────────────────────────
+def district_partials(listings: pd.DataFrame) -> pd.DataFrame:
+    """자치구별 부분 집계 — 전체·Active+Operating 리스팅 수, RevPAR 중위값, 비율."""
+    district = listings["district"].astype(str)
+    ao = ((listings["refined_status"] == "Active")
+          & (listings["operation_status"] == "Operating")).to_numpy()
+    superhost = listings["superhost"].to_numpy(np.float64)
+    entire = listings["room_type"].eq("entire_home").to_numpy(np.float64)
+
+    g_all = pd.DataFrame({
+        "total_listings": 1,
+        "ao_count": ao.astype(np.int64),
+        "dormant_count": listings["refined_status"].isin(DORMANT_STATUSES).to_numpy(np.int64),
+    }, index=listings.index).groupby(district, sort=True).sum()
+    g_all["superhost_rate"] = pd.Series(superhost, index=listings.index).groupby(district, sort=True).mean()
+
+    ao_frame = pd.DataFrame({
+        "median_revpar_ao": listings["ttm_revpar"].to_numpy()[ao],
+        "ao_superhost_rate": superhost[ao],
+        "ao_entire_home_rate": entire[ao],
+    })
+    g_ao = ao_frame.groupby(district.to_numpy()[ao], sort=True).agg(
+        {"median_revpar_ao": "median", "ao_superhost_rate": "mean", "ao_entire_home_rate": "mean"})
+    out = g_all.join(g_ao)
+    out.index.name = "district"
+    return out
+
+
+def district_population(population: pd.DataFrame, months: int = 12) -> pd.Series:
+    """최근 months 개월 총생활인구수 평균(정수 절사) — 리스팅 ttm_pop 과 같은 정의."""
+    recent = sorted(population["기준년월"].unique())[-months:]
+    pop = population[population["기준년월"].isin(recent)]
+    pop = pop[pop["시군구명"].isin(DISTRICT_EN)]
+    out = pop.groupby("시군구명")["총생활인구수"].mean().astype(np.int64)
+    out.index = out.index.map(DISTRICT_EN)
+    out.index.name = "district"
+    return out.rename("median_pop").sort_index()
+
+
+def build_district_aggregated(partials: pd.DataFrame, population: pd.Series) -> pd.DataFrame:
+    out = partials[["total_listings", "ao_count", "median_revpar_ao", "dormant_count",
+                    "superhost_rate"]].copy()
+    out["median_pop"] = population.reindex(out.index).astype(np.float64)
+    out["dormant_ratio"] = out["dormant_count"] / out["total_listings"]
+    out["supply_share"] = out["total_listings"] / out["total_listings"].sum()
+    return out.reset_index()
+
+
+def build_district_clustered(aggregated: pd.DataFrame, labels: pd.DataFrame) -> pd.DataFrame:
+    missing = sorted(set(aggregated["district"]) - set(labels["district"]))
+    if missing:
+        raise ValueError(f"클러스터 라벨이 없는 자치구: {missing} — district_clustered.csv 에 "
+                         "라벨을 추가한 뒤 다시 실행하세요.")
+    return aggregated.merge(labels, on="district", how="left")
+
+
+def build_district_lookup(clustered: pd.DataFrame, partials: pd.DataFrame) -> pd.DataFrame:
+    p = partials.reindex(clustered["district"])
+    return pd.DataFrame({
+        "district": clustered["district"],
+        "cluster": clustered["cluster"],
+        "cluster_name": clustered["cluster_name"],
+        "district_median_revpar": clustered["median_revpar_ao"],
+        "district_listing_count": clustered["ao_count"],
+        "district_superhost_rate": p["ao_superhost_rate"].to_numpy(),
+        "district_entire_home_rate": p["ao_entire_home_rate"].to_numpy(),
+        "ttm_pop": clustered["median_pop"].astype(np.int64),
+    })
+
+
+def build_cluster_listings_ao(listings: pd.DataFrame, labels: pd.DataFrame) -> pd.DataFrame:
+    ao = listings[(listings["refined_status"] == "Active")
+                  & (listings["operation_status"] == "Operating")]
+    out = ao[["district", *AO_COLUMNS]].astype({"district": str})
+    out = out.merge(labels[["district", "cluster", "cluster_name"]], on="district", how="left")
+    return out[["cluster", "cluster_name", "district", *AO_COLUMNS]]
+
+
+# ── 실행기 ────────────────────────────────────────────────────────────────────
+class Pipeline:
+    """단계 실행기 — 입력 해시가 같고 출력이 그대로인 단계는 건너뜁니다.
+
+    Parameters
+    ----------
+    raw_csv       : 원본 리스팅 CSV (기본 RAW_CSV)
+    processed_dir : 출력 디렉터리 (기본 data/processed)
+    external_dir  : 외부 데이터 디렉터리 (기본 data/external)
+    force         : True 면 해시와 무관하게 전 단계 실행
+    """
+
+    def __init__(self, raw_csv=None, processed_dir=None, external_dir=None, force=False):
+        self.raw_csv = Path(raw_csv) if raw_csv else RAW_CSV
+        self.processed_dir = Path(processed_dir) if processed_dir else PROCESSED_DIR
+        self.external_dir = Path(external_dir) if external_dir else EXTERNAL_DIR
+        self.state_dir = self.processed_dir / STATE_DIRNAME
+        self.force = force
+        self.report = []          # [(stage, status, ms)]
+        self._listings = None
+        self.state = self._load_state()
+
+    # 상태 파일 ---------------------------------------------------------------
+    def _load_state(self) -> dict:
+        path = self.state_dir / "state.json"
+        if path.exists():
+            state = json.loads(path.read_text(encoding="utf-8"))
+            if state.get("version") == PIPELINE_VERSION:
+                return state
+        return {"version": PIPELINE_VERSION, "stages": {}}
+
+    def _save_state(self):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self.state_dir / "state.json"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.state, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # 입력 --------------------------------------------------------------------
+    def listings(self) -> pd.DataFrame:
+        if self._listings is None:
+            cache = CACHE_PATH if self.raw_csv == RAW_CSV else self.state_dir / "listings.parquet"
+            self._listings = load_listings(_LISTING_COLUMNS, csv_path=self.raw_csv, cache_path=cache)
+        return self._listings
+
+    def frozen_labels(self) -> pd.DataFrame:
+        path = self.processed_dir / "district_clustered.csv"
+        if not path.exists():
+            raise FileNotFoundError(f"클러스터 라벨 원본이 없습니다: {path}")
+        return pd.read_csv(path, encoding="utf-8-sig", usecols=list(_LABEL_COLUMNS))
+
+    # 단계 실행 ----------------------------------------------------------------
+    def _stage(self, name: str, inputs: dict, output: Path, build) -> str:
+        """inputs(이름 → 해시)가 지난 실행과 같고 output 해시가 그대로면 건너뜀.
+
+        build() 는 (DataFrame, 상태 문자열) 을 반환하고, 결과는 output 에 씁니다.
+        반환값은 output 파일 해시 — 하위 단계의 입력 해시로 쓰입니다.
+        """
+        key = _digest(PIPELINE_VERSION, name, json.dumps(inputs, sort_keys=True))
+        prev = self.state["stages"].get(name, {})
+        t0 = time.perf_counter()
+        if (not self.force and prev.get("inputs") == key and output.exists()
+                and _file_hash(output) == prev.get("output")):
+            self.report.append((name, "skip", (time.perf_counter() - t0) * 1000))
+            return prev["output"]
+
+        frame, status = build()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+        if output.suffix == ".parquet":
+            frame.to_parquet(tmp)
+        else:
+            frame.to_csv(tmp, index=False, encoding=_csv_encoding(output))
+        os.replace(tmp, output)
+        out_hash = _file_hash(output)
+        self.state["stages"][name] = {"inputs": key, "output": out_hash}
+        self.report.append((name, status, (time.perf_counter() - t0) * 1000))
+        return out_hash
+
+    def _run_listings(self) -> tuple[str, dict]:
+        """원본 파일 해시 → 자치구별 행 해시. 원본이 그대로면 리스팅을 읽지 않습니다."""
+        t0 = time.perf_counter()
+        fingerprint = _file_hash(self.raw_csv)
+        prev = self.state["stages"].get("listings", {})
+        if not self.force and prev.get("inputs") == fingerprint:
+            self.report.append(("listings", "skip", (time.perf_counter() - t0) * 1000))
+            return prev["output"], prev["districts"]
+        districts = district_row_hashes(self.listings())
+        out_hash = _digest(json.dumps(districts, sort_keys=True))
+        self.state["stages"]["listings"] = {"inputs": fingerprint, "output": out_hash,
+                                            "districts": districts}
+        self.report.append(("listings", "ran", (time.perf_counter() - t0) * 1000))
+        return out_hash, districts
+
+    def _build_partials(self, districts: dict, path: Path):
+        """행 해시가 바뀐 자치구만 다시 집계하고 나머지는 지난 결과를 재사용."""
+        prev = pd.read_parquet(path) if path.exists() and not self.force else None
+        if prev is not None:
+            stale = [d for d, h in districts.items()
+                     if d not in prev.index or prev.at[d, "row_hash"] != h]
+        else:
+            stale = sorted(districts)
+        listings = self.listings()
+        fresh = district_partials(listings[listings["district"].astype(str).isin(stale)])
+        fresh["row_hash"] = [districts[d] for d in fresh.index]
+        if prev is not None:
+            keep = prev.drop(index=[d for d in prev.index if d in stale or d not in districts])
+            fresh = pd.concat([keep, fresh]).sort_index()
+        status = "ran" if len(stale) == len(districts) else f"incremental {len(stale)}/{len(districts)}"
+        return fresh, status
+
+    def run(self) -> list:
+        """전 단계를 의존 순서대로 실행하고 [(stage, status, ms)] 를 반환합니다."""
+        out = self.processed_dir
+        partials_path = self.state_dir / "district_partials.parquet"
+        population_csv = self.external_dir / "monthly_population.csv"
+
+        listings_hash, districts = self._run_listings()
+        labels = self.frozen_labels()
+        labels_hash = _digest(pd.util.hash_pandas_object(labels, index=False).to_numpy().tobytes())
+
+        population_path = self.state_dir / "population.parquet"
+        h_pop = self._stage(
+            "population", {"monthly_population": _file_hash(population_csv)}, population_path,
+            lambda: (district_population(pd.read_csv(population_csv, encoding="utf-8-sig"))
+                     .to_frame(), "ran"))
+        h_part = self._stage(
+            "district_partials", {"listings": listings_hash}, partials_path,
+            lambda: self._build_partials(districts, partials_path))
+        h_agg = self._stage(
+            "district_aggregated", {"partials": h_part, "population": h_pop},
+            out / "district_aggregated.csv",
+            lambda: (build_district_aggregated(pd.read_parquet(partials_path),
+                                               pd.read_parquet(population_path)["median_pop"]), "ran"))
+        h_clu = self._stage(
+            "district_clustered", {"aggregated": h_agg, "labels": labels_hash},
+            out / "district_clustered.csv",
+            lambda: (build_district_clustered(
+                pd.read_csv(out / "district_aggregated.csv", encoding="utf-8-sig"), labels), "ran"))
+        self._stage(
+            "district_lookup", {"clustered": h_clu, "partials": h_part},
+            out / "district_lookup.csv",
+            lambda: (build_district_lookup(
+                pd.read_csv(out / "district_clustered.csv", encoding="utf-8-sig"),
+                pd.read_parquet(partials_path)), "ran"))
+        self._stage(
+            "cluster_listings_ao", {"listings": listings_hash, "labels": labels_hash},
+            out / "cluster_listings_ao.csv",
+            lambda: (build_cluster_listings_ao(self.listings(), labels), "ran"))
+
+        self._save_state()
+        return self.report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="data/processed 산출물 증분 재생성")
+    ap.add_argument("--raw", type=Path, default=None, help="원본 리스팅 CSV (기본 data/raw/...)")
+    ap.add_argument("--processed", type=Path, default=None, help="출력 디렉터리 (기본 data/processed)")
+    ap.add_argument("--external", type=Path, default=None, help="외부 데이터 디렉터리 (기본 data/external)")
+    ap.add_argument("--force", action="store_true", help="해시와 무관하게 전 단계 실행")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    report = Pipeline(args.raw, args.processed, args.external, force=args.force).run()
+    print(f"{'stage':<22} | {'status':<16} | {'ms':>8}")
+    for name, status, ms in report:
+        print(f"{name:<22} | {status:<16} | {ms:>8.1f}")
+    print(f"{'total':<22} | {'':<16} | {(time.perf_counter() - t0) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+poi_index.py — 관광지(POI) 공간 인덱스 (haversine 최근접 · 반경 내 개수)
+========================================================================
+
+data/external/seoul_tourism_all.csv (5,264개 POI, 위도·경도·관광공사 타입 코드) 위에
+균일 격자 인덱스를 만들어 최근접 POI 와 반경 내 POI 수를 구합니다. 격자는 서울 중심
+위도 기준 등장방형(equirectangular) 투영 km 좌표이고, 거리는 후보 POI 에 대해서만
+haversine 으로 정확히 계산합니다. 투영은 후보 선택에만 쓰므로 결과는 전수 비교와 같습니다.
+
+사용법:
+    from poi_index import PoiIndex, fill_poi_features
+    poi = PoiIndex.from_csv()
+    dist_km, idx = poi.nearest(37.5563, 126.9220)          # 스칼라 또는 배열
+    n_500m = poi.count_within(lats, lngs, 0.5)
+
+    # Model A 입력(nearest_poi_dist_km · poi_dist_category · nearest_poi_type_name) 채우기
+    listings = fill_poi_features(listings, poi)            # latitude_masked / longitude_masked
+    features = fill_poi_features({"latitude": 37.55, "longitude": 126.92, ...}, poi)
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent
+TOURISM_CSV = ROOT / "data" / "external" / "seoul_tourism_all.csv"
+
+EARTH_RADIUS_KM = 6371.0
+
+# 한국관광공사 contentTypeId → Model A 의 nearest_poi_type_name 값
+POI_TYPE_NAMES = {
+    12: "관광지", 14: "문화시설", 15: "축제공연행사", 25: "여행코스",
+    28: "레포츠", 32: "숙박", 38: "쇼핑", 39: "음식점",
+}
+
+# 좌표 결측(0, 0)·오입력 POI 를 거르는 범위 — 서울과 인접 경계
+_BOUNDS_LAT = (37.2, 37.9)
+_BOUNDS_LNG = (126.6, 127.4)
+
+# 투영 km 와 haversine km 의 차이(서울 범위 0.5% 미만)를 덮는 여유
+_PROJ_SLACK = 0.98
+
+# 최근접 탐색 고리 상한 — 그 밖의 외곽 질의는 전수 비교 (한 번에 _BRUTE_PAIRS 쌍씩)
+_MAX_RINGS = 6
+_BRUTE_PAIRS = 4_000_000
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표(도) 사이 대권 거리 (km). 배열이면 원소별."""
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    a = (np.sin((p2 - p1) / 2) ** 2
+         + np.cos(p1) * np.cos(p2) * np.sin(np.radians(np.subtract(lng2, lng1)) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def poi_dist_category(km):
+    """훈련 데이터 기준: 초근접(<0.2) | 근접(0.2-0.5) | 보통(0.5-1.0) | 원거리(1.0+). 배열도 가능.
+
+    거리가 NaN(좌표 결측)이면 None — 인코더가 미지 범주(-1)로 보내 결측 기본값이 적용됩니다.
+    """
+    cats = np.array(["초근접", "근접", "보통", "원거리", None], dtype=object)
+    x = np.asarray(km, dtype=np.float64)
+    pos = np.where(np.isnan(x), len(cats) - 1, np.searchsorted([0.2, 0.5, 1.0], x, side="right"))
+    return cats[pos] if x.ndim else cats[int(pos)]
+
+
+def _hav_a(phi1, lam1, cos1, phi2, lam2, cos2):
+    """haversine 의 a 항 (라디안 입력) — 거리 2R·asin(√a) 와 순서가 같아 비교에 그대로 씀."""
+    return np.sin((phi2 - phi1) * 0.5) ** 2 + cos1 * cos2 * np.sin((lam2 - lam1) * 0.5) ** 2
+
+
+def _a_to_km(a):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class PoiIndex:
+    """POI 균일 격자 인덱스 (CSR — 셀 순으로 정렬한 POI + 셀 시작 위치).
+
+    Parameters
+    ----------
+    lat, lng : POI 위도·경도 (도)
+    types    : POI 타입 이름 (nearest_poi_type_name 값)
+    names    : POI 이름 (선택)
+    cell_km  : 격자 셀 한 변 길이 (km). 도심 밀집 셀의 POI 수와 외곽 탐색 고리 수의 절충
+    """
+
+    __slots__ = ("lat", "lng", "types", "names", "cell_km",
+                 "_phi", "_lam", "_cos", "_lat0", "_x0", "_y0", "_nx", "_ny", "_order", "_start")
+
+    def __init__(self, lat, lng, types, names=None, cell_km: float = 0.3):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.types = np.asarray(types, dtype=object)
+        self.names = np.asarray(names if names is not None else [""] * len(self.lat), dtype=object)
+        self.cell_km = float(cell_km)
+
+        self._lat0 = np.radians(self.lat.mean()) if len(self.lat) else 0.0
+        x, y = self._project(self.lat, self.lng)
+        self._x0, self._y0 = (x.min(), y.min()) if len(x) else (0.0, 0.0)
+        cx, cy = self._cell_xy(x, y)
+        self._nx = int(cx.max()) + 1 if len(cx) else 1
+        self._ny = int(cy.max()) + 1 if len(cy) else 1
+        cell = cy * self._nx + cx
+        self._order = np.argsort(cell, kind="stable")
+        self._start = np.searchsorted(cell[self._order], np.arange(self._nx * self._ny + 1))
+        # 셀 순서로 재배열한 라디안 좌표 — 후보 쌍 계산에서 연속 접근
+        self._phi = np.radians(self.lat)[self._order]
+        self._lam = np.radians(self.lng)[self._order]
+        self._cos = np.cos(self._phi)
+
+    @classmethod
+    def from_csv(cls, path: str | Path | None = None, cell_km: float = 0.3) -> "PoiIndex":
+        """seoul_tourism_all.csv → PoiIndex. 좌표가 서울 범위를 벗어난 POI 는 제외합니다."""
+        df = pd.read_csv(path or TOURISM_CSV, encoding="utf-8-sig")
+        ok = (df["위도"].between(*_BOUNDS_LAT) & df["경도"].between(*_BOUNDS_LNG)).to_numpy()
+        df = df[ok]
+        types = df["타입"].map(POI_TYPE_NAMES).fillna("관광지")
+        return cls(df["위도"], df["경도"], types, df["관광지명"], cell_km=cell_km)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # 투영 / 격자 ---------------------------------------------------------------
+    def _project(self, lat, lng):
+        x = EARTH_RADIUS_KM * np.cos(self._lat0) * np.radians(lng)
+        y = EARTH_RADIUS_KM * np.radians(lat)
+        return x, y
+
+    def _cell_xy(self, x, y):
+        return (np.floor((x - self._x0) / self.cell_km).astype(np.int64),
+                np.floor((y - self._y0) / self.cell_km).astype(np.int64))
+
+    def _locate(self, lat, lng):
+        """질의 좌표 → (셀 x, 셀 y, 격자 안 여부)."""
+        cx, cy = self._cell_xy(*self._project(lat, lng))
+        inside = (cx >= 0) & (cx < self._nx) & (cy >= 0) & (cy < self._ny)
+        return cx, cy, inside
+
+    def _cell_pairs(self, qi, cx, cy, dx, dy):
+        """질의 qi 의 셀에서 (dx, dy) 떨어진 셀의 후보 쌍.
+
+        Returns (질의, 정렬 위치, 질의별 후보 수) — 쌍은 질의 순서대로 연속입니다.
+        """
+        x, y = cx + dx, cy + dy
+        ok = (x >= 0) & (x < self._nx) & (y >= 0) & (y < self._ny)
+        cell = y[ok] * self._nx + x[ok]
+        start = self._start[cell]
+        counts = self._start[cell + 1] - start
+        has = counts > 0
+        qi, start, counts = qi[ok][has], start[has], counts[has]
+        total = int(counts.sum())
+        first = np.cumsum(counts) - counts
+        pos = np.arange(total) - np.repeat(first - start, counts)
+        return qi, pos, counts
+
+    @staticmethod
+    def _ring(r: int):
+        if r == 0:
+            return [(0, 0)]
+        return [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)
+                if max(abs(dx), abs(dy)) == r]
+
+    # 질의 ---------------------------------------------------------------------
+    def nearest(self, lat, lng):
+        """최근접 POI 의 (haversine 거리 km, POI 위치). 스칼라 입력이면 스칼라 반환.
+
+        격자 고리를 한 칸씩 넓히며, 찾은 최단 거리가 아직 보지 않은 셀까지의
+        최소 거리보다 짧아지면 그 질의는 확정합니다. 격자 밖이거나 _MAX_RINGS
+        고리 안에서 확정되지 않은 외곽 질의는 전수 비교.
+        """
+        scalar = np.ndim(lat) == 0
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        n = len(lat)
+        best = np.full(n, np.inf)            # haversine a 항
+        arg = np.zeros(n, dtype=np.int64)    # 셀 순 정렬 위치
+        if len(self) == 0:
+            return (np.inf, -1) if scalar else (best, np.full(n, -1))
+
+        phi, lam = np.radians(lat), np.radians(lng)
+        cos = np.cos(phi)
+        cx, cy, inside = self._locate(lat, lng)
+
+        todo = np.flatnonzero(inside)
+        for r in range(_MAX_RINGS + 1):
+            if not len(todo):
+                break
+            for dx, dy in self._ring(r):
+                qi, pos, counts = self._cell_pairs(todo, cx[todo], cy[todo], dx, dy)
+                if not len(qi):
+                    continue
+                qr = np.repeat(qi, counts)
+                a = _hav_a(phi[qr], lam[qr], cos[qr], self._phi[pos], self._lam[pos], self._cos[pos])
+                seg = np.cumsum(counts) - counts
+                amin = np.minimum.reduceat(a, seg)
+                # 셀 안에서 a 가 최소인 첫 후보 (셀 내부는 원래 POI 순서)
+                hit = np.flatnonzero(a == np.repeat(amin, counts))
+                owner = np.repeat(np.arange(len(qi)), counts)[hit]
+                pmin = pos[hit[np.r_[True, owner[1:] != owner[:-1]]]]
+                better = amin < best[qi]
+                best[qi[better]], arg[qi[better]] = amin[better], pmin[better]
+            # 고리 r 까지 본 질의는 투영 거리 r·cell_km 안쪽이 전부 탐색됨
+            reach = np.sin(r * self.cell_km * _PROJ_SLACK / (2 * EARTH_RADIUS_KM)) ** 2
+            todo = todo[best[todo] > reach]
+
+        # 격자 밖 + 고리 _MAX_RINGS 안에서 확정되지 않은 외곽 질의는 전수 비교
+        rest = np.concatenate([np.flatnonzero(~inside), todo])
+        for chunk in np.array_split(rest, max(1, len(rest) * len(self) // _BRUTE_PAIRS + 1)):
+            if not len(chunk):
+                continue
+            a = _hav_a(phi[chunk, None], lam[chunk, None], cos[chunk, None],
+                       self._phi[None, :], self._lam[None, :], self._cos[None, :])
+            arg[chunk] = np.argmin(a, axis=1)
+            best[chunk] = a[np.arange(len(chunk)), arg[chunk]]
+        dist, idx = _a_to_km(best), self._order[arg]
+        return (float(dist[0]), int(idx[0])) if scalar else (dist, idx)
+
+    def count_within(self, lat, lng, radius_km: float):
+        """각 질의 좌표에서 haversine radius_km 이내 POI 수. 스칼라 입력이면 int."""
+        scalar = np.ndim(lat) == 0
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        counts = np.zeros(len(lat), dtype=np.int64)
+        phi, lam = np.radians(lat), np.radians(lng)
+        cos = np.cos(phi)
+        a_max = np.sin(radius_km / (2 * EARTH_RADIUS_KM)) ** 2
+
+        cx, cy, inside = self._locate(lat, lng)
+        for q in np.flatnonzero(~inside):
+            counts[q] = int((_hav_a(phi[q], lam[q], cos[q], self._phi, self._lam, self._cos)
+                             <= a_max).sum())
+
+        todo = np.flatnonzero(inside)
+        reach = int(np.ceil(radius_km / (self.cell_km * _PROJ_SLACK)))
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                qi, pos, n = self._cell_pairs(todo, cx[todo], cy[todo], dx, dy)
+                if not len(qi):
+                    continue
+                qr = np.repeat(qi, n)
+                hit = _hav_a(phi[qr], lam[qr], cos[qr],
+                             self._phi[pos], self._lam[pos], self._cos[pos]) <= a_max
+                counts += np.bincount(qr[hit], minlength=len(lat))
+        return int(counts[0]) if scalar else counts
+
+    def features(self, lat, lng) -> pd.DataFrame:
+        """좌표 배열 → Model A POI 입력 + 최근접 POI 이름 + 500m 이내 POI 수."""
+        lat, lng = np.atleast_1d(lat), np.atleast_1d(lng)
+        dist, idx = self.nearest(lat, lng)
+        return pd.DataFrame({
+            "nearest_poi_dist_km": dist,
+            "poi_dist_category": poi_dist_category(dist),
+            "nearest_poi_type_name": self.types[idx],
+            "nearest_poi_name": self.names[idx],
+            "poi_count_500m": self.count_within(lat, lng, 0.5),
+        })
+
+
+def fill_poi_features(listings, index: PoiIndex, lat_col: str = "latitude_masked",
+                      lng_col: str = "longitude_masked"):
+    """좌표로 Model A 의 POI 입력 3개를 채웁니다.
+
+    Parameters
+    ----------
+    listings : pd.DataFrame (lat_col / lng_col 컬럼) 또는 listing_features dict
+               (dict 는 "latitude" / "longitude" 키도 허용)
+    index    : PoiIndex
+
+    Returns
+    -------
+    같은 타입의 사본 — nearest_poi_dist_km · poi_dist_category · nearest_poi_type_name
+    이 좌표 기준 값으로 설정됨. DataFrame 은 좌표가 NaN 인 행의 기존 값을 유지합니다.
+    """
+    cols = ["nearest_poi_dist_km", "poi_dist_category", "nearest_poi_type_name"]
+    if isinstance(listings, dict):
+        lat = listings.get(lat_col, listings.get("latitude"))
+        lng = listings.get(lng_col, listings.get("longitude"))
+        if lat is None or lng is None:
+            return dict(listings)
+        row = index.features(lat, lng).iloc[0]
+        return {**listings, **{c: row[c].item() if hasattr(row[c], "item") else row[c]
+                               for c in cols}}
+
+    out = listings.copy()
+    ok = (listings[lat_col].notna() & listings[lng_col].notna()).to_numpy()
+    feats = index.features(listings[lat_col].to_numpy(np.float64)[ok],
+                           listings[lng_col].to_numpy(np.float64)[ok])
+    for c in cols:
+        if c not in out.columns:
+            out[c] = np.nan if c == "nearest_poi_dist_km" else None
+        if out[c].dtype == "category":
+            out[c] = out[c].astype(object)
+        out.loc[ok, c] = feats[c].to_numpy()
+    return out
@@ -3,11 +3,20 @@ predict_utils.py — 서울 에어비앤비 RevPAR 예측 헬퍼
 =====================================================
 
 사용법:
-    from predict_utils import load_models, predict_revpar
+    from predict_utils import load_models, predict_revpar, predict_revpar_batch, simulate_price_curve
 
     artifacts = load_models()               # models/ 폴더에서 pkl 일괄 로드
     result = predict_revpar(listing, 500_000, **artifacts)
 
+    # 포트폴리오 일괄 스코어링 (DataFrame 1행 = 리스팅 1개)
+    batch = predict_revpar_batch(listings_df, opex_array, **artifacts)
+
+    # 요금 변경 시뮬레이션 (Model B 를 요금 그리드 전체에 1회 호출)
+    curve = simulate_price_curve(listing, 500_000, adr_bounds=(q1, q3), **artifacts)
+
+    # models/conformal.json (python conformal.py) 이 있으면 artifacts["conformal"] 로 로드되어
+    # 결과에 80% 예측 구간 ADR_lo/hi, Occ_lo/hi, RevPAR_lo/hi, net_profit_lo/hi 가 붙음
+
 입력 dict (listing_features) 구조:
     필수 — Model A (ADR):
         cluster                 : int   (0~3)
@@ -37,18 +46,18 @@ predict_utils.py — 서울 에어비앤비 RevPAR 예측 헬퍼
                                         # <14장|14-22|23-35(최적)|36+
         is_active_operating     : int   (0/1)
 
-    선택 — 자치구 내 상대적 경쟁력 (없으면 1.0으로 자동 설정):
+    선택 — 자치구 내 상대적 경쟁력 (없거나 None/NaN이면 1.0으로 자동 설정):
         photos_rel_dist         : float (내 사진수 / 자치구 평균)
         rating_rel_dist         : float (내 평점 / 자치구 평균)
         reviews_rel_dist        : float (내 리뷰수 / 자치구 평균)
         min_nights_rel_dist     : float (내 최소박 / 자치구 평균)
 
-    선택 — revpar_trend 계산용 (없으면 None 반환):
+    선택 — revpar_trend 계산용 (없거나 None/NaN이면 None 반환):
         ttm_revpar              : float (TTM RevPAR, 원)
         l90d_revpar             : float (최근 90일 RevPAR, 원)
 
     선택:
-        ttm_avg_rate            : float (TTM 평균 ADR, 없으면 ADR 예측값 사용)
+        ttm_avg_rate            : float (TTM 평균 ADR, 없거나 None/NaN이면 ADR 예측값 사용)
 
 revpar_trend 해석 기준:
     > 0.1   → "최근 성과 상승 중"   (green)
@@ -57,11 +66,16 @@ revpar_trend 해석 기준:
 """
 
 from pathlib import Path
+import hashlib
 import numpy as np
 import pandas as pd
-import joblib
 import json
 
+from tree_engine import FlatTreeEnsemble, load_flat_model
+# 1~4단계가 pandas 없이 읽도록 benchmark_table.py 로 옮김 — 기존 import 경로 유지
+from benchmark_table import BenchmarkCell, BenchmarkIndex  # noqa: F401
+from conformal import CONFORMAL_FILE, ConformalTable, load_conformal
+
 _MODELS_DIR = Path(__file__).parent / "models"
 
 _REL_DIST_COLS = [
@@ -72,14 +86,180 @@ _REL_DIST_COLS = [
 ]
 
 
-def load_models(models_dir: str | Path | None = None) -> dict:
+class CategoryTable:
+    """LabelEncoder 1개를 미리 컴파일한 카테고리 → 정수 코드 룩업 테이블.
+
+    classes 는 LabelEncoder.classes_ 와 같은 정렬 순서이므로 코드 값도 동일합니다.
+    학습 때 보지 못한 라벨은 행 단위로 -1 (LightGBM handles gracefully).
+    """
+
+    __slots__ = ("classes", "index")
+
+    def __init__(self, classes):
+        self.classes = np.asarray(classes, dtype=str)
+        self.index = {label: code for code, label in enumerate(self.classes.tolist())}
+
+    def encode_one(self, value) -> int:
+        return self.index.get(str(value), -1)
+
+    def encode(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=object).astype(str)
+        pos = np.minimum(np.searchsorted(self.classes, values), len(self.classes) - 1)
+        return np.where(self.classes[pos] == values, pos, -1).astype(np.int64)
+
+
+def compile_encoders(encoders: dict, categorical_cols: list[str] | None = None) -> dict:
+    """encoders.pkl 의 LabelEncoder dict → {컬럼: CategoryTable}.
+
+    categorical_cols(feature_config.json) 가 주어지면 그 순서·범위로 컴파일합니다.
+    이미 CategoryTable 인 값은 그대로 둡니다.
+    """
+    cols = categorical_cols if categorical_cols is not None else list(encoders)
+    missing = [c for c in cols if c not in encoders]
+    if missing:
+        raise KeyError(f"encoders.pkl 에 인코더가 없는 categorical_cols: {missing}")
+    return {
+        col: enc if isinstance(enc, CategoryTable) else CategoryTable(enc.classes_)
+        for col, enc in ((c, encoders[c]) for c in cols)
+    }
+
+
+_ENGINES = ("lightgbm", "numpy")
+
+
+class IsotonicTable:
+    """IsotonicRegression 을 X/Y 브레이크포인트 배열로 옮긴 RevPAR 보정 테이블.
+
+    out_of_bounds='clip' 이면 [x_min, x_max] 로 자른 뒤 선형 보간하므로
+    sklearn predict() 와 같은 값을 반환합니다 (check_isotonic_parity 로 검증).
+    'nan' 은 범위 밖을 NaN 으로, 'raise' 는 sklearn 처럼 범위 밖(또는 NaN) 입력에 ValueError.
+    sklearn 입력 검증을 거치지 않아 단일 값 보정이 수 µs 입니다.
+    """
+
+    __slots__ = ("x", "y", "x_min", "x_max", "out_of_bounds")
+
+    def __init__(self, x, y, x_min: float, x_max: float, out_of_bounds: str = "clip"):
+        if out_of_bounds not in ("clip", "nan", "raise"):
+            raise ValueError(f"out_of_bounds 는 'clip' | 'nan' | 'raise' 중 하나여야 합니다: {out_of_bounds!r}")
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.x_min = float(x_min)
+        self.x_max = float(x_max)
+        self.out_of_bounds = out_of_bounds
+
+    @classmethod
+    def from_sklearn(cls, iso_reg) -> "IsotonicTable":
+        return cls(iso_reg.X_thresholds_, iso_reg.y_thresholds_,
+                   iso_reg.X_min_, iso_reg.X_max_, iso_reg.out_of_bounds)
+
+    def predict_one(self, value: float) -> float:
+        """스칼라 1개 보정 (predict_revpar 경로)."""
+        v = float(value)
+        if self.out_of_bounds == "clip":
+            v = min(max(v, self.x_min), self.x_max)
+        elif not self.x_min <= v <= self.x_max:
+            if self.out_of_bounds == "raise":
+                raise ValueError(f"보정 입력 {v} 가 범위 [{self.x_min}, {self.x_max}] 밖입니다.")
+            return float("nan")
+        return float(np.interp(v, self.x, self.y))
+
+    def predict(self, T) -> np.ndarray:
+        """배열(또는 스칼라) 보정 — iso_reg.predict(T) 와 같은 float64 배열."""
+        T = np.asarray(T, dtype=np.float64)
+        if self.out_of_bounds == "clip":
+            return np.interp(np.clip(T, self.x_min, self.x_max), self.x, self.y)
+        if self.out_of_bounds == "raise":
+            outside = ~((T >= self.x_min) & (T <= self.x_max))
+            if outside.any():
+                v = float(T[outside].flat[0])
+                raise ValueError(f"보정 입력 {v} 가 범위 [{self.x_min}, {self.x_max}] 밖입니다.")
+            return np.interp(T, self.x, self.y)
+        return np.interp(T, self.x, self.y, left=np.nan, right=np.nan)
+
+
+def check_isotonic_parity(iso_reg, table: IsotonicTable | None = None,
+                          n_random: int = 100_000, seed: int = 0) -> float:
+    """sklearn IsotonicRegression 과 IsotonicTable 예측의 최대 절대 오차를 반환합니다.
+
+    모든 브레이크포인트와 그 ±1ulp, 구간 중점, 범위 밖 값, 임의값으로 검사하고
+    predict() 와 predict_one() 을 모두 확인합니다. out_of_bounds='raise' 이면 범위 안 값만
+    비교하고, 범위 밖 값에는 양쪽 모두 ValueError 인지 확인합니다 (아니면 inf).
+    """
+    table = table if table is not None else IsotonicTable.from_sklearn(iso_reg)
+    x = table.x
+    span = table.x_max - table.x_min
+    rng = np.random.default_rng(seed)
+    probe = np.concatenate([
+        x, np.nextafter(x, np.inf), np.nextafter(x, -np.inf), (x[:-1] + x[1:]) / 2,
+        [table.x_min - 1.0, table.x_max + 1.0, table.x_min - 1e3 * span,
+         table.x_max + 1e3 * span, 0.0, -1.0],
+        rng.uniform(table.x_min - 0.1 * span, table.x_max + 0.1 * span, n_random),
+    ])
+    if table.out_of_bounds == "raise":
+        outside = (probe < table.x_min) | (probe > table.x_max)
+        for fn in (iso_reg.predict, table.predict, lambda t: table.predict_one(t[0])):
+            try:
+                fn(probe[outside][:1])
+                return float("inf")
+            except ValueError:
+                pass
+        probe = probe[~outside]
+    expected = np.asarray(iso_reg.predict(probe), dtype=np.float64)
+    err = float(np.max(np.abs(expected - table.predict(probe))))
+    scalar = np.array([table.predict_one(v) for v in probe[: 4 * len(x) + 6]])
+    return max(err, float(np.max(np.abs(expected[: len(scalar)] - scalar))))
+
+
+def _load_tree_model(d: Path, name: str, engine: str):
+    """engine='lightgbm' → LGBMRegressor, 'numpy' → FlatTreeEnsemble."""
+    import joblib
+
+    if engine == "lightgbm":
+        return joblib.load(d / f"{name}.pkl")
+    # npz 는 기록된 pkl 해시가 어긋나면(재학습) pkl 에서 다시 평탄화됩니다
+    return load_flat_model(d, name)
+
+
+def load_models(
+    models_dir: str | Path | None = None,
+    *,
+    engine: str | None = None,
+    fmt: str = "pickle",
+) -> dict:
     """models/ 폴더에서 pkl 파일을 일괄 로드합니다.
 
+    encoders.pkl 의 LabelEncoder 는 CategoryTable 로, iso_reg.pkl 의
+    IsotonicRegression 은 IsotonicTable 로 로드 시 변환되므로 예측 경로에서는
+    sklearn 을 호출하지 않습니다.
+
+    Parameters
+    ----------
+    models_dir : 모델 폴더 (기본: 이 파일 옆 models/)
+    engine : 'lightgbm' | 'numpy' | None
+        'numpy' 이면 model_A/model_B 를 tree_engine.FlatTreeEnsemble 로 로드합니다.
+        model_a.npz / model_b.npz (python tree_engine.py 로 export) 가 있고 기록된
+        pkl 해시가 현재 pkl 과 같으면 lightgbm 없이 동작하고, 없거나 어긋나면
+        pkl 을 읽어 즉석에서 평탄화합니다 (tree_engine.load_flat_model).
+        None 이면 fmt='pickle' → 'lightgbm', fmt='bundle' → 'numpy'.
+    fmt : 'pickle' | 'bundle'
+        'bundle' 이면 models/bundle/ (python model_bundle.py 로 변환) 을
+        np.load(mmap_mode='r') 로 매핑합니다. pkl·joblib·sklearn 을 읽지 않아
+        콜드 스타트가 빠르고, 같은 호스트의 워커 프로세스끼리 페이지를 공유합니다.
+        이 경우 engine 은 'numpy' 만 가능합니다.
+
     Returns
     -------
     dict with keys:
-        model_A, model_B, iso_reg, encoders, feature_config
+        model_A, model_B, iso_reg, encoders, feature_config, conformal
+        (iso_reg = IsotonicTable, encoders = {categorical_col: CategoryTable},
+         conformal = ConformalTable — conformal.json 이 없으면 None)
     """
+    if fmt not in ("pickle", "bundle"):
+        raise ValueError(f"fmt 는 'pickle' | 'bundle' 중 하나여야 합니다: {fmt!r}")
+    if engine is None:
+        engine = "numpy" if fmt == "bundle" else "lightgbm"
+    if engine not in _ENGINES:
+        raise ValueError(f"engine 은 {_ENGINES} 중 하나여야 합니다: {engine!r}")
     d = Path(models_dir) if models_dir else _MODELS_DIR
     if not d.exists():
         raise FileNotFoundError(
@@ -87,23 +267,95 @@ def load_models(models_dir: str | Path | None = None) -> dict:
             "notebooks/07_cluster_modeling.ipynb 마지막 셀을 실행해 pkl을 생성하세요."
         )
 
-    model_A = joblib.load(d / "model_a.pkl")
-    model_B = joblib.load(d / "model_b.pkl")
-    iso_reg = joblib.load(d / "iso_reg.pkl")
-    encoders = joblib.load(d / "encoders.pkl")
+    if fmt == "bundle":
+        if engine != "numpy":
+            raise ValueError("fmt='bundle' 은 engine='numpy' 만 지원합니다.")
+        from model_bundle import load_bundle
+        return load_bundle(d / "bundle")
+
+    import joblib
+
+    model_A = _load_tree_model(d, "model_a", engine)
+    model_B = _load_tree_model(d, "model_b", engine)
+    iso_reg = IsotonicTable.from_sklearn(joblib.load(d / "iso_reg.pkl"))
 
     with open(d / "feature_config.json", encoding="utf-8") as f:
         feature_config = json.load(f)
 
+    encoders = compile_encoders(
+        joblib.load(d / "encoders.pkl"), feature_config.get("categorical_cols")
+    )
+
     return dict(
         model_A=model_A,
         model_B=model_B,
         iso_reg=iso_reg,
         encoders=encoders,
         feature_config=feature_config,
+        conformal=load_conformal(d),
     )
 
 
+def models_version(models_dir: str | Path | None = None, *, fmt: str = "pickle") -> str:
+    """load_models(models_dir, fmt=fmt) 가 읽을 아티팩트의 버전 문자열.
+
+    fmt='bundle' 이면 manifest.json 의 checksum, 'pickle' 이면 pkl·npz·feature_config.json
+    (+ conformal.json) 내용의 sha256 입니다. 모델 파일을 바꾸면 값이 달라지므로 예측 캐시 키에 씁니다.
+    """
+    d = Path(models_dir) if models_dir else _MODELS_DIR
+    if fmt == "bundle":
+        from model_bundle import read_manifest
+        return f"bundle:{read_manifest(d / 'bundle')['checksum']}"
+    if fmt != "pickle":
+        raise ValueError(f"fmt 는 'pickle' | 'bundle' 중 하나여야 합니다: {fmt!r}")
+    if not (d / "feature_config.json").exists():
+        raise FileNotFoundError(f"models/ 폴더를 찾을 수 없습니다: {d}")
+    files = sorted([*d.glob("*.pkl"), *d.glob("*.npz"), d / "feature_config.json",
+                    *d.glob(CONFORMAL_FILE)])
+
+    h = hashlib.sha256()
+    for p in files:
+        h.update(p.name.encode())
+        h.update(p.read_bytes())
+    return f"pickle:{h.hexdigest()}"
+
+
+def _model_input(model, X: np.ndarray, columns: list[str]):
+    """FlatTreeEnsemble 에는 ndarray 그대로, LightGBM 래퍼에는 학습 때와 같은 컬럼명의 DataFrame."""
+    if isinstance(model, FlatTreeEnsemble):
+        return X
+    return pd.DataFrame(X, columns=columns)
+
+
+def _column_stack(cols: dict, names: list[str], n: int) -> np.ndarray:
+    """{컬럼: 1-D 배열} → (n, len(names)) float64 피처 행렬."""
+    X = np.empty((n, len(names)), dtype=np.float64)
+    for j, c in enumerate(names):
+        X[:, j] = cols[c]
+    return X
+
+
+def _missing(value) -> bool:
+    """None 또는 NaN — 배치 경로(pd.isna)와 같은 결측 기준."""
+    return value is None or (isinstance(value, (float, np.floating)) and np.isnan(value))
+
+
+def _encode_listing(listing_features: dict, encoders: dict) -> dict:
+    """단일 리스팅 피처 dict 복사본에 카테고리 인코딩 + rel_dist 기본값을 적용합니다."""
+    feats = dict(listing_features)
+
+    # ── 카테고리 인코딩 ─────────────────────────────────────────────────────
+    for col, table in compile_encoders(encoders).items():
+        if col in feats:
+            feats[col] = table.encode_one(feats[col])  # unseen → -1
+
+    # ── rel_dist 컬럼 기본값 (자치구 평균 = 1.0) ────────────────────────────
+    for col in _REL_DIST_COLS:
+        if _missing(feats.get(col)):
+            feats[col] = 1.0
+    return feats
+
+
 def predict_revpar(
     listing_features: dict,
     opex_per_month: float,
@@ -113,6 +365,7 @@ def predict_revpar(
     iso_reg,
     encoders: dict,
     feature_config: dict,
+    conformal: ConformalTable | None = None,
 ) -> dict:
     """단일 리스팅 RevPAR 예측 + 순이익 계산.
 
@@ -135,46 +388,40 @@ def predict_revpar(
         net_profit       : float  — 월 순이익 = revenue - opex (원)
         revpar_trend     : float | None  — 모멘텀 지표 (ttm/l90d 입력 시)
         trend_label      : str | None    — '상승'|'안정'|'하락'
+      conformal 이 있으면 추가로 (conformal.py, 클러스터별 1-α 예측 구간):
+        ADR_lo, ADR_hi, Occ_lo, Occ_hi, RevPAR_lo, RevPAR_hi : float
+        net_profit_lo, net_profit_hi : float — RevPAR_lo/hi × 30 - opex
     """
     FEATURES_A = feature_config["FEATURES_A"]
     FEATURES_B_BASE = feature_config["FEATURES_B_BASE"]
 
-    row = pd.DataFrame([listing_features])
-
-    # ── 카테고리 인코딩 ─────────────────────────────────────────────────────
-    for col, le in encoders.items():
-        if col in row.columns:
-            try:
-                row[col] = le.transform(row[col].astype(str))
-            except ValueError:
-                row[col] = -1  # unseen label → -1 (LightGBM handles gracefully)
-
-    # ── rel_dist 컬럼 기본값 (자치구 평균 = 1.0) ────────────────────────────
-    for col in _REL_DIST_COLS:
-        if col not in row.columns:
-            row[col] = 1.0
+    feats = _encode_listing(listing_features, encoders)
 
     # ── Model A: ADR 예측 ────────────────────────────────────────────────────
-    adr_pred = float(np.expm1(model_A.predict(row[FEATURES_A])[0]))
+    X_a = np.array([[feats[c] for c in FEATURES_A]], dtype=np.float64)
+    adr_pred = float(np.expm1(model_A.predict(_model_input(model_A, X_a, FEATURES_A))[0]))
 
     # ── price_gap: 현재 호스트 ADR과 시장 적정 ADR의 차이 ───────────────────
-    ttm_avg_rate = listing_features.get("ttm_avg_rate", adr_pred)
+    ttm_avg_rate = listing_features.get("ttm_avg_rate")
+    if _missing(ttm_avg_rate):
+        ttm_avg_rate = adr_pred
     price_gap = ttm_avg_rate - adr_pred
 
     # ── Model B: Occupancy 예측 ──────────────────────────────────────────────
-    X_b = row[FEATURES_B_BASE].copy()
-    X_b["price_gap_oof"] = price_gap
-    occ_pred = float(np.clip(model_B.predict(X_b)[0], 0, 1))
+    X_b = np.array([[feats[c] for c in FEATURES_B_BASE] + [price_gap]], dtype=np.float64)
+    occ_pred = float(np.clip(
+        model_B.predict(_model_input(model_B, X_b, FEATURES_B_BASE + ["price_gap_oof"]))[0], 0, 1
+    ))
 
     # ── RevPAR 통합 & Isotonic 보정 ─────────────────────────────────────────
     revpar_raw = adr_pred * occ_pred
-    revpar_cal = float(iso_reg.predict([revpar_raw])[0])
+    revpar_cal = iso_reg.predict_one(revpar_raw)
 
     # ── revpar_trend 계산 (입력값 있을 때만) ────────────────────────────────
     ttm_revpar = listing_features.get("ttm_revpar")
     l90d_revpar = listing_features.get("l90d_revpar")
 
-    if ttm_revpar is not None and l90d_revpar is not None:
+    if not _missing(ttm_revpar) and not _missing(l90d_revpar):
         revpar_trend = (l90d_revpar - ttm_revpar / 4) / (ttm_revpar / 4 + 1e-6)
         if revpar_trend > 0.1:
             trend_label = "상승"
@@ -186,7 +433,7 @@ def predict_revpar(
         revpar_trend = None
         trend_label = None
 
-    return {
+    result = {
         "ADR_pred": adr_pred,
         "Occ_pred": occ_pred,
         "RevPAR_pred": revpar_cal,
@@ -196,6 +443,391 @@ def predict_revpar(
         "trend_label": trend_label,
     }
 
+    # ── 예측 구간 (conformal.json 이 있을 때만) ─────────────────────────────
+    if conformal is not None:
+        result.update(conformal.bounds_one(listing_features.get("cluster"), adr_pred, occ_pred, revpar_cal))
+        result["net_profit_lo"] = result["RevPAR_lo"] * 30 - opex_per_month
+        result["net_profit_hi"] = result["RevPAR_hi"] * 30 - opex_per_month
+    return result
+
+
+def batch_model_inputs(listings: pd.DataFrame, *, model_A, encoders: dict,
+                       feature_config: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """predict_revpar_batch() 의 모델 입력 행렬 (X_a, X_b, adr_pred).
+
+    X_a 는 FEATURES_A, X_b 는 FEATURES_B_BASE + price_gap_oof 순서의 float64 행렬입니다.
+    price_gap_oof 가 ADR 예측값에 의존하므로 Model A 를 한 번 실행합니다.
+    explain.py 가 같은 입력으로 피처 기여도를 계산할 때도 씁니다.
+    """
+    FEATURES_A = feature_config["FEATURES_A"]
+    FEATURES_B_BASE = feature_config["FEATURES_B_BASE"]
+
+    n = len(listings)
+    cols = {c: listings[c].to_numpy() for c in dict.fromkeys(FEATURES_A + FEATURES_B_BASE)
+            if c in listings.columns}
+
+    # ── 카테고리 인코딩 (행 단위 unseen → -1) ──────────────────────────────
+    for col, table in compile_encoders(encoders).items():
+        if col in cols:
+            cols[col] = table.encode(cols[col])
+
+    # ── rel_dist 컬럼 기본값 (자치구 평균 = 1.0) ────────────────────────────
+    for col in _REL_DIST_COLS:
+        if col in cols:
+            cols[col] = np.where(pd.isna(cols[col]), 1.0, cols[col])
+        else:
+            cols[col] = np.ones(n)
+
+    # ── Model A: ADR 예측 ────────────────────────────────────────────────────
+    X_a = _column_stack(cols, FEATURES_A, n)
+    adr_pred = np.expm1(model_A.predict(_model_input(model_A, X_a, FEATURES_A)))
+
+    # ── price_gap: 현재 호스트 ADR과 시장 적정 ADR의 차이 ───────────────────
+    if "ttm_avg_rate" in listings.columns:
+        ttm_avg_rate = listings["ttm_avg_rate"].to_numpy(dtype=float)
+        ttm_avg_rate = np.where(np.isnan(ttm_avg_rate), adr_pred, ttm_avg_rate)
+    else:
+        ttm_avg_rate = adr_pred
+    price_gap = ttm_avg_rate - adr_pred
+
+    X_b = np.column_stack([_column_stack(cols, FEATURES_B_BASE, n), price_gap])
+    return X_a, X_b, adr_pred
+
+
+def predict_revpar_batch(
+    listings,
+    opex_per_month,
+    *,
+    model_A,
+    model_B,
+    iso_reg,
+    encoders: dict,
+    feature_config: dict,
+    conformal: ConformalTable | None = None,
+) -> pd.DataFrame:
+    """여러 리스팅 RevPAR 일괄 예측 + 순이익 계산.
+
+    predict_revpar()를 행마다 호출한 것과 같은 값을 반환하지만, 인코딩 ·
+    price_gap_oof · clip · Isotonic 보정을 배치 전체에 대해 한 번씩만 수행합니다.
+
+    Parameters
+    ----------
+    listings : pd.DataFrame | pyarrow.Table
+        1행 = 리스팅 1개. 컬럼 구성은 predict_revpar()의 listing_features와 동일.
+        선택 컬럼(rel_dist, ttm_avg_rate, ttm_revpar, l90d_revpar)은 없거나
+        None/NaN이면 단일 예측과 같은 기본값이 적용됩니다 (_missing 과 같은 기준).
+    opex_per_month : float | array-like
+        월 운영비 합계 (원). 스칼라 또는 행별 벡터 (len == len(listings)).
+    **artifacts
+        load_models() 반환값을 그대로 언패킹해서 전달.
+
+    Returns
+    -------
+    pd.DataFrame (index = listings.index) with columns:
+        ADR_pred, Occ_pred, RevPAR_pred, monthly_revenue, net_profit,
+        revpar_trend, trend_label  — 의미는 predict_revpar() 반환값과 동일
+        (단, revpar_trend 미계산 행은 None 대신 NaN)
+        conformal 이 있으면 ADR_lo … net_profit_hi 8개 컬럼 추가 (cluster 컬럼으로 조회)
+    """
+    FEATURES_B_BASE = feature_config["FEATURES_B_BASE"]
+
+    if not isinstance(listings, pd.DataFrame) and hasattr(listings, "to_pandas"):
+        listings = listings.to_pandas()  # pyarrow.Table
+
+    n = len(listings)
+    X_a, X_b, adr_pred = batch_model_inputs(
+        listings, model_A=model_A, encoders=encoders, feature_config=feature_config)
+
+    # ── Model B: Occupancy 예측 ──────────────────────────────────────────────
+    occ_pred = np.clip(
+        model_B.predict(_model_input(model_B, X_b, FEATURES_B_BASE + ["price_gap_oof"])), 0, 1
+    )
+
+    # ── RevPAR 통합 & Isotonic 보정 ─────────────────────────────────────────
+    revpar_raw = adr_pred * occ_pred
+    revpar_cal = iso_reg.predict(revpar_raw)
+
+    # ── revpar_trend 계산 (ttm/l90d 둘 다 있는 행만) ────────────────────────
+    if "ttm_revpar" in listings.columns and "l90d_revpar" in listings.columns:
+        ttm_revpar = listings["ttm_revpar"].to_numpy(dtype=float)
+        l90d_revpar = listings["l90d_revpar"].to_numpy(dtype=float)
+        revpar_trend = (l90d_revpar - ttm_revpar / 4) / (ttm_revpar / 4 + 1e-6)
+    else:
+        revpar_trend = np.full(n, np.nan)
+    has_trend = ~np.isnan(revpar_trend)
+    trend_label = np.select(
+        [~has_trend, revpar_trend > 0.1, revpar_trend < -0.1],
+        [None, "상승", "하락"],
+        default="안정",
+    )
+
+    opex = np.broadcast_to(np.asarray(opex_per_month, dtype=float), (n,))
+    monthly_revenue = revpar_cal * 30
+    out = {
+        "ADR_pred": adr_pred,
+        "Occ_pred": occ_pred,
+        "RevPAR_pred": revpar_cal,
+        "monthly_revenue": monthly_revenue,
+        "net_profit": monthly_revenue - opex,
+        "revpar_trend": revpar_trend,
+        "trend_label": trend_label,
+    }
+
+    # ── 예측 구간 (conformal.json 이 있을 때만) ─────────────────────────────
+    if conformal is not None:
+        cluster = (listings["cluster"].to_numpy(dtype=float) if "cluster" in listings.columns
+                   else np.full(n, np.nan))
+        out.update(conformal.bounds(cluster, adr_pred, occ_pred, revpar_cal))
+        out["net_profit_lo"] = out["RevPAR_lo"] * 30 - opex
+        out["net_profit_hi"] = out["RevPAR_hi"] * 30 - opex
+
+    return pd.DataFrame(out, index=listings.index)
+
+
+def simulate_price_curve(
+    listing_features: dict,
+    opex_per_month: float,
+    *,
+    model_A,
+    model_B,
+    iso_reg,
+    encoders: dict,
+    feature_config: dict,
+    conformal: ConformalTable | None = None,
+    prices=None,
+    adr_bounds: tuple[float, float] | None = None,
+    fee_rate: float = 0.0,
+) -> dict:
+    """요금 그리드별 예약률·RevPAR·순이익 곡선 (가격 탄력성 시나리오).
+
+    Model A 로 시장 적정 ADR 을 1회 예측한 뒤, 그리드의 각 요금 p 에 대해
+    price_gap_oof = p - ADR_pred 만 바꾼 피처 행렬을 만들어 Model B 를 한 번에
+    호출합니다. RevPAR = Isotonic(p × Occ(p)) — p 를 실제로 받는다고 가정합니다.
+
+    Parameters
+    ----------
+    listing_features : dict
+        predict_revpar() 와 같은 입력. ttm_avg_rate = 현재 요금 (없으면 ADR_pred).
+    opex_per_month : float
+        월 운영비 합계 (원).
+    prices : array-like | None
+        시뮬레이션할 1박 요금 그리드 (원).
+        None 이면 현재 요금 × (1 + linspace(-0.30, 0.50, 80)).
+    adr_bounds : (low, high) | None
+        최적 요금 탐색 범위 — 클러스터 ADR Q1~Q3 (외삽 방지 가드레일,
+        notebooks/07_model.md 4.1). 범위 안의 그리드 점과 두 경계값 중에서
+        순이익 최대 요금을 고릅니다. None 이면 그리드 전체.
+    fee_rate : float
+        플랫폼 수수료율. 순이익 = RevPAR × 30 × (1 - fee_rate) - opex.
+        기본 0 (predict_revpar 의 net_profit 과 동일).
+    **artifacts
+        load_models() 반환값을 그대로 언패킹해서 전달 (conformal 은 쓰지 않음).
+
+    Returns
+    -------
+    dict with keys:
+        ADR              : ndarray — 요금 그리드 (원)
+        Occ_pred         : ndarray — 요금별 예측 예약률 (0~1)
+        RevPAR_pred      : ndarray — 요금별 Isotonic 보정 RevPAR (원)
+        net_profit       : ndarray — 요금별 월 순이익 (원)
+        ADR_pred         : float   — Model A 시장 적정 ADR (원)
+        best_ADR, best_Occ, best_RevPAR, best_net_profit : float
+                           — adr_bounds 안에서 순이익이 최대인 요금과 그 지표
+        adr_bounds       : (float, float) | None
+    """
+    FEATURES_A = feature_config["FEATURES_A"]
+    FEATURES_B_BASE = feature_config["FEATURES_B_BASE"]
+
+    feats = _encode_listing(listing_features, encoders)
+
+    # ── Model A: 시장 적정 ADR (요금과 무관 → 1회) ──────────────────────────
+    X_a = np.array([[feats[c] for c in FEATURES_A]], dtype=np.float64)
+    adr_pred = float(np.expm1(model_A.predict(_model_input(model_A, X_a, FEATURES_A))[0]))
+
+    if prices is None:
+        base = listing_features.get("ttm_avg_rate")
+        base = adr_pred if _missing(base) else base
+        prices = base * (1 + np.linspace(-0.30, 0.50, 80))
+    prices = np.asarray(prices, dtype=np.float64).ravel()
+    n = len(prices)
+
+    # 가드레일 경계값도 같은 배치로 평가해 범위 안 후보가 항상 존재하게 함
+    grid = prices if adr_bounds is None else np.concatenate([prices, adr_bounds])
+
+    # ── Model B: price_gap_oof 만 다른 행렬로 1회 호출 ──────────────────────
+    X_b = np.empty((len(grid), len(FEATURES_B_BASE) + 1), dtype=np.float64)
+    X_b[:, :-1] = [feats[c] for c in FEATURES_B_BASE]
+    X_b[:, -1] = grid - adr_pred
+    occ = np.clip(
+        model_B.predict(_model_input(model_B, X_b, FEATURES_B_BASE + ["price_gap_oof"])), 0, 1
+    )
+
+    # ── RevPAR & 순이익 ─────────────────────────────────────────────────────
+    revpar = iso_reg.predict(grid * occ)
+    profit = revpar * 30 * (1 - fee_rate) - opex_per_month
+
+    if adr_bounds is None:
+        best = int(np.argmax(profit))
+    else:
+        low, high = adr_bounds
+        allowed = (grid >= low) & (grid <= high)
+        best = int(np.argmax(np.where(allowed, profit, -np.inf)))
+
+    return {
+        "ADR": prices,
+        "Occ_pred": occ[:n],
+        "RevPAR_pred": revpar[:n],
+        "net_profit": profit[:n],
+        "ADR_pred": adr_pred,
+        "best_ADR": float(grid[best]),
+        "best_Occ": float(occ[best]),
+        "best_RevPAR": float(revpar[best]),
+        "best_net_profit": float(profit[best]),
+        "adr_bounds": None if adr_bounds is None else (float(adr_bounds[0]), float(adr_bounds[1])),
+    }
+
+
+class PercentileIndex:
+    """클러스터 리스팅의 지표별 정렬 배열 — 백분위 순위를 O(log n) 으로 조회.
+
+    pct_rank(col, v) 는 기존 `np.mean(series.dropna() <= v) * 100` 과 같은 값을
+    np.searchsorted(side='right') 로 계산합니다 (v 가 NaN 이면 0, 표본이 없으면 50).
+    """
+
+    __slots__ = ("sorted",)
+
+    METRICS = ("num_reviews", "rating_overall", "min_nights",
+               "nearest_poi_dist_km", "bedrooms", "baths")
+
+    def __init__(self, sorted_values: dict):
+        self.sorted = {c: np.asarray(v, dtype=np.float64) for c, v in sorted_values.items()}
+
+    @classmethod
+    def from_frame(cls, listings, columns=None) -> "PercentileIndex":
+        """DataFrame 에 있는 지표 컬럼만 NaN 제거 후 정렬해 담습니다."""
+        columns = cls.METRICS if columns is None else columns
+        return cls({
+            c: np.sort(listings[c].dropna().to_numpy(dtype=np.float64))
+            for c in columns if c in listings.columns
+        })
+
+    def __contains__(self, col) -> bool:
+        return col in self.sorted
+
+    def __len__(self) -> int:
+        return max((len(v) for v in self.sorted.values()), default=0)
+
+    def pct_rank(self, col: str, value) -> float:
+        """col 분포에서 value 이하인 비율 (0~100)."""
+        s = self.sorted[col]
+        if len(s) == 0:
+            return 50.0
+        if pd.isna(value):
+            return 0.0
+        return float(int(np.searchsorted(s, value, side="right")) / len(s) * 100)
+
+    def ranks(self, col: str, values, nan_rank: float = 0.0) -> np.ndarray:
+        """pct_rank 의 벡터 버전 — values 각각의 백분위 (NaN 은 nan_rank)."""
+        s = self.sorted[col]
+        values = np.asarray(values, dtype=np.float64)
+        if len(s) == 0:
+            return np.full(values.shape, 50.0)
+        out = np.searchsorted(s, values, side="right") / len(s) * 100
+        out[np.isnan(values)] = nan_rank
+        return out
+
+
+def build_cluster_percentiles(cluster_listings, by: str = "cluster", columns=None) -> dict:
+    """cluster_listings_ao.csv (또는 같은 컬럼의 DataFrame) → {cluster: PercentileIndex}.
+
+    앱 시작 시 1회 만들어 두고 compute_health_score() 에 클러스터별 인덱스를 넘깁니다.
+    """
+    return {
+        int(c): PercentileIndex.from_frame(grp, columns)
+        for c, grp in cluster_listings.groupby(by)
+    }
+
+
+class CompsIndex:
+    """클러스터별 유사 숙소(comps) kNN 인덱스 — 표준화 피처 행렬을 클러스터마다 1회 구성.
+
+    거리는 FEATURES 의 클러스터 내 z-score 유클리드 거리에, 숙소 유형이 다르면
+    ROOM_TYPE_WEIGHT 표준편차만큼을 더한 값입니다. 결측 피처는 클러스터 중앙값으로 채웁니다.
+    """
+
+    FEATURES = ("bedrooms", "baths", "guests", "nearest_poi_dist_km",
+                "rating_overall", "photos_count")
+    OUTCOMES = ("ttm_avg_rate", "ttm_occupancy", "ttm_revpar")
+    ROOM_TYPE_WEIGHT = 3.0
+
+    __slots__ = ("_frame", "_parts")
+
+    def __init__(self, listings, by: str = "cluster"):
+        cols = [c for c in ("district", "room_type", *self.FEATURES, *self.OUTCOMES)
+                if c in listings.columns]
+        self._frame = listings[cols].reset_index(drop=True)
+        self._parts = {}
+        for c, rows in listings.groupby(by, observed=True, sort=False).indices.items():
+            X = np.column_stack([
+                listings[f].to_numpy(dtype=np.float64)[rows] if f in listings.columns
+                else np.full(len(rows), np.nan) for f in self.FEATURES
+            ])
+            counts = (~np.isnan(X)).sum(axis=0)
+            med = np.array([np.median(col[~np.isnan(col)]) if n else 0.0
+                            for col, n in zip(X.T, counts)])
+            X = np.where(np.isnan(X), med, X)
+            mu, sd = X.mean(axis=0), X.std(axis=0)
+            sd[sd == 0] = 1.0
+            room = listings["room_type"].astype(str).to_numpy()[rows]
+            self._parts[int(c)] = (rows, (X - mu) / sd, mu, sd, med, room)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def query(self, cluster, features: dict, k: int = 20) -> dict:
+        """features 와 가장 비슷한 같은 클러스터 리스팅 k개와 성과 분포.
+
+        Parameters
+        ----------
+        cluster  : 클러스터 번호
+        features : FEATURES 키 + room_type (없는 피처는 클러스터 중앙값)
+        k        : 이웃 수
+
+        Returns
+        -------
+        dict:
+            listings       : pd.DataFrame — 가까운 순, distance 컬럼 포함
+            summary        : {OUTCOMES 컬럼: {"p25", "p50", "p75"}} (값이 없으면 NaN)
+            k              : 실제 이웃 수 (클러스터 표본이 k 보다 적으면 그만큼)
+            same_room_type : 이웃 중 숙소 유형이 같은 수
+        """
+        part = self._parts.get(int(cluster))
+        if part is None or k <= 0:
+            empty = self._frame.iloc[:0].assign(distance=np.empty(0))
+            nan = {"p25": np.nan, "p50": np.nan, "p75": np.nan}
+            return {"listings": empty, "summary": {c: dict(nan) for c in self.OUTCOMES},
+                    "k": 0, "same_room_type": 0}
+        rows, Z, mu, sd, med, room = part
+
+        x = np.array([features.get(f, np.nan) for f in self.FEATURES], dtype=np.float64)
+        x = np.where(np.isnan(x), med, x)
+        d2 = ((Z - (x - mu) / sd) ** 2).sum(axis=1)
+        d2 += (room != str(features.get("room_type"))) * self.ROOM_TYPE_WEIGHT ** 2
+
+        k = min(k, len(rows))
+        top = np.argpartition(d2, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.lexsort((top, d2[top]))]          # 거리순, 동률이면 원래 순서
+        comps = self._frame.iloc[rows[top]].assign(distance=np.sqrt(d2[top]))
+
+        summary = {}
+        for c in self.OUTCOMES:
+            v = comps[c].to_numpy(dtype=np.float64) if c in comps.columns else np.empty(0)
+            v = v[~np.isnan(v)]
+            q = np.percentile(v, [25, 50, 75]) if len(v) else [np.nan] * 3
+            summary[c] = {"p25": float(q[0]), "p50": float(q[1]), "p75": float(q[2])}
+        return {"listings": comps, "summary": summary, "k": int(k),
+                "same_room_type": int((room[top] == str(features.get("room_type"))).sum())}
+
 
 def compute_health_score(user_vals: dict, cluster_listings) -> dict:
     """클러스터 내 백분위 기반 5-컴포넌트 헬스 스코어 (0~100).
@@ -214,9 +846,11 @@ def compute_health_score(user_vals: dict, cluster_listings) -> dict:
             my_bedrooms   : int   — 침실 수
             my_baths      : float — 욕실 수
 
-    cluster_listings : pd.DataFrame
+    cluster_listings : PercentileIndex | pd.DataFrame
         동일 클러스터 내 Active+Operating 리스팅.
-        cluster_listings_ao.csv를 district의 cluster로 필터링해 전달.
+        build_cluster_percentiles(cluster_listings_ao)[cluster] 를 권장하며,
+        DataFrame(cluster_listings_ao.csv 를 cluster 로 필터링)을 넘기면
+        호출마다 PercentileIndex 를 만듭니다.
         필요 컬럼: num_reviews, rating_overall, min_nights,
                    nearest_poi_dist_km, bedrooms, baths
 
@@ -236,11 +870,11 @@ def compute_health_score(user_vals: dict, cluster_listings) -> dict:
     Example
     -------
     import pandas as pd
-    from predict_utils import compute_health_score
+    from predict_utils import build_cluster_percentiles, compute_health_score
 
     ao = pd.read_csv("cluster_listings_ao.csv")
     cluster_id = 0   # district_lookup.csv 에서 확인
-    cluster_df = ao[ao["cluster"] == cluster_id]
+    cluster_index = build_cluster_percentiles(ao)[cluster_id]   # 앱 시작 시 1회
 
     user_vals = {
         "my_reviews": 30, "my_rating": 4.7, "my_photos": 25,
@@ -248,17 +882,16 @@ def compute_health_score(user_vals: dict, cluster_listings) -> dict:
         "my_extra_fee": False, "my_poi_dist": 0.3,
         "my_bedrooms": 2, "my_baths": 1.0,
     }
-    result = compute_health_score(user_vals, cluster_df)
+    result = compute_health_score(user_vals, cluster_index)
     print(result["composite"], result["grade"])
     """
 
-    def pct_rank(value, series):
-        s = series.dropna()
-        return float(np.mean(s <= value) * 100) if len(s) > 0 else 50.0
+    index = (cluster_listings if isinstance(cluster_listings, PercentileIndex)
+             else PercentileIndex.from_frame(cluster_listings))
 
     # 1. Review Signal
-    reviews_pct   = pct_rank(user_vals["my_reviews"], cluster_listings["num_reviews"])
-    rating_pct    = pct_rank(user_vals["my_rating"],  cluster_listings["rating_overall"])
+    reviews_pct   = index.pct_rank("num_reviews", user_vals["my_reviews"])
+    rating_pct    = index.pct_rank("rating_overall", user_vals["my_rating"])
     review_signal = (reviews_pct + rating_pct) / 2
 
     # 2. Listing Quality — 사진 최적 구간 23-35장
@@ -274,8 +907,8 @@ def compute_health_score(user_vals: dict, cluster_listings) -> dict:
     # 3. Booking Policy
     instant_score    = 100.0 if user_vals["my_instant"] else 0.0
     min_nights_pct   = (
-        pct_rank(user_vals["my_min_nights"], cluster_listings["min_nights"])
-        if "min_nights" in cluster_listings.columns else 50.0
+        index.pct_rank("min_nights", user_vals["my_min_nights"])
+        if "min_nights" in index else 50.0
     )
     no_extra_fee_score = 100.0 if not user_vals["my_extra_fee"] else 0.0
     booking_policy   = (
@@ -286,19 +919,19 @@ def compute_health_score(user_vals: dict, cluster_listings) -> dict:
 
     # 4. Location — 거리 낮을수록 좋음
     poi_dist_pct = (
-        pct_rank(user_vals["my_poi_dist"], cluster_listings["nearest_poi_dist_km"])
-        if "nearest_poi_dist_km" in cluster_listings.columns else 50.0
+        index.pct_rank("nearest_poi_dist_km", user_vals["my_poi_dist"])
+        if "nearest_poi_dist_km" in index else 50.0
     )
     location = 100 - poi_dist_pct
 
     # 5. Listing Config
     bedrooms_pct = (
-        pct_rank(user_vals["my_bedrooms"], cluster_listings["bedrooms"])
-        if "bedrooms" in cluster_listings.columns else 50.0
+        index.pct_rank("bedrooms", user_vals["my_bedrooms"])
+        if "bedrooms" in index else 50.0
     )
     baths_pct = (
-        pct_rank(user_vals["my_baths"], cluster_listings["baths"])
-        if "baths" in cluster_listings.columns else 50.0
+        index.pct_rank("baths", user_vals["my_baths"])
+        if "baths" in index else 50.0
     )
     listing_config = (bedrooms_pct + baths_pct) / 2
 
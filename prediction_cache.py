@@ -0,0 +1,141 @@
+"""
+prediction_cache.py — predict_revpar 앞단의 프로세스 전역 LRU(+TTL) 캐시
+=======================================================================
+
+같은 자치구에서 거의 같은 구성으로 마법사를 돌리는 호스트, 뒤로 갔다가 step5 로
+다시 오는 사용자가 많아 predict_revpar 입력이 자주 반복됩니다. 피처 dict 를 정규화한
+해시 + 모델 버전을 키로 결과를 보관해, 같은 입력은 모델을 다시 돌리지 않습니다.
+
+사용법:
+    from predict_utils import load_models, models_version
+    from prediction_cache import PredictionCache
+
+    artifacts = load_models(fmt="bundle")
+    cache = PredictionCache(maxsize=4096, ttl=3600)
+    result = cache.predict(features, total_opex, version=models_version(fmt="bundle"), **artifacts)
+    cache.stats()     # {'size', 'maxsize', 'hits', 'misses', 'evictions', 'expirations', 'hit_rate'}
+
+키 규칙:
+    - 피처 dict 는 키 이름 순으로 정렬하고, 수치(bool·int·float·numpy 스칼라)는 float 로
+      맞춥니다 — 1 / 1.0 / np.int16(1) / True 는 같은 키, '1'(문자열)은 다른 키입니다.
+    - 모델 버전(models_version())이 키에 들어가므로 모델을 다시 로드하면 이전 항목은
+      더 이상 적중하지 않고 LRU 순서대로 밀려납니다.
+    - 월 운영비는 키에 넣지 않습니다. 캐시에는 운영비 0 기준 결과를 두고, 꺼낼 때
+      net_profit = monthly_revenue - opex 로 다시 계산합니다 (predict_revpar 와 같은 식).
+      예측 구간이 있으면 net_profit_lo/hi 도 같은 방식입니다.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+from predict_utils import predict_revpar
+
+# opex 에 따라 달라지는 결과 키 (나머지는 opex 와 무관해 그대로 캐시)
+_NET_KEYS = ("net_profit", "net_profit_lo", "net_profit_hi")
+
+def _canonical_value(value):
+    if isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)):
+        v = float(value)
+        return "nan" if math.isnan(v) else v
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def features_key(listing_features: dict, version: str = "") -> str:
+    """피처 dict + 모델 버전의 정규화 해시 (32자리 hex)."""
+    canonical = json.dumps(
+        [version, sorted((str(k), _canonical_value(v)) for k, v in listing_features.items())],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """스레드 안전한 크기 제한 LRU 캐시 (선택적 TTL). 여러 세션이 한 인스턴스를 공유합니다.
+
+    Parameters
+    ----------
+    maxsize : 보관할 최대 항목 수 — 넘으면 가장 오래 안 쓴 항목부터 버림 (evictions)
+    ttl     : 항목 유효 시간(초). None 이면 만료 없음. 만료 항목은 조회 시 버림 (expirations)
+    clock   : 시간 함수 (기본 time.monotonic)
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float | None = None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError(f"maxsize 는 1 이상이어야 합니다: {maxsize}")
+        self.maxsize = int(maxsize)
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> dict | None:
+        """key 의 결과 (없거나 만료면 None). 적중하면 가장 최근 사용으로 옮깁니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[0] > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def predict(self, listing_features: dict, opex_per_month: float, *, version: str = "",
+                **artifacts) -> dict:
+        """predict_revpar() 와 같은 결과 dict. 캐시에 없을 때만 모델을 실행합니다.
+
+        Parameters
+        ----------
+        listing_features, opex_per_month, **artifacts : predict_revpar() 와 같음
+        version : models_version() 결과 — 모델이 바뀌면 키가 달라짐
+        """
+        key = features_key(listing_features, version)
+        base = self.get(key)
+        if base is None:
+            # 계산은 잠금 밖에서 — 같은 키를 동시에 계산해도 결과가 같으므로 나중 것이 덮어씀
+            base = predict_revpar(listing_features, 0.0, **artifacts)
+            self.put(key, base)
+        # 캐시 값은 opex 0 기준 — 순이익(과 예측 구간 끝점)에서만 운영비를 뺌
+        return {**base, **{k: base[k] - opex_per_month for k in _NET_KEYS if k in base}}
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """항목과 카운터를 모두 비웁니다."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
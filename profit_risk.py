@@ -0,0 +1,272 @@
+"""
+profit_risk.py — 월 손익의 몬테카를로 위험 시뮬레이션 (NumPy 벡터화)
+=====================================================================
+
+step5 의 월 손익 계산서는 my_adr × my_occ × 30 − 수수료 3% − 운영비 한 숫자뿐입니다.
+대출이자(opex_loan)를 내는 호스트에게는 "나쁜 달에 적자가 날 확률"이 더 중요하므로,
+ADR·예약률·운영비를 흔든 시나리오 N개(기본 100,000)의 월 순이익 분포를 만듭니다.
+
+    source="interval"  : ML 예측 구간(conformal, 1 − ALPHA)에서 잔차 폭을 역산해 정규 잔차로
+                         흔듦 — ADR 은 log1p 스케일, 예약률은 선형 (conformal.py 와 같은 스케일)
+    source="empirical" : 같은 클러스터 리스팅의 (ttm_avg_rate, ttm_occupancy) 쌍을 복원 추출 —
+                         클러스터 중앙값 대비 비율을 호스트 값에 곱함. 요금·예약률의 상관이
+                         유지되지만, 리스팅 간 편차라 한 숙소의 월 변동보다 넓은(보수적) 분포
+    운영비             : 항목별 변동계수(OPEX_CV) — 대출이자·인터넷은 고정, 청소비·기타는 큼.
+                         항목끼리는 독립 (OPEX_CV 에 없는 항목도 이름마다 독립, DEFAULT_CV)
+
+    월 순이익 = ADR × Occ × days × (1 − FEE_RATE) − 운영비 합
+
+난수(표준정규·균등)는 엔진 생성 시 한 번만 뽑아 두고 모든 입력이 같은 난수를 씁니다
+(공통 난수). 그래서 같은 입력은 항상 같은 결과이고 — 캐시가 안전하고 — 요금을 조금
+바꿨을 때의 차이가 표본 잡음이 아니라 입력 차이만 반영합니다. 시뮬레이션 1회는
+배열 산술 + 분위수 선택뿐이라 100,000개에 수 ms 입니다.
+
+사용법:
+    from profit_risk import ProfitRiskEngine
+
+    engine = ProfitRiskEngine.from_listings(active_df)      # cluster, ttm_avg_rate, ttm_occupancy
+    risk = engine.simulate(my_adr, my_occ, opex_items, interval=ml_result)   # 구간 있으면 interval
+    risk = engine.simulate(my_adr, my_occ, opex_items, source="empirical", cluster=2)
+    risk["loss_prob"], risk["p10"], risk["p50"], risk["p90"], risk["expected_shortfall"]
+    engine.stats()     # 결과 캐시 적중률 (prediction_cache.PredictionCache.stats 와 같은 형식)
+"""
+
+from pathlib import Path
+from statistics import NormalDist
+import argparse
+import hashlib
+
+import numpy as np
+
+from conformal import ALPHA
+from prediction_cache import PredictionCache, features_key
+
+ROOT = Path(__file__).parent
+
+N_SCENARIOS = 100_000
+FEE_RATE    = 0.03          # 에어비앤비 호스트 수수료 (step5 손익 계산서와 같음)
+DAYS        = 30
+TAIL        = 0.10          # expected_shortfall — 하위 10% 시나리오의 평균 순이익
+RISK_CACHE_SIZE = 1024
+
+# 운영비 항목별 월 변동계수 (표준편차 / 평균) — step5 opex_items 의 키
+OPEX_CV = {
+    "전기세": 0.25,     # 계절·냉난방
+    "수도세": 0.20,
+    "관리비": 0.05,
+    "인터넷": 0.0,
+    "청소비": 0.30,     # 예약 건수에 따라
+    "대출이자": 0.0,    # 고정금리 가정
+    "기타": 0.50,
+}
+DEFAULT_CV = 0.20          # OPEX_CV 에 없는 항목
+SOURCES = ("interval", "empirical")
+
+# empirical: 클러스터 중앙값 대비 비율의 극단값을 P1~P99 로 자름 (오입력·초고가 리스팅)
+_WINSOR = (1, 99)
+
+
+def _interval_sigmas(interval: dict, alpha: float) -> tuple[float, float]:
+    """예측 구간 dict(ADR_pred/lo/hi, Occ_pred/lo/hi)에서 정규 잔차 표준편차를 역산.
+
+    conformal 구간은 |잔차| 의 (1 − alpha) 분위수 q 만큼 벌린 것이므로 σ = q / z(1 − alpha/2).
+    ADR 은 log1p 스케일 q, 예약률은 [0, 1] 로 잘리기 전의 선형 q (양쪽 중 넓은 쪽).
+    """
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    q_adr = np.log1p(max(interval["ADR_hi"], 0.0)) - np.log1p(max(interval["ADR_pred"], 0.0))
+    q_occ = max(interval["Occ_hi"] - interval["Occ_pred"], interval["Occ_pred"] - interval["Occ_lo"])
+    return max(float(q_adr), 0.0) / z, max(float(q_occ), 0.0) / z
+
+
+class ProfitRiskEngine:
+    """공통 난수 + 클러스터별 경험 분포를 들고 있는 월 손익 시뮬레이터. 프로세스당 1개.
+
+    Parameters
+    ----------
+    empirical  : 클러스터 번호 → (ADR 비율, 예약률 비율) 배열 쌍 (from_listings 가 만듦)
+    n          : 시나리오 수
+    seed       : 공통 난수 시드
+    alpha      : 예측 구간의 1 − 포함률 (conformal.ALPHA)
+    cache_size : 결과 LRU 캐시 크기 — 입력 묶음(값·운영비 항목·source·클러스터)당 1항목
+    """
+
+    def __init__(self, empirical: dict | None = None, *, n: int = N_SCENARIOS, seed: int = 0,
+                 alpha: float = ALPHA, cache_size: int = RISK_CACHE_SIZE):
+        if n < 10:
+            raise ValueError(f"n 은 10 이상이어야 합니다: {n}")
+        self.n = int(n)
+        self.alpha = float(alpha)
+        self.empirical = dict(empirical or {})
+        self.seed = int(seed)
+        rng = np.random.default_rng(seed)
+        self._z = rng.standard_normal((2, self.n))                  # ADR, 예약률 잔차
+        self._u = rng.random(self.n)                                # empirical 복원 추출 위치
+        self._z_opex = rng.standard_normal((len(OPEX_CV), self.n))  # OPEX_CV 항목별
+        self._z_extra = {}                                          # 그 밖의 항목 이름 → 난수 행
+        self._cache = PredictionCache(cache_size)
+
+    @classmethod
+    def from_listings(cls, listings, **kwargs) -> "ProfitRiskEngine":
+        """Active+Operating 리스팅(cluster, ttm_avg_rate, ttm_occupancy)으로 경험 분포를 만듭니다.
+
+        클러스터마다 ADR > 0 이고 예약률이 있는 행의 (ADR, 예약률)을 클러스터 중앙값으로 나눈
+        비율 쌍을 보관합니다 (각 비율은 P1~P99 로 자름).
+        """
+        empirical = {}
+        for c, grp in listings.groupby("cluster"):
+            adr = grp["ttm_avg_rate"].to_numpy(np.float64)
+            occ = grp["ttm_occupancy"].to_numpy(np.float64)
+            ok = np.isfinite(adr) & np.isfinite(occ) & (adr > 0)
+            adr, occ = adr[ok], occ[ok]
+            med_adr, med_occ = (np.median(adr), np.median(occ)) if len(adr) else (0.0, 0.0)
+            if len(adr) < 10 or med_occ <= 0:
+                continue
+            ratios = []
+            for r in (adr / med_adr, occ / med_occ):
+                lo, hi = np.percentile(r, _WINSOR)
+                ratios.append(np.clip(r, lo, hi))
+            empirical[int(c)] = tuple(ratios)
+        return cls(empirical, **kwargs)
+
+    # ── 시나리오 ────────────────────────────────────────────────────────────
+    def _opex_z(self, label: str) -> np.ndarray:
+        """운영비 항목의 표준정규 난수 행 — 항목끼리 독립.
+
+        OPEX_CV 에 없는 항목은 (seed, 항목 이름)으로 시드를 정한 행을 처음 쓸 때 만들어 둡니다.
+        이름이 같으면 입력 순서·다른 항목과 무관하게 같은 행이라 공통 난수가 유지됩니다.
+        """
+        if label in OPEX_CV:
+            return self._z_opex[list(OPEX_CV).index(label)]
+        z = self._z_extra.get(label)
+        if z is None:
+            digest = hashlib.blake2b(str(label).encode("utf-8"), digest_size=8).digest()
+            rng = np.random.default_rng([self.seed, int.from_bytes(digest, "little")])
+            z = self._z_extra.setdefault(label, rng.standard_normal(self.n))
+        return z
+
+    def _opex(self, opex_items: dict) -> np.ndarray | float:
+        """운영비 합의 시나리오 배열 (변동 항목이 없으면 상수)."""
+        total, fixed, varied = np.zeros(self.n), 0.0, False
+        for label, amount in opex_items.items():
+            amount = float(amount or 0.0)
+            cv = OPEX_CV.get(label, DEFAULT_CV)
+            if amount <= 0 or cv <= 0:
+                fixed += max(amount, 0.0)
+                continue
+            total += amount * np.maximum(1.0 + cv * self._opex_z(label), 0.0)
+            varied = True
+        return total + fixed if varied else fixed
+
+    def scenarios(self, adr: float, occ: float, opex_items: dict, *, source: str = "interval",
+                  interval: dict | None = None, cluster=None, fee_rate: float = FEE_RATE,
+                  days: int = DAYS) -> np.ndarray:
+        """월 순이익 시나리오 n 개 (캐시 없음).
+
+        Parameters
+        ----------
+        adr, occ   : 호스트의 1박 요금(원)·예약률(0~1) — 시나리오의 중심
+        opex_items : 운영비 항목 → 월 금액 (step5 opex_items)
+        source     : "interval" (interval 필요) 또는 "empirical" (cluster 필요)
+        interval   : predict_revpar() 결과처럼 ADR_pred/lo/hi, Occ_pred/lo/hi 를 가진 dict
+        cluster    : 클러스터 번호 — empirical 경험 분포 선택
+
+        Returns
+        -------
+        np.ndarray (n,) — 원 단위 월 순이익
+        """
+        adr, occ = max(float(adr), 0.0), min(max(float(occ), 0.0), 1.0)
+        if source == "interval":
+            if interval is None or "ADR_hi" not in interval:
+                raise ValueError("source='interval' 에는 예측 구간(ADR_lo/hi, Occ_lo/hi)이 필요합니다")
+            s_adr, s_occ = _interval_sigmas(interval, self.alpha)
+            adr_s = np.maximum(np.expm1(np.log1p(adr) + s_adr * self._z[0]), 0.0)
+            occ_s = np.clip(occ + s_occ * self._z[1], 0.0, 1.0)
+        elif source == "empirical":
+            try:
+                adr_r, occ_r = self.empirical[int(cluster)]
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"클러스터 {cluster!r} 의 경험 분포가 없습니다") from None
+            idx = (self._u * len(adr_r)).astype(np.intp)
+            adr_s = adr * adr_r[idx]
+            occ_s = np.minimum(occ * occ_r[idx], 1.0)
+        else:
+            raise ValueError(f"source 는 {SOURCES} 중 하나: {source!r}")
+        return adr_s * occ_s * (days * (1.0 - fee_rate)) - self._opex(opex_items)
+
+    def simulate(self, adr: float, occ: float, opex_items: dict, *, source: str | None = None,
+                 interval: dict | None = None, cluster=None, fee_rate: float = FEE_RATE,
+                 days: int = DAYS) -> dict:
+        """월 순이익 분포 요약. 같은 입력 묶음은 캐시에서 꺼냅니다.
+
+        source 를 주지 않으면 interval 에 예측 구간이 있을 때 "interval", 없으면 "empirical".
+
+        Returns
+        -------
+        dict — loss_prob(순이익 < 0 비율), p10/p50/p90, expected_shortfall(하위 TAIL 평균),
+               mean, deterministic(시나리오 없이 계산한 step5 값), n, source
+        """
+        if source is None:
+            source = "interval" if interval is not None and "ADR_hi" in interval else "empirical"
+        key_fields = {"adr": adr, "occ": occ, "source": source, "fee_rate": fee_rate, "days": days,
+                      **{f"opex:{k}": v for k, v in opex_items.items()}}
+        if source == "interval" and interval is not None:
+            key_fields.update({k: interval.get(k) for k in
+                               ("ADR_pred", "ADR_lo", "ADR_hi", "Occ_pred", "Occ_lo", "Occ_hi")})
+        else:
+            key_fields["cluster"] = cluster
+        key = features_key(key_fields)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+
+        profit = self.scenarios(adr, occ, opex_items, source=source, interval=interval,
+                                cluster=cluster, fee_rate=fee_rate, days=days)
+        k = max(int(self.n * TAIL), 1)
+        tail = np.partition(profit, k - 1)[:k]
+        p10, p50, p90 = np.percentile(profit, (10, 50, 90))
+        result = {
+            "loss_prob": float(np.count_nonzero(profit < 0) / self.n),
+            "p10": float(p10),
+            "p50": float(p50),
+            "p90": float(p90),
+            "expected_shortfall": float(tail.mean()),
+            "mean": float(profit.mean()),
+            "deterministic": (max(float(adr), 0.0) * min(max(float(occ), 0.0), 1.0) * days
+                              * (1.0 - fee_rate) - sum(float(v or 0.0) for v in opex_items.values())),
+            "n": self.n,
+            "source": source,
+        }
+        self._cache.put(key, result)
+        return result
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="월 손익 몬테카를로 위험 (경험 분포)")
+    ap.add_argument("adr", type=float, help="1박 요금 (원)")
+    ap.add_argument("occ", type=float, help="예약률 (0~1)")
+    ap.add_argument("--cluster", type=int, default=2)
+    ap.add_argument("--loan", type=float, default=0.0, help="월 대출이자 (원)")
+    ap.add_argument("--opex", type=float, default=0.0, help="그 밖의 월 운영비 (원, 기타로 처리)")
+    ap.add_argument("--csv", default=None, help="원본 리스팅 CSV (기본 data/raw)")
+    args = ap.parse_args(argv)
+
+    import pandas as pd
+    from listings_stream import RAW_CSV, active_mask
+
+    df = pd.read_csv(args.csv or RAW_CSV, usecols=["refined_status", "operation_status", "district",
+                                                  "ttm_avg_rate", "ttm_occupancy"])
+    clusters = pd.read_csv(ROOT / "data" / "processed" / "district_clustered.csv")[["district", "cluster"]]
+    active = df[active_mask(df)].merge(clusters, on="district", how="left")
+    engine = ProfitRiskEngine.from_listings(active)
+    r = engine.simulate(args.adr, args.occ, {"대출이자": args.loan, "기타": args.opex},
+                        source="empirical", cluster=args.cluster)
+    print(f"확정 계산 ₩{r['deterministic']:,.0f} · 적자 확률 {r['loss_prob']:.1%} · "
+          f"P10 ₩{r['p10']:,.0f} / P50 ₩{r['p50']:,.0f} / P90 ₩{r['p90']:,.0f} · "
+          f"하위 {TAIL:.0%} 평균 ₩{r['expected_shortfall']:,.0f} ({r['n']:,}개 시나리오)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+quantile_sketch.py — 병합 가능한 분위수 스케치 (KLL) + (자치구, 숙소 유형, 지표)별 스케치 저장소
+=============================================================================================
+
+값을 전부 보관하지 않고 분위수를 근사하는 KLL 스케치입니다. 메모리는 값 개수와 무관하게
+O(k · log(n / k)) 이고, 청크·월별로 만든 스케치를 merge() 로 합쳐도 한 번에 넣은 것과 같은
+오차 보장을 가집니다. SketchTable 은 (district, room_type) 셀 × 지표(ttm_avg_rate ·
+ttm_occupancy · ttm_revpar)마다 스케치를 두고 npz 로 저장합니다.
+
+data/cache/quantile_sketches.npz 저장소는 벤치마크 테이블(benchmark_table.npz)의 원천입니다.
+write_benchmark_table() 이 스냅숏을 스트리밍으로 집계하며 저장소(지표 = BENCH_COLUMNS)를 새로
+만들고, 새 리스팅 배치는 update_benchmark_table() 이 저장소를 읽어 그 배치만 더한 뒤
+(O(새 행)) 테이블을 다시 씁니다 — 스냅숏 전체를 다시 읽지 않습니다.
+
+사용법:
+    from quantile_sketch import KLLSketch
+    s = KLLSketch()
+    s.update(chunk["ttm_revpar"])          # NaN 은 건너뜀
+    s.merge(other)                         # 다른 청크·프로세스의 스케치
+    s.percentile([25, 50, 75])             # np.percentile(…, [25, 50, 75]) 근사
+
+    from quantile_sketch import SketchTable
+    table = SketchTable.load()             # data/cache/quantile_sketches.npz (지표 = STORE_METRICS)
+    table.quartiles("Mapo-gu", "entire_home", "ttm_revpar")   # (P25, P50, P75)
+    table.benchmark_index()                # BenchmarkIndex (get_bench / bench_val 과 같은 조회)
+
+    python quantile_sketch.py update new_month.csv   # 저장소에 배치를 더하고 benchmark_table.npz 갱신
+    python quantile_sketch.py show Mapo-gu entire_home
+
+정확도 (오차 한계):
+    압축이 한 번도 일어나지 않았으면 (셀의 값 ≤ k 개) np.percentile 과 같은 값입니다.
+    그 뒤로는 순위 오차 — 반환값의 실제 순위와 요청 순위의 차이를 n 으로 나눈 값 — 가
+    rank_error_bound(k) 이하입니다 (99% 신뢰, Apache DataSketches KLL 의 경험식
+    2.296 / k^0.9723 — k=200 에서 1.33%). 값 단위 오차는 그 순위 범위 안 값들의 차이로,
+    분포가 완만한 중앙부(P25~P75)에서 작습니다. 현재 데이터셋에서의 실측은
+    python benchmarks/bench_quantile_sketch.py 가 한계와 함께 검사합니다.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+from benchmark_table import BENCH_COLUMNS, KEYS, BenchmarkIndex
+
+ROOT = Path(__file__).parent
+SKETCHES_PATH = ROOT / "data" / "cache" / "quantile_sketches.npz"
+
+DEFAULT_K = 200      # 최상위 레벨 용량 — 클수록 정확, 메모리 비례
+_C = 2 / 3           # 레벨이 한 단계 내려갈 때마다 용량 감소 비율
+_MIN_CAPACITY = 8
+
+# 저장 형식·압축 규칙을 바꾸면 올려서 저장된 스케치를 무효화
+SKETCH_VERSION = 1
+# step2·step5 가 P25/P50/P75 를 보여 주는 지표
+SKETCH_METRICS = ("ttm_avg_rate", "ttm_occupancy", "ttm_revpar")
+# SKETCHES_PATH 저장소 — 벤치마크 테이블 전체 컬럼. 셀 리스팅이 STORE_K 개 이하이면 정확값
+STORE_METRICS = BENCH_COLUMNS
+STORE_K = 8_192
+
+
+def rank_error_bound(k: int = DEFAULT_K) -> float:
+    """단일 분위수 질의의 정규화 순위 오차 한계 (99% 신뢰) — 2.296 / k^0.9723."""
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """KLL 분위수 스케치 — 레벨 h 의 항목은 가중치 2^h 인 원래 값.
+
+    Parameters
+    ----------
+    k    : 최상위 레벨 용량 (정확도·메모리)
+    seed : 압축 시 홀짝 선택 난수 시드 (같은 입력·시드 → 같은 결과)
+    """
+
+    __slots__ = ("k", "n", "levels", "_rng")
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = 0):
+        self.k = int(k)
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def size(self) -> int:
+        """보관 중인 항목 수."""
+        return sum(len(items) for items in self.levels)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - 1 - h
+        return max(_MIN_CAPACITY, math.ceil(self.k * _C ** depth))
+
+    def update(self, values) -> "KLLSketch":
+        """값 배열을 추가합니다 (NaN 제외). 배치 하나를 레벨 0 에 붙인 뒤 한 번 압축."""
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v[~np.isnan(v)]
+        if len(v):
+            self.n += len(v)
+            self.levels[0] = np.concatenate([self.levels[0], v])
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """other 의 항목을 레벨별로 합칩니다 (other 는 바뀌지 않음)."""
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        # 전체 용량을 넘는 동안 용량을 넘은 가장 낮은 레벨을 반으로 (홀짝 중 무작위) 압축
+        while True:
+            caps = [self._capacity(h) for h in range(len(self.levels))]
+            if self.size <= sum(caps):
+                return
+            h = next(h for h, items in enumerate(self.levels) if len(items) > caps[h])
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[h])
+            odd = len(items) % 2        # 홀수면 1개는 이 레벨에 남김 (가중치 보존)
+            self.levels[h] = items[:odd]
+            self.levels[h + 1] = np.concatenate(
+                [self.levels[h + 1], items[odd + self._rng.integers(2)::2]])
+
+    def percentile(self, pcts):
+        """np.percentile(values, pcts) 근사 (linear 보간). 값이 없으면 NaN.
+
+        압축 전이면 보관한 값 그대로 np.percentile 을 부릅니다. 압축 후에는 각 항목을
+        가중치만큼 반복한 배열에서 같은 위치를 보간합니다.
+        """
+        scalar = np.ndim(pcts) == 0
+        pcts = np.atleast_1d(np.asarray(pcts, dtype=np.float64))
+        if self.n == 0:
+            out = np.full(len(pcts), np.nan)
+        elif len(self.levels) == 1:
+            out = np.percentile(self.levels[0], pcts)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(v), 1 << h, dtype=np.int64)
+                                      for h, v in enumerate(self.levels)])
+            order = np.argsort(items, kind="stable")
+            items, cw = items[order], np.cumsum(weights[order])
+            pos = pcts / 100 * (self.n - 1)
+            lo = np.floor(pos)
+            a = items[np.searchsorted(cw, lo, side="right")]
+            b = items[np.searchsorted(cw, np.minimum(lo + 1, self.n - 1), side="right")]
+            out = a + (b - a) * (pos - lo)
+        return float(out[0]) if scalar else out
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """(항목 float64 (size,), 레벨별 항목 수 int64 (레벨 수,)) — from_arrays 로 복원."""
+        return np.concatenate(self.levels), np.array([len(v) for v in self.levels], dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, items, level_sizes, n: int, k: int = DEFAULT_K) -> "KLLSketch":
+        self = cls(k, seed=int(n))   # 이후 압축의 난수는 n 으로 다시 시드
+        bounds = np.cumsum(np.concatenate([[0], level_sizes]))
+        self.levels = [np.asarray(items[a:b], dtype=np.float64) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.levels = self.levels or [np.empty(0)]
+        self.n = int(n)
+        return self
+
+
+# ── (district, room_type, 지표) 스케치 저장소 ──────────────────────────────────
+class SketchTable:
+    """(district, room_type) 셀 × 지표별 KLLSketch — 병합·저장 가능한 분위수 테이블.
+
+    Parameters
+    ----------
+    metrics : 스케치를 둘 컬럼 (기본 SKETCH_METRICS)
+    k       : 스케치 크기
+    """
+
+    def __init__(self, metrics=SKETCH_METRICS, k: int = DEFAULT_K):
+        self.metrics = tuple(metrics)
+        self.k = int(k)
+        self._cells = {}   # (district, room_type) → {"n": 리스팅 수, "sketches": {metric: KLLSketch}}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def cell_keys(self) -> list:
+        return list(self._cells)
+
+    def _cell(self, key: tuple) -> dict:
+        cell = self._cells.get(key)
+        if cell is None:
+            seed = len(self._cells) * len(self.metrics)
+            cell = self._cells[key] = {"n": 0, "sketches": {
+                m: KLLSketch(self.k, seed=seed + j) for j, m in enumerate(self.metrics)}}
+        return cell
+
+    def add_keys(self, keys) -> "SketchTable":
+        """리스팅 수 0 인 셀을 등록합니다 (이미 있는 키는 그대로) — 1단계 자치구·유형 목록용."""
+        for key in keys:
+            self._cell(tuple(str(k) for k in key))
+        return self
+
+    def update(self, listings) -> "SketchTable":
+        """리스팅 프레임(이미 Active+Operating 만)을 셀별로 더합니다 — O(새 행).
+
+        키가 비어 있는 행은 건너뜁니다 (BenchmarkIndex 와 같게). 프레임에 없는 지표는
+        그 지표 스케치를 그대로 둡니다.
+        """
+        keyed = listings.dropna(subset=list(KEYS))
+        if keyed.empty:
+            return self
+        values = {m: numeric_values(keyed[m]) for m in self.metrics if m in keyed.columns}
+        groups = keyed.groupby([keyed[k].astype(str) for k in KEYS], sort=False).indices
+        for key, rows in groups.items():
+            cell = self._cell(key)
+            cell["n"] += len(rows)
+            for m, v in values.items():
+                cell["sketches"][m].update(v[rows])
+        return self
+
+    def merge(self, other: "SketchTable") -> "SketchTable":
+        """other 의 셀을 더합니다 (다른 청크·월·프로세스). other 는 바뀌지 않음."""
+        for key, o in other._cells.items():
+            cell = self._cell(key)
+            cell["n"] += o["n"]
+            for m, sketch in o["sketches"].items():
+                if m in cell["sketches"]:
+                    cell["sketches"][m].merge(sketch)
+        return self
+
+    def count(self, district: str, room_type: str) -> int:
+        cell = self._cells.get((district, room_type))
+        return 0 if cell is None else cell["n"]
+
+    def percentile(self, district: str, room_type: str, metric: str, pcts):
+        """셀·지표의 분위수 (np.percentile 근사). 셀이 없거나 값이 없으면 NaN."""
+        cell = self._cells.get((district, room_type))
+        if cell is None or metric not in cell["sketches"]:
+            return np.nan if np.ndim(pcts) == 0 else np.full(len(pcts), np.nan)
+        return cell["sketches"][metric].percentile(pcts)
+
+    def quartiles(self, district: str, room_type: str, metric: str) -> tuple[float, float, float]:
+        """(P25, P50, P75) — step2·step5 가 보여 주는 값."""
+        return tuple(float(v) for v in self.percentile(district, room_type, metric, [25, 50, 75]))
+
+    def benchmark_index(self, empty_keys=()) -> BenchmarkIndex:
+        """셀 리스팅 수 + 지표별 P5…P95 의 BenchmarkIndex (행 위치 없음).
+
+        empty_keys : 리스팅 수 0 셀로 추가할 (district, room_type) — 1단계 목록용
+        """
+        keys = self.cell_keys()
+        pcts = BenchmarkIndex.PERCENTILES
+        quantiles = np.full((len(keys), len(self.metrics), len(pcts)), np.nan)
+        for i, key in enumerate(keys):
+            sketches = self._cells[key]["sketches"]
+            for j, m in enumerate(self.metrics):
+                quantiles[i, j] = sketches[m].percentile(pcts)
+        index = BenchmarkIndex.from_arrays(
+            np.array(keys, dtype=str).reshape(len(keys), len(KEYS)),
+            np.array([self._cells[key]["n"] for key in keys], dtype=np.int32),
+            np.array(self.metrics, dtype=str), quantiles)
+        index.add_empty(empty_keys)
+        return index
+
+    # ── 저장 ──────────────────────────────────────────────────────────────
+    def to_arrays(self) -> dict:
+        """np.savez 로 저장할 배열 dict — 스케치 i = 셀 i // 지표 수, 지표 i % 지표 수.
+
+        Returns
+        -------
+        dict:
+            keys        : str (셀 수, 2)
+            n           : int64 (셀 수,)          리스팅 수
+            metrics     : str (지표 수,)
+            sketch_n    : int64 (스케치 수,)      스케치별 값 개수
+            level_sizes : int64 (스케치 수, 최대 레벨 수)
+            items       : float64 (전체 항목 수,)  스케치·레벨 순으로 이어 붙임
+        """
+        keys = self.cell_keys()
+        sketches = [self._cells[key]["sketches"][m] for key in keys for m in self.metrics]
+        packed = [s.to_arrays() for s in sketches]
+        depth = max((len(sizes) for _, sizes in packed), default=1)
+        level_sizes = np.zeros((len(packed), depth), dtype=np.int64)
+        for i, (_, sizes) in enumerate(packed):
+            level_sizes[i, :len(sizes)] = sizes
+        return {
+            "keys": np.array(keys, dtype=str).reshape(len(keys), len(KEYS)),
+            "n": np.array([self._cells[key]["n"] for key in keys], dtype=np.int64),
+            "metrics": np.array(self.metrics, dtype=str),
+            "sketch_n": np.array([s.n for s in sketches], dtype=np.int64),
+            "level_sizes": level_sizes,
+            "items": np.concatenate([items for items, _ in packed]) if packed else np.empty(0),
+        }
+
+    @classmethod
+    def from_arrays(cls, keys, n, metrics, sketch_n, level_sizes, items, k: int = DEFAULT_K) -> "SketchTable":
+        self = cls(metrics=[str(m) for m in metrics], k=k)
+        offset = 0
+        for i, key in enumerate(keys.tolist()):
+            cell = self._cells[tuple(key)] = {"n": int(n[i]), "sketches": {}}
+            for j, m in enumerate(self.metrics):
+                s = i * len(self.metrics) + j
+                sizes = level_sizes[s]
+                depth = int(np.flatnonzero(sizes).max()) + 1 if sizes.any() else 1
+                total = int(sizes.sum())
+                cell["sketches"][m] = KLLSketch.from_arrays(
+                    items[offset:offset + total], sizes[:depth], sketch_n[s], self.k)
+                offset += total
+        return self
+
+    def save(self, path: str | Path | None = None) -> Path:
+        """npz 로 저장합니다 (임시 파일 → 교체)."""
+        dst = Path(path) if path else SKETCHES_PATH
+        meta = {"version": SKETCH_VERSION, "k": self.k}
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), **self.to_arrays())
+        os.replace(tmp, dst)
+        return dst
+
+    @classmethod
+    def load(cls, path: str | Path | None = None, *, metrics=STORE_METRICS,
+             k: int = STORE_K) -> "SketchTable":
+        """저장된 스케치를 읽습니다. 파일이 없거나 SKETCH_VERSION 이 다르면 빈 테이블 (metrics, k).
+
+        저장된 지표가 metrics 와 다르면 ValueError — 다른 지표로 만든 저장소에 더하거나
+        그 저장소로 테이블을 쓰지 않게. k 는 저장된 값을 따릅니다.
+        """
+        src = Path(path) if path else SKETCHES_PATH
+        if not src.exists():
+            return cls(metrics, k)
+        with np.load(src) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("version") != SKETCH_VERSION:
+                return cls(metrics, k)
+            arrays = {name: z[name] for name in ("keys", "n", "metrics", "sketch_n", "level_sizes", "items")}
+        stored = tuple(str(m) for m in arrays["metrics"])
+        if stored != tuple(metrics):
+            raise ValueError(f"저장소 지표가 다릅니다: {src} 는 {stored}, 요청 {tuple(metrics)}")
+        return cls.from_arrays(**arrays, k=meta["k"])
+
+
+def numeric_values(s) -> np.ndarray:
+    """pandas 컬럼 → float64 배열 (bool·문자열 bool 은 0/1, 결측은 NaN)."""
+    if s.dtype == object:   # "True"/"False" 문자열이 섞인 bool 컬럼
+        s = s.map({"True": 1.0, "False": 0.0, True: 1.0, False: 0.0})
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="(자치구, 숙소 유형, 지표) 분위수 스케치 저장소")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    up = sub.add_parser("update", help="리스팅 CSV 의 Active+Operating 행을 저장소에 더하고 벤치마크 테이블 갱신")
+    up.add_argument("csv")
+    up.add_argument("--chunk-size", type=int, default=50_000)
+    show = sub.add_parser("show", help="셀의 P25/P50/P75")
+    show.add_argument("district")
+    show.add_argument("room_type")
+    for p in (up, show):
+        p.add_argument("--store", default=None, help=f"기본 {SKETCHES_PATH.relative_to(ROOT)}")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "update":
+        from benchmark_table import update_benchmark_table
+
+        path = update_benchmark_table(args.csv, sketches_path=args.store, chunk_size=args.chunk_size)
+        table = SketchTable.load(args.store)
+        total = sum(table.count(*key) for key in table.cell_keys())
+        print(f"{args.csv} 반영 → {args.store or SKETCHES_PATH} · {path} "
+              f"(셀 {len(table)}개, 누적 리스팅 {total:,}개)")
+    else:
+        table = SketchTable.load(args.store)
+        print(f"{args.district} · {args.room_type} — 리스팅 {table.count(args.district, args.room_type):,}개")
+        for m in SKETCH_METRICS:
+            q = table.quartiles(args.district, args.room_type, m)
+            print(f"  {m:<14} P25 {q[0]:>12,.2f} · P50 {q[1]:>12,.2f} · P75 {q[2]:>12,.2f}")
+
+if __name__ == "__main__":
+    main()
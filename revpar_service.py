@@ -0,0 +1,432 @@
+"""
+revpar_service.py — RevPAR 예측 HTTP 서비스 (asyncio + 마이크로 배칭)
+=====================================================================
+
+Streamlit 앱 없이 파트너 채널·내부 요금 작업이 예측을 받아 가는 단독 서비스입니다.
+소비자마다 predict_utils 를 import 해 모델을 따로 올리는 대신, 한 프로세스가 모델을
+한 번 로드하고 HTTP(JSON)로 응답합니다. 표준 라이브러리 asyncio 만 씁니다.
+
+사용법:
+    python revpar_service.py [--port 8765] [--max-batch 64] [--max-wait-ms 2] [--fmt bundle]
+
+    curl -s localhost:8765/predict -d '{"listing": {...}, "opex": 500000}'
+
+엔드포인트:
+    POST /predict        {"listing": {...}, "opex": 500000}                → predict_revpar() 결과
+    POST /predict_batch  {"listings": [{...}, ...], "opex": 500000 | [...]} → {"results": [...]}
+    POST /health_score   {"user_vals": {...}, "cluster": 2}                → compute_health_score() 결과
+    POST /simulate       {"listing": {...}, "opex": 500000,
+                          "adr_bounds": [q1, q3], "prices": [...], "fee_rate": 0.03}
+                                                                           → simulate_price_curve() 결과
+    GET  /metrics        엔드포인트별 요청 수·오류 수·p50/p99 지연·처리량 + 배치 크기 분포
+    GET  /healthz        {"status": "ok", "models": models_version}
+
+마이크로 배칭:
+    동시에 들어온 /predict 요청을 큐에 모아, 첫 요청 뒤 max_wait_ms 안에 도착한 요청
+    (최대 max_batch 개)을 predict_revpar_batch() 한 번으로 계산합니다. 모델 호출은 전용
+    스레드 하나에서 차례로 돌고, 그동안 도착한 요청은 다음 배치로 모입니다. 결과는
+    predict_revpar() 를 요청마다 부른 것과 같습니다. 1건짜리 배치도 같은 배치 경로로
+    계산해, 결측(None/NaN) 처리·오류 여부가 함께 들어온 요청에 따라 달라지지 않습니다.
+
+부하 테스트: python benchmarks/bench_service.py
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from predict_utils import (build_cluster_percentiles, compute_health_score, load_models,
+                           models_version, predict_revpar_batch, simulate_price_curve)
+
+ROOT = Path(__file__).parent
+
+MAX_BATCH = 64           # 마이크로 배치 최대 크기
+MAX_WAIT_MS = 2.0        # 첫 요청 뒤 배치를 모으는 시간
+MAX_BODY = 16 << 20      # 요청 본문 상한 (바이트)
+_LATENCY_WINDOW = 10_000  # 엔드포인트별 최근 지연 표본 수
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+# predict_revpar 가 기본값을 채우는 선택 입력 (없어도 됨)
+_OPTIONAL_FEATURES = ("photos_rel_dist", "rating_rel_dist", "reviews_rel_dist", "min_nights_rel_dist")
+
+
+class RequestError(Exception):
+    """클라이언트 입력 오류 — 400 으로 응답."""
+
+
+def _jsonable(value):
+    """numpy 스칼라·배열·NaN 을 JSON 값으로 (NaN·inf → null)."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
+# ── 지표 ──────────────────────────────────────────────────────────────────────
+class LatencyStats:
+    """엔드포인트 하나의 요청 수·오류 수와 최근 지연 표본 (p50/p99)."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, ms: float, ok: bool = True) -> None:
+        self.samples.append(ms)
+        self.count += 1
+        self.errors += not ok
+
+    def snapshot(self, uptime_s: float) -> dict:
+        lat = np.asarray(self.samples) if self.samples else np.zeros(1)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "throughput_rps": self.count / uptime_s if uptime_s > 0 else 0.0,
+        }
+
+
+# ── 마이크로 배칭 ─────────────────────────────────────────────────────────────
+class MicroBatcher:
+    """/predict 요청을 모아 predict_revpar_batch() 한 번으로 계산합니다.
+
+    Parameters
+    ----------
+    artifacts   : load_models() 반환값
+    max_batch   : 배치 최대 크기
+    max_wait_ms : 첫 요청 뒤 다음 요청을 기다리는 시간 (0 이면 이미 큐에 있는 것만)
+    executor    : 모델 호출 스레드 (기본: 전용 스레드 1개)
+    """
+
+    def __init__(self, artifacts: dict, *, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS, executor=None):
+        self.artifacts = artifacts
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.executor = executor or ThreadPoolExecutor(1, thread_name_prefix="revpar-model")
+        self.batch_sizes = deque(maxlen=_LATENCY_WINDOW)
+        self._queue = None
+        self._task = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def submit(self, listing: dict, opex: float) -> dict:
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((listing, opex, fut))
+        return await fut
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.batch_sizes.append(len(batch))
+            try:
+                results = await loop.run_in_executor(self.executor, self._score, batch)
+            except Exception as e:   # _score 가 항목별로 잡지 못한 오류 — 배치 전체 실패
+                results = [e] * len(batch)
+            for (_, _, fut), res in zip(batch, results):
+                if fut.done():        # 클라이언트가 끊긴 요청
+                    continue
+                if isinstance(res, Exception):
+                    fut.set_exception(res)
+                else:
+                    fut.set_result(res)
+
+    def _score(self, batch: list) -> list:
+        try:
+            return self._score_batch(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            # 한 요청의 잘못된 값이 배치를 깨뜨리면 요청별로 다시 계산해 오류를 그 요청에만 돌려줌
+            return [self._score([item])[0] for item in batch]
+
+    def _score_batch(self, batch: list) -> list:
+        """배치 크기와 관계없이 predict_revpar_batch 한 경로 — 응답이 동시 요청에 좌우되지 않음."""
+        frame = pd.DataFrame([listing for listing, _, _ in batch])
+        opex = np.array([o for _, o, _ in batch], dtype=np.float64)
+        return _batch_records(predict_revpar_batch(frame, opex, **self.artifacts))
+
+    def stats(self) -> dict:
+        sizes = np.asarray(self.batch_sizes) if self.batch_sizes else np.zeros(1)
+        return {"batches": len(self.batch_sizes), "mean_size": float(sizes.mean()),
+                "p50_size": float(np.percentile(sizes, 50)), "max_size": int(sizes.max()),
+                "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000}
+
+
+def _batch_records(df: pd.DataFrame) -> list[dict]:
+    """predict_revpar_batch 결과 → predict_revpar() 와 같은 dict 목록 (NaN trend → None)."""
+    records = df.to_dict("records")
+    for r in records:
+        if r["revpar_trend"] is not None and math.isnan(r["revpar_trend"]):
+            r["revpar_trend"] = None
+    return records
+
+
+# ── 요청 처리 ─────────────────────────────────────────────────────────────────
+class ScoringService:
+    """엔드포인트 구현 — HTTP 와 무관하게 (method, path, body) → (status, payload).
+
+    Parameters
+    ----------
+    artifacts        : load_models() 반환값
+    cluster_index    : {cluster: PercentileIndex} (build_cluster_percentiles) — /health_score 용
+    version          : models_version() 결과 (/healthz 에 표시)
+    max_batch, max_wait_ms : MicroBatcher 설정
+    """
+
+    ENDPOINTS = ("/predict", "/predict_batch", "/health_score", "/simulate", "/metrics", "/healthz")
+
+    def __init__(self, artifacts: dict, cluster_index: dict, *, version: str = "",
+                 max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.artifacts = artifacts
+        self.cluster_index = cluster_index
+        self.version = version
+        self.batcher = MicroBatcher(artifacts, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.stats = {path: LatencyStats() for path in self.ENDPOINTS}
+        self.started = time.perf_counter()
+        feature_config = artifacts["feature_config"]
+        self._required = [c for c in dict.fromkeys(feature_config["FEATURES_A"]
+                                                   + feature_config["FEATURES_B_BASE"])
+                          if c not in _OPTIONAL_FEATURES]
+
+    @classmethod
+    def from_models(cls, models_dir=None, *, fmt: str = "bundle", **kwargs) -> "ScoringService":
+        """모델(번들이 없으면 pkl → numpy 엔진)과 cluster_listings_ao.csv 백분위 인덱스를 로드."""
+        try:
+            artifacts = load_models(models_dir, fmt=fmt)
+        except FileNotFoundError:
+            fmt = "pickle"
+            artifacts = load_models(models_dir, engine="numpy")
+        ao = pd.read_csv(ROOT / "data" / "processed" / "cluster_listings_ao.csv")
+        return cls(artifacts, build_cluster_percentiles(ao),
+                   version=models_version(models_dir, fmt=fmt), **kwargs)
+
+    def _listing(self, body: dict) -> dict:
+        return self._check_listing(body.get("listing"), "listing")
+
+    def _check_listing(self, listing, key: str) -> dict:
+        if not isinstance(listing, dict):
+            raise RequestError(f"'{key}' 객체가 필요합니다.")
+        missing = [c for c in self._required if c not in listing]
+        if missing:
+            raise RequestError(f"'{key}' 에 필수 피처가 없습니다: {', '.join(missing)}")
+        return listing
+
+    @staticmethod
+    def _opex(body: dict) -> float:
+        try:
+            return float(body.get("opex", 0.0))
+        except (TypeError, ValueError):
+            raise RequestError("'opex' 는 숫자여야 합니다.") from None
+
+    async def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path not in self.stats:
+            return 404, {"error": f"알 수 없는 경로: {path}"}
+        t0 = time.perf_counter()
+        status, payload = await self._dispatch(method, path, body)
+        self.stats[path].record((time.perf_counter() - t0) * 1000, ok=status == 200)
+        return status, payload
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path in ("/metrics", "/healthz"):
+            if method != "GET":
+                return 405, {"error": "GET 만 지원합니다."}
+            return 200, self.metrics() if path == "/metrics" else {"status": "ok", "models": self.version}
+        if method != "POST":
+            return 405, {"error": "POST 만 지원합니다."}
+        try:
+            req = json.loads(body or b"{}")
+            if not isinstance(req, dict):
+                raise RequestError("요청 본문은 JSON 객체여야 합니다.")
+            handler = {"/predict": self.predict, "/predict_batch": self.predict_batch,
+                       "/health_score": self.health_score, "/simulate": self.simulate}[path]
+            return 200, _jsonable(await handler(req))
+        except (RequestError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            return 400, {"error": str(e) or type(e).__name__}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def predict(self, req: dict) -> dict:
+        return await self.batcher.submit(self._listing(req), self._opex(req))
+
+    async def predict_batch(self, req: dict) -> dict:
+        listings = req.get("listings")
+        if not isinstance(listings, list) or not listings:
+            raise RequestError("'listings' 배열이 필요합니다.")
+        for i, listing in enumerate(listings):
+            self._check_listing(listing, f"listings[{i}]")
+        opex = req.get("opex", 0.0)
+        opex = np.asarray(opex, dtype=np.float64)
+        if opex.ndim and len(opex) != len(listings):
+            raise RequestError("'opex' 배열 길이가 listings 와 다릅니다.")
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(
+            self.batcher.executor,
+            lambda: predict_revpar_batch(pd.DataFrame(listings), opex, **self.artifacts))
+        return {"results": _batch_records(df)}
+
+    async def health_score(self, req: dict) -> dict:
+        user_vals = req.get("user_vals")
+        if not isinstance(user_vals, dict):
+            raise RequestError("'user_vals' 객체가 필요합니다.")
+        try:
+            index = self.cluster_index[int(req.get("cluster"))]
+        except (KeyError, TypeError, ValueError):
+            raise RequestError(f"'cluster' 는 {sorted(self.cluster_index)} 중 하나여야 합니다.") from None
+        return compute_health_score(user_vals, index)   # 백분위 조회뿐이라 이벤트 루프에서 바로
+
+    async def simulate(self, req: dict) -> dict:
+        listing, opex = self._listing(req), self._opex(req)
+        kwargs = {"fee_rate": float(req.get("fee_rate", 0.0))}
+        if req.get("adr_bounds") is not None:
+            lo, hi = req["adr_bounds"]
+            kwargs["adr_bounds"] = (float(lo), float(hi))
+        if req.get("prices") is not None:
+            kwargs["prices"] = np.asarray(req["prices"], dtype=np.float64)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.batcher.executor,
+            lambda: simulate_price_curve(listing, opex, **kwargs, **self.artifacts))
+
+    def metrics(self) -> dict:
+        uptime = time.perf_counter() - self.started
+        return {
+            "uptime_s": uptime,
+            "endpoints": {p: s.snapshot(uptime) for p, s in self.stats.items() if s.count},
+            "batching": self.batcher.stats(),
+        }
+
+
+# ── HTTP/1.1 (keep-alive, Content-Length 본문만) ─────────────────────────────
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, path, headers, body) — 연결이 닫혔으면 None."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError("잘못된 요청 줄") from None
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY:
+        raise OverflowError(length)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def serve(service: ScoringService, host: str = "127.0.0.1", port: int = 8765) -> asyncio.Server:
+    """service 를 HTTP 로 노출하는 asyncio 서버를 시작합니다 (마이크로 배처도 함께 시작)."""
+    service.batcher.start()
+
+    async def on_connect(reader, writer):
+        try:
+            while True:
+                try:
+                    req = await _read_request(reader)
+                except OverflowError:
+                    writer.write(_response(413, {"error": "요청 본문이 너무 큽니다."}, False))
+                    break
+                except (RequestError, ValueError):
+                    writer.write(_response(400, {"error": "잘못된 HTTP 요청"}, False))
+                    break
+                if req is None:
+                    break
+                method, path, headers, body = req
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await service.handle(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_connect, host, port)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RevPAR 예측 HTTP 서비스")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    ap.add_argument("--models-dir", default=None)
+    ap.add_argument("--fmt", choices=("bundle", "pickle"), default="bundle")
+    args = ap.parse_args(argv)
+
+    service = ScoringService.from_models(args.models_dir, fmt=args.fmt, max_batch=args.max_batch,
+                                         max_wait_ms=args.max_wait_ms)
+
+    async def run():
+        server = await serve(service, args.host, args.port)
+        print(f"RevPAR 서비스: http://{args.host}:{args.port} (모델 {service.version[:20]}…, "
+              f"배치 ≤{args.max_batch} / {args.max_wait_ms:g} ms)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()